@@ -0,0 +1,84 @@
+"""
+Сравнение латентности GetPost: новый канал на каждый запрос против пула каналов.
+
+Запуск (при поднятом docker-compose; --post-id существующего поста, иначе меряется ответ NOT_FOUND):
+    PYTHONPATH=src python benchmarks/bench_grpc_channels.py --target localhost:50051 --post-id <uuid> --requests 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import grpc
+
+from proto.posts_service_pb2 import GetPostRequest
+from proto.posts_service_pb2_grpc import PostServiceStub
+from utils.grpc_pool import ChannelPool
+
+
+async def _timed_get(stub: PostServiceStub, post_id: str) -> float:
+    start = time.perf_counter()
+    try:
+        await stub.GetPost(GetPostRequest(post_id=post_id))
+    except grpc.RpcError as e:
+        if e.code() != grpc.StatusCode.NOT_FOUND:
+            raise
+    return time.perf_counter() - start
+
+
+async def per_request_channel(target: str, post_id: str) -> float:
+    start = time.perf_counter()
+    async with grpc.aio.insecure_channel(target) as channel:
+        await _timed_get(PostServiceStub(channel), post_id)
+    return time.perf_counter() - start
+
+
+async def run(name, call, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await call()
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f'{name:>12}: {requests / elapsed:8.0f} rps  '
+        f'p50={q[49] * 1000:7.2f}ms  p99={q[98] * 1000:7.2f}ms'
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--target', default='localhost:50051')
+    parser.add_argument('--post-id', default='00000000-0000-0000-0000-000000000000')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--pool-size', type=int, default=4)
+    args = parser.parse_args()
+
+    await run(
+        'per-request',
+        lambda: per_request_channel(args.target, args.post_id),
+        args.requests,
+        args.concurrency,
+    )
+
+    pool = ChannelPool(args.target, args.pool_size, 30_000, 10_000, 15)
+    await pool.open()
+    try:
+        await run(
+            'pooled',
+            lambda: _timed_get(pool.stub(), args.post_id),
+            args.requests,
+            args.concurrency,
+        )
+    finally:
+        await pool.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,22 @@
+import os
+
+# Пул gRPC-каналов к posts-grpc-service
+POSTS_GRPC_POOL_SIZE = int(os.getenv('POSTS_GRPC_POOL_SIZE', 4))
+POSTS_GRPC_KEEPALIVE_TIME_MS = int(os.getenv('POSTS_GRPC_KEEPALIVE_TIME_MS', 30_000))
+POSTS_GRPC_KEEPALIVE_TIMEOUT_MS = int(os.getenv('POSTS_GRPC_KEEPALIVE_TIMEOUT_MS', 10_000))
+POSTS_GRPC_HEALTH_CHECK_INTERVAL_S = float(os.getenv('POSTS_GRPC_HEALTH_CHECK_INTERVAL_S', 15))
+
+# HTTP-клиент к userdata-service
+USERDATA_HTTP_MAX_CONNECTIONS = int(os.getenv('USERDATA_HTTP_MAX_CONNECTIONS', 100))
+USERDATA_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('USERDATA_HTTP_MAX_KEEPALIVE_CONNECTIONS', 20))
+USERDATA_HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv('USERDATA_HTTP_KEEPALIVE_EXPIRY_S', 30))
+USERDATA_HTTP_CONNECT_TIMEOUT_S = float(os.getenv('USERDATA_HTTP_CONNECT_TIMEOUT_S', 1))
+USERDATA_HTTP_READ_TIMEOUT_S = float(os.getenv('USERDATA_HTTP_READ_TIMEOUT_S', 5))
+USERDATA_HTTP_POOL_TIMEOUT_S = float(os.getenv('USERDATA_HTTP_POOL_TIMEOUT_S', 2))
+USERDATA_HTTP_RETRIES = int(os.getenv('USERDATA_HTTP_RETRIES', 2))
+USERDATA_HTTP_RETRY_BACKOFF_S = float(os.getenv('USERDATA_HTTP_RETRY_BACKOFF_S', 0.05))
+
+# Кэш результатов проверки токенов
+TOKEN_CACHE_MAX_SIZE = int(os.getenv('TOKEN_CACHE_MAX_SIZE', 100_000))
+TOKEN_CACHE_TTL_S = float(os.getenv('TOKEN_CACHE_TTL_S', 60))
+TOKEN_CACHE_NEGATIVE_TTL_S = float(os.getenv('TOKEN_CACHE_NEGATIVE_TTL_S', 2))
@@ -0,0 +1,17 @@
+from shared.events import create_event_producer
+from shared.metrics import registry
+
+# None, если EVENTS_BROKER_URL не задан; запускается и останавливается в lifespan приложения
+event_producer = create_event_producer('gateway_service')
+
+if event_producer is not None:
+    for _name in ('sent', 'shed', 'dropped', 'spilled', 'replayed', 'send_failures'):
+        registry.gauge(f'gateway_events_{_name}', f'Statistics events: {_name}',
+                       lambda name=_name: getattr(event_producer, name))
+    registry.gauge('gateway_events_queue_depth', 'Statistics events waiting for the broker',
+                   event_producer.queue_depth)
+
+
+def emit(event_type: str, **fields) -> None:
+    if event_producer is not None:
+        event_producer.emit(event_type, **fields)
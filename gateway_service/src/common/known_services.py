@@ -1,4 +1,10 @@
+import os
+
 COMMON_URL = "http://userdata-service"
 
 USERDATA_SERVICE_PORT = 8002
 USERDATA_SERVICE_URL = f'{COMMON_URL}:{USERDATA_SERVICE_PORT}'
+
+POSTS_GRPC_SERVICE_HOST = os.getenv('POSTS_GRPC_SERVICE_HOST', 'posts-grpc-service')
+POSTS_GRPC_SERVICE_PORT = int(os.getenv('POSTS_GRPC_SERVICE_PORT', 50051))
+POSTS_GRPC_SERVICE_TARGET = f'{POSTS_GRPC_SERVICE_HOST}:{POSTS_GRPC_SERVICE_PORT}'
@@ -1,21 +1,38 @@
 # gateway/main.py
+import json
 from datetime import datetime
-from typing import List, Optional
+from enum import Enum
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Body, FastAPI, HTTPException, Header, Response
+from fastapi import APIRouter, Body, FastAPI, HTTPException, Header, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 import grpc
+from google.protobuf.field_mask_pb2 import FieldMask
 from google.protobuf.timestamp_pb2 import Timestamp
-from pydantic import UUID4, BaseModel
-from common.known_services import USERDATA_SERVICE_URL
+from pydantic import UUID4, BaseModel, Field
 from proto.posts_service_pb2 import (
     CreatePostRequest as GrpcCreatePostRequest,
     GetPostRequest as GrpcGetPostRequest,
     UpdatePostRequest as GrpcUpdatePostRequest,
     DeletePostRequest as GrpcDeletePostRequest,
+    DeletePostsRequest as GrpcDeletePostsRequest,
     ListPostsRequest as GrpcListPostsRequest,
+    TotalMode as GrpcTotalMode,
+    BatchGetPostsRequest as GrpcBatchGetPostsRequest,
+    StreamPostsRequest as GrpcStreamPostsRequest,
+    CreateCommentRequest as GrpcCreateCommentRequest,
+    ListCommentsRequest as GrpcListCommentsRequest,
+    StreamCommentsRequest as GrpcStreamCommentsRequest,
+    ReactionRequest as GrpcReactionRequest,
+    TopTagsRequest as GrpcTopTagsRequest,
+    SearchPostsRequest as GrpcSearchPostsRequest,
+    ListPostsByAuthorRequest as GrpcListPostsByAuthorRequest,
+    GetFeedRequest as GrpcGetFeedRequest,
 )
-from utils.send_request import send_request
-from proto.posts_service_pb2_grpc import PostServiceStub
+from common.events import emit
+from utils.send_request import check_token, posts_reads
+from utils.grpc_pool import posts_channel_pool
+from utils.etag import etag_matches, list_etag, masked_post_etag, post_etag, version_from_etag
 
 
 router = APIRouter(prefix='/posts')
@@ -46,162 +63,691 @@ class UpdatePostRequest(BaseModel):
     content: Optional[str] = None
     is_private: Optional[bool] = None
     tags: Optional[List[str]] = None
+    # Альтернатива заголовку If-Match
+    expected_version: Optional[int] = None
+
+_UPDATABLE_FIELDS = ('title', 'content', 'is_private', 'tags')
+
+class TotalMode(str, Enum):
+    exact = 'exact'
+    cached = 'cached'
+    estimated = 'estimated'
+    none = 'none'
+
+_GRPC_TOTAL_MODES = {
+    TotalMode.exact: GrpcTotalMode.TOTAL_EXACT,
+    TotalMode.cached: GrpcTotalMode.TOTAL_CACHED,
+    TotalMode.estimated: GrpcTotalMode.TOTAL_ESTIMATED,
+    TotalMode.none: GrpcTotalMode.TOTAL_NONE,
+}
 
 class ListPostsRequest(BaseModel):
     page: int = 1
-    per_page: int = 10
+    per_page: int = Field(10, ge=1)
+    page_token: Optional[str] = None
+    total_mode: TotalMode = TotalMode.exact
+    tags_any: List[str] = []
+    tags_all: List[str] = []
 
 class PostResponse(BaseModel):
+    # С ?fields= в ответе только post_id и запрошенные поля, поэтому остальные необязательны
     post_id: str
-    title: str
+    title: Optional[str] = None
+    # None в кратком представлении (summary)
+    content: Optional[str] = None
+    content_preview: Optional[str] = None
+    creator_user_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    is_private: Optional[bool] = None
+    tags: Optional[List[str]] = None
+    version: Optional[int] = None
+    reaction_counts: Optional[Dict[str, int]] = None
+
+class ListPostsResponse(BaseModel):
+    posts: List[PostResponse]
+    total: Optional[int]
+    next_page_token: Optional[str] = None
+
+class ListPostsByAuthorResponse(BaseModel):
+    posts: List[PostResponse]
+    next_page_token: Optional[str] = None
+
+class FeedResponse(BaseModel):
+    posts: List[PostResponse]
+    next_page_token: Optional[str] = None
+
+class BatchGetPostsRequest(BaseModel):
+    post_ids: List[str]
+
+class BatchGetPostsResponse(BaseModel):
+    posts: List[PostResponse]
+    missing_post_ids: List[str]
+    forbidden_post_ids: List[str]
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class TopTagsResponse(BaseModel):
+    tags: List[TagCount]
+
+class SearchHit(BaseModel):
+    post: PostResponse
+    rank: float
+    snippet: str
+
+class SearchPostsResponse(BaseModel):
+    hits: List[SearchHit]
+    next_page_token: Optional[str] = None
+
+class CreateCommentRequest(BaseModel):
+    auth_data: AuthentificationData
+    content: str
+
+class CommentResponse(BaseModel):
+    comment_id: str
+    post_id: str
+    commentator_user_id: str
     content: str
-    creator_user_id: str
     created_at: datetime
     updated_at: datetime
-    is_private: bool
-    tags: List[str]
 
-class ListPostsResponse(BaseModel):
-    posts: List[PostResponse]
-    total: int
+class ListCommentsResponse(BaseModel):
+    comments: List[CommentResponse]
+    next_page_token: Optional[str] = None
+
+class ReactionRequest(BaseModel):
+    auth_data: AuthentificationData
+
+class ReactionResponse(BaseModel):
+    post_id: str
+    reaction_type: str
+    count: int
+    changed: bool
+
+class DeletePostsRequest(BaseModel):
+    auth_data: AuthentificationData
+    post_ids: List[str]
+
+class DeletePostsResponse(BaseModel):
+    deleted_post_ids: List[str]
+    missing_post_ids: List[str]
+    forbidden_post_ids: List[str]
+
+def _idempotency_metadata(idempotency_key: Optional[str], user_id):
+    # posts_service сохраняет ответ под этим ключом (в пределах пользователя) и отдаёт его же на повтор
+    return (('idempotency-key', idempotency_key), ('user-id', str(user_id))) if idempotency_key else None
 
 def _convert_timestamp(ts: Timestamp) -> datetime:
     return ts.ToDatetime().replace(tzinfo=None)
 
+def _to_post_response(post, fields: Optional[List[str]] = None) -> PostResponse:
+    values = dict(
+        post_id=post.post_id,
+        title=post.title,
+        content=post.content,
+        creator_user_id=post.creator_user_id,
+        created_at=_convert_timestamp(post.created_at),
+        updated_at=_convert_timestamp(post.updated_at),
+        is_private=post.is_private,
+        tags=list(post.tags),
+        version=post.version,
+        reaction_counts=dict(post.reaction_counts),
+    )
+    if fields:
+        values['content_preview'] = post.content_preview
+        values = {name: value for name, value in values.items() if name == 'post_id' or name in fields}
+    return PostResponse(**values)
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """?fields=title,content_preview в список путей для read_mask; None — нужен весь пост."""
+    if not fields:
+        return None
+    return list(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip())) or None
+
+def _read_mask(fields: Optional[List[str]]) -> Optional[FieldMask]:
+    return FieldMask(paths=fields) if fields else None
+
 @router.post("/", response_model=PostResponse)
-async def create_post(request: CreatePostRequest):
+async def create_post(
+    request: CreatePostRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     auth_data = request.auth_data
-    auth_response = await send_request('POST', USERDATA_SERVICE_URL+'/check-token/v1', {'token': auth_data.token, 'user_id': auth_data.user_id})
-    if request.creator_user_id != str(auth_data.user_id) or auth_response.status_code != 200:
+    token_valid = await check_token(auth_data.token, auth_data.user_id)
+    if request.creator_user_id != str(auth_data.user_id) or not token_valid:
         return Response(status_code=403)
 
-    async with grpc.aio.insecure_channel("posts-grpc-service:50051") as channel:
-        stub = PostServiceStub(channel)
-        response = await stub.CreatePost(
-            GrpcCreatePostRequest(
-                title=request.title,
-                content=request.content,
-                creator_user_id=request.creator_user_id,
-                is_private=request.is_private,
-                tags=request.tags,
+    stub = posts_channel_pool.stub()
+    response = await stub.CreatePost(
+        GrpcCreatePostRequest(
+            title=request.title,
+            content=request.content,
+            creator_user_id=request.creator_user_id,
+            is_private=request.is_private,
+            tags=request.tags,
+        ),
+        metadata=_idempotency_metadata(idempotency_key, auth_data.user_id),
+    )
+    return _to_post_response(response)
+
+@router.get("/stream")
+async def stream_posts(
+    creator_user_id: Optional[UUID4] = None,
+    tag: Optional[str] = None,
+    tags_any: List[str] = Query([]),
+    tags_all: List[str] = Query([]),
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    x_auth_token: str = Header(..., alias="X-Auth-Token"),
+):
+    token_valid = await check_token(x_auth_token, x_user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    stub = posts_channel_pool.stub()
+    call = stub.StreamPosts(
+        GrpcStreamPostsRequest(
+            creator_user_id=str(creator_user_id) if creator_user_id else None,
+            tag=tag,
+            include_private=str(creator_user_id) == x_user_id,
+            tags_any=tags_any,
+            tags_all=tags_all,
+        )
+    )
+    return _ndjson_response(call, await _first_message(call), _to_post_response)
+
+@router.get("/tags/top", response_model=TopTagsResponse)
+async def top_tags(limit: int = Query(10, ge=1)):
+    stub = posts_channel_pool.stub()
+    response = await stub.TopTags(GrpcTopTagsRequest(limit=limit))
+    return TopTagsResponse(tags=[TagCount(tag=tag.tag, count=tag.count) for tag in response.tags])
+
+@router.get("/search", response_model=SearchPostsResponse)
+async def search_posts(
+    q: str,
+    per_page: int = Query(20, ge=1),
+    page_token: Optional[str] = None,
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    x_auth_token: str = Header(..., alias="X-Auth-Token"),
+):
+    token_valid = await check_token(x_auth_token, x_user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.SearchPosts(
+            GrpcSearchPostsRequest(query=q, viewer_user_id=x_user_id, per_page=per_page, page_token=page_token)
+        )
+    except grpc.RpcError as e:
+        _raise_rpc_error(e)
+    return SearchPostsResponse(
+        hits=[
+            SearchHit(post=_to_post_response(hit.post), rank=hit.rank, snippet=hit.snippet)
+            for hit in response.hits
+        ],
+        next_page_token=response.next_page_token or None,
+    )
+
+@router.get("/by-author/{creator_user_id}", response_model=ListPostsByAuthorResponse,
+            response_model_exclude_unset=True)
+async def list_posts_by_author(
+    creator_user_id: UUID4,
+    per_page: int = Query(20, ge=1),
+    page_token: Optional[str] = None,
+    summary: bool = False,
+    fields: Optional[str] = Query(None, description="Поля поста через запятую, например title,content_preview"),
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    x_auth_token: str = Header(..., alias="X-Auth-Token"),
+):
+    token_valid = await check_token(x_auth_token, x_user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    read_fields = _parse_fields(fields)
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.ListPostsByAuthor(
+            GrpcListPostsByAuthorRequest(
+                creator_user_id=str(creator_user_id),
+                viewer_user_id=x_user_id,
+                per_page=per_page,
+                page_token=page_token,
+                summary=summary,
+                read_mask=_read_mask(read_fields),
             )
         )
-        return PostResponse(
-            post_id=response.post_id,
-            title=response.title,
-            content=response.content,
-            creator_user_id=response.creator_user_id,
-            created_at=_convert_timestamp(response.created_at),
-            updated_at=_convert_timestamp(response.updated_at),
-            is_private=response.is_private,
-            tags=list(response.tags),
+    except grpc.RpcError as e:
+        _raise_rpc_error(e)
+
+    posts = [_to_post_response(post, read_fields) for post in response.posts]
+    if summary and not read_fields:
+        for post in posts:
+            post.content = None
+    return ListPostsByAuthorResponse(posts=posts, next_page_token=response.next_page_token or None)
+
+@router.get("/feed", response_model=FeedResponse, response_model_exclude_unset=True)
+async def get_feed(
+    per_page: int = Query(20, ge=1),
+    page_token: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Поля поста через запятую, например title,content_preview"),
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    x_auth_token: str = Header(..., alias="X-Auth-Token"),
+):
+    token_valid = await check_token(x_auth_token, x_user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    read_fields = _parse_fields(fields)
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.GetFeed(
+            GrpcGetFeedRequest(
+                user_id=x_user_id,
+                per_page=per_page,
+                page_token=page_token,
+                read_mask=_read_mask(read_fields),
+            )
         )
+    except grpc.RpcError as e:
+        _raise_rpc_error(e)
 
-@router.get("/{post_id}", response_model=PostResponse)
-async def get_post(post_id: str, x_user_id: str = Header(..., alias="X-User-Id"), x_auth_token: str = Header(..., alias="X-Auth-Token")):
-    auth_response = await send_request('POST', USERDATA_SERVICE_URL+'/check-token/v1', {'token': x_auth_token, 'user_id': x_user_id})
-    if auth_response.status_code != 200:
+    return FeedResponse(
+        posts=[_to_post_response(post, read_fields) for post in response.posts],
+        next_page_token=response.next_page_token or None,
+    )
+
+@router.get("/{post_id}", response_model=PostResponse, response_model_exclude_unset=True)
+async def get_post(
+    post_id: str,
+    http_response: Response,
+    fields: Optional[str] = Query(None, description="Поля поста через запятую, например title,content_preview"),
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    x_auth_token: str = Header(..., alias="X-Auth-Token"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    token_valid = await check_token(x_auth_token, x_user_id)
+    if not token_valid:
         return Response(status_code=403)
 
-    async with grpc.aio.insecure_channel("posts-grpc-service:50051") as channel:
-        stub = PostServiceStub(channel)
-        try:
-            response = await stub.GetPost(GrpcGetPostRequest(post_id=post_id))
-            if response.is_private and x_user_id != response.creator_user_id:
+    read_fields = _parse_fields(fields)
+    stub = posts_channel_pool.stub()
+    try:
+        if if_none_match:
+            # Сначала дешёвая проверка версии: content не читается, если у клиента актуальная копия
+            version = await stub.GetPostVersion(GrpcGetPostRequest(post_id=post_id))
+            if version.is_private and x_user_id != version.creator_user_id:
                 return Response(status_code=403)
-            return PostResponse(
-                post_id=response.post_id,
-                title=response.title,
-                content=response.content,
-                creator_user_id=response.creator_user_id,
-                created_at=_convert_timestamp(response.created_at),
-                updated_at=_convert_timestamp(response.updated_at),
-                is_private=response.is_private,
-                tags=list(response.tags),
-            )
-        except grpc.RpcError as e:
-            if e.code() == grpc.StatusCode.NOT_FOUND:
-                raise HTTPException(status_code=404, detail="Post not found")
-            raise
+            etag = masked_post_etag(version.post_id, version.version, version.reaction_counts, read_fields)
+            if etag_matches(if_none_match, etag):
+                # Клиент показывает свою копию: это тоже просмотр
+                emit('post_viewed', post_id=version.post_id, user_id=x_user_id)
+                return Response(status_code=304, headers={'ETag': etag})
+
+        # Разные наборы полей — разные ответы, их нельзя склеивать в одно чтение.
+        # Зрителя в ключе нет, поэтому просмотр считается здесь, отдельно для каждого запроса
+        response = await posts_reads.do(
+            (post_id, *(read_fields or ())),
+            lambda: stub.GetPost(GrpcGetPostRequest(post_id=post_id, read_mask=_read_mask(read_fields))),
+        )
+        if response.is_private and x_user_id != response.creator_user_id:
+            return Response(status_code=403)
+        emit('post_viewed', post_id=response.post_id, user_id=x_user_id)
+        http_response.headers['ETag'] = masked_post_etag(
+            response.post_id, response.version, response.reaction_counts, read_fields,
+        )
+        return _to_post_response(response, read_fields)
+    except grpc.RpcError as e:
+        _raise_rpc_error(e)
 
 @router.patch("/{post_id}", response_model=PostResponse)
-async def update_post(post_id: str, request: UpdatePostRequest):
+async def update_post(
+    post_id: str,
+    request: UpdatePostRequest,
+    http_response: Response,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     auth_data = request.auth_data
-    auth_response = await send_request('POST', USERDATA_SERVICE_URL+'/check-token/v1', {'token': auth_data.token, 'user_id': auth_data.user_id})
-    if auth_response.status_code != 200:
+    token_valid = await check_token(auth_data.token, auth_data.user_id)
+    if not token_valid:
         return Response(status_code=403)
 
-    async with grpc.aio.insecure_channel("posts-grpc-service:50051") as channel:
-        stub = PostServiceStub(channel)
-        try:
-            response = await stub.UpdatePost(
-                GrpcUpdatePostRequest(
-                    post_id=post_id,
-                    title=request.title,
-                    content=request.content,
-                    is_private=request.is_private,
-                    tags=request.tags or [],
-                )
-            )
-            return PostResponse(
-                post_id=response.post_id,
-                title=response.title,
-                content=response.content,
-                creator_user_id=response.creator_user_id,
-                created_at=_convert_timestamp(response.created_at),
-                updated_at=_convert_timestamp(response.updated_at),
-                is_private=response.is_private,
-                tags=list(response.tags),
-            )
-        except grpc.RpcError as e:
-            if e.code() == grpc.StatusCode.NOT_FOUND:
-                raise HTTPException(status_code=404, detail="Post not found")
-            raise
+    # В маску попадают только поля, которые клиент прислал, поэтому читать пост перед правкой не нужно
+    paths = [field for field in _UPDATABLE_FIELDS
+             if field in request.model_fields_set and getattr(request, field) is not None]
+    if not paths:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+
+    expected_version = request.expected_version
+    if if_match is not None and if_match.strip() != '*':
+        expected_version = version_from_etag(if_match, post_id)
+        if expected_version is None:
+            raise HTTPException(status_code=412, detail="If-Match does not match this post")
+
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.UpdatePost(
+            GrpcUpdatePostRequest(
+                post_id=post_id,
+                title=request.title,
+                content=request.content,
+                is_private=request.is_private,
+                tags=request.tags or [],
+                update_mask=FieldMask(paths=paths),
+                expected_version=expected_version or 0,
+            ),
+            metadata=_idempotency_metadata(idempotency_key, auth_data.user_id),
+        )
+        http_response.headers['ETag'] = post_etag(response.post_id, response.version, response.reaction_counts)
+        return _to_post_response(response)
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Post not found")
+        if e.code() == grpc.StatusCode.ABORTED:
+            raise HTTPException(status_code=412 if if_match is not None else 409, detail="Post was modified")
+        raise
 
 @router.delete("/{post_id}")
 async def delete_post(
     post_id: str, 
     request: DeletePostRequest,
     x_user_id: str = Header(..., alias="X-User-Id"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     auth_data = request.auth_data
-    auth_response = await send_request('POST', USERDATA_SERVICE_URL+'/check-token/v1', {'token': auth_data.token, 'user_id': auth_data.user_id})
-    if x_user_id != str(auth_data.user_id) or auth_response.status_code != 200:
+    token_valid = await check_token(auth_data.token, auth_data.user_id)
+    if x_user_id != str(auth_data.user_id) or not token_valid:
         return Response(status_code=403)
 
-    async with grpc.aio.insecure_channel("posts-grpc-service:50051") as channel:
-        stub = PostServiceStub(channel)
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.DeletePost(
+            GrpcDeletePostRequest(post_id=post_id, user_id=x_user_id),
+            metadata=_idempotency_metadata(idempotency_key, auth_data.user_id),
+        )
+        return {"success": response.success}
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Post not found")
+        elif e.code() == grpc.StatusCode.PERMISSION_DENIED:
+            raise HTTPException(status_code=403, detail="Permission denied")
+        raise
+
+@router.post("/list", response_model=ListPostsResponse, response_model_exclude_unset=True)
+async def list_posts(
+    http_response: Response,
+    request: ListPostsRequest = Body(...),
+    fields: Optional[str] = Query(None, description="Поля поста через запятую, например title,content_preview"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    read_fields = _parse_fields(fields)
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.ListPosts(
+            GrpcListPostsRequest(
+                page=request.page,
+                per_page=request.per_page,
+                page_token=request.page_token,
+                total_mode=_GRPC_TOTAL_MODES[request.total_mode],
+                tags_any=request.tags_any,
+                tags_all=request.tags_all,
+                read_mask=_read_mask(read_fields),
+            )
+        )
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
+        raise
+
+    etag = list_etag(
+        (masked_post_etag(post.post_id, post.version, post.reaction_counts, read_fields) for post in response.posts),
+        response.total,
+        response.next_page_token,
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    http_response.headers['ETag'] = etag
+    return ListPostsResponse(
+        posts=[_to_post_response(post, read_fields) for post in response.posts],
+        total=response.total if request.total_mode != TotalMode.none else None,
+        next_page_token=response.next_page_token or None,
+    )
+
+@router.post("/batch", response_model=BatchGetPostsResponse)
+async def batch_get_posts(
+    request: BatchGetPostsRequest,
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    x_auth_token: str = Header(..., alias="X-Auth-Token"),
+):
+    token_valid = await check_token(x_auth_token, x_user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.BatchGetPosts(GrpcBatchGetPostsRequest(post_ids=request.post_ids))
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
+        raise
+
+    posts, forbidden_post_ids = [], []
+    for post in response.posts:
+        if post.is_private and x_user_id != post.creator_user_id:
+            forbidden_post_ids.append(post.post_id)
+        else:
+            posts.append(_to_post_response(post))
+    return BatchGetPostsResponse(
+        posts=posts,
+        missing_post_ids=list(response.missing_post_ids),
+        forbidden_post_ids=forbidden_post_ids,
+    )
+
+@router.post("/delete", response_model=DeletePostsResponse)
+async def delete_posts(
+    request: DeletePostsRequest,
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    auth_data = request.auth_data
+    token_valid = await check_token(auth_data.token, auth_data.user_id)
+    if x_user_id != str(auth_data.user_id) or not token_valid:
+        return Response(status_code=403)
+
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.DeletePosts(
+            GrpcDeletePostsRequest(user_id=x_user_id, post_ids=request.post_ids),
+            metadata=_idempotency_metadata(idempotency_key, auth_data.user_id),
+        )
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+            raise HTTPException(status_code=400, detail=e.details())
+        raise
+    return DeletePostsResponse(
+        deleted_post_ids=list(response.deleted_post_ids),
+        missing_post_ids=list(response.missing_post_ids),
+        forbidden_post_ids=list(response.forbidden_post_ids),
+    )
+
+def _to_comment_response(comment) -> CommentResponse:
+    return CommentResponse(
+        comment_id=comment.comment_id,
+        post_id=comment.post_id,
+        commentator_user_id=comment.commentator_user_id,
+        content=comment.content,
+        created_at=_convert_timestamp(comment.created_at),
+        updated_at=_convert_timestamp(comment.updated_at),
+    )
+
+async def _first_message(call):
+    """Первое сообщение читаем до ответа, чтобы 404/403/400 успели стать статусом, а не оборванным телом."""
+    try:
+        return await call.read()
+    except grpc.RpcError as e:
+        _raise_rpc_error(e)
+
+def _ndjson_response(call, first, to_response) -> StreamingResponse:
+    """
+    Стрим gRPC как NDJSON. После первой строки статус 200 уже отправлен, поэтому ошибка
+    посередине пишется последней строкой {"error": ...}: так клиент отличает обрезанную
+    выгрузку от полной.
+    """
+    async def ndjson():
+        message = first
         try:
-            response = await stub.DeletePost(
-                GrpcDeletePostRequest(post_id=post_id, user_id=x_user_id))
-            return {"success": response.success}
+            while message is not grpc.aio.EOF:
+                yield to_response(message).model_dump_json() + '\n'
+                message = await call.read()
         except grpc.RpcError as e:
-            if e.code() == grpc.StatusCode.NOT_FOUND:
-                raise HTTPException(status_code=404, detail="Post not found")
-            elif e.code() == grpc.StatusCode.PERMISSION_DENIED:
-                raise HTTPException(status_code=403, detail="Permission denied")
-            raise
-
-@router.post("/list", response_model=ListPostsResponse)
-async def list_posts(request: ListPostsRequest = Body(...)):
-    async with grpc.aio.insecure_channel("posts-grpc-service:50051") as channel:
-        stub = PostServiceStub(channel)
-        response = await stub.ListPosts(
-            GrpcListPostsRequest(page=request.page, per_page=request.per_page)
+            yield json.dumps({'error': {'code': e.code().name, 'detail': e.details()}}) + '\n'
+        finally:
+            call.cancel()
+
+    return StreamingResponse(ndjson(), media_type='application/x-ndjson')
+
+def _raise_rpc_error(e: grpc.RpcError):
+    if e.code() == grpc.StatusCode.NOT_FOUND:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if e.code() == grpc.StatusCode.PERMISSION_DENIED:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+        raise HTTPException(status_code=400, detail=e.details())
+    raise e
+
+@router.post("/{post_id}/comments", response_model=CommentResponse)
+async def create_comment(
+    post_id: str,
+    request: CreateCommentRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    auth_data = request.auth_data
+    token_valid = await check_token(auth_data.token, auth_data.user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.CreateComment(
+            GrpcCreateCommentRequest(
+                post_id=post_id,
+                commentator_user_id=str(auth_data.user_id),
+                content=request.content,
+            ),
+            metadata=_idempotency_metadata(idempotency_key, auth_data.user_id),
         )
-        return ListPostsResponse(
-            posts=[
-                PostResponse(
-                    post_id=post.post_id,
-                    title=post.title,
-                    content=post.content,
-                    creator_user_id=post.creator_user_id,
-                    created_at=_convert_timestamp(post.created_at),
-                    updated_at=_convert_timestamp(post.updated_at),
-                    is_private=post.is_private,
-                    tags=list(post.tags),
-                )
-                for post in response.posts
-            ],
-            total=response.total,
+    except grpc.RpcError as e:
+        _raise_rpc_error(e)
+    return _to_comment_response(response)
+
+@router.get("/{post_id}/comments", response_model=ListCommentsResponse)
+async def list_comments(
+    post_id: str,
+    per_page: int = Query(20, ge=1),
+    page_token: Optional[str] = None,
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    x_auth_token: str = Header(..., alias="X-Auth-Token"),
+):
+    token_valid = await check_token(x_auth_token, x_user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.ListComments(
+            GrpcListCommentsRequest(
+                post_id=post_id,
+                viewer_user_id=x_user_id,
+                per_page=per_page,
+                page_token=page_token,
+            )
         )
+    except grpc.RpcError as e:
+        _raise_rpc_error(e)
+    return ListCommentsResponse(
+        comments=[_to_comment_response(comment) for comment in response.comments],
+        next_page_token=response.next_page_token or None,
+    )
+
+@router.get("/{post_id}/comments/stream")
+async def stream_comments(
+    post_id: str,
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    x_auth_token: str = Header(..., alias="X-Auth-Token"),
+):
+    token_valid = await check_token(x_auth_token, x_user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    stub = posts_channel_pool.stub()
+    call = stub.StreamComments(GrpcStreamCommentsRequest(post_id=post_id, viewer_user_id=x_user_id))
+    return _ndjson_response(call, await _first_message(call), _to_comment_response)
+
+@router.put("/{post_id}/reactions/{reaction_type}", response_model=ReactionResponse)
+async def add_reaction(
+    post_id: str,
+    reaction_type: str,
+    request: ReactionRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    auth_data = request.auth_data
+    token_valid = await check_token(auth_data.token, auth_data.user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.AddReaction(
+            GrpcReactionRequest(post_id=post_id, user_id=str(auth_data.user_id), reaction_type=reaction_type),
+            metadata=_idempotency_metadata(idempotency_key, auth_data.user_id),
+        )
+    except grpc.RpcError as e:
+        _raise_rpc_error(e)
+    return _to_reaction_response(response)
+
+@router.delete("/{post_id}/reactions/{reaction_type}", response_model=ReactionResponse)
+async def remove_reaction(
+    post_id: str,
+    reaction_type: str,
+    request: ReactionRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    auth_data = request.auth_data
+    token_valid = await check_token(auth_data.token, auth_data.user_id)
+    if not token_valid:
+        return Response(status_code=403)
+
+    stub = posts_channel_pool.stub()
+    try:
+        response = await stub.RemoveReaction(
+            GrpcReactionRequest(post_id=post_id, user_id=str(auth_data.user_id), reaction_type=reaction_type),
+            metadata=_idempotency_metadata(idempotency_key, auth_data.user_id),
+        )
+    except grpc.RpcError as e:
+        _raise_rpc_error(e)
+    return _to_reaction_response(response)
+
+def _to_reaction_response(reaction) -> ReactionResponse:
+    return ReactionResponse(
+        post_id=reaction.post_id,
+        reaction_type=reaction.reaction_type,
+        count=reaction.count,
+        changed=reaction.changed,
+    )
+
+_RPC_ERROR_STATUSES = {
+    grpc.StatusCode.INVALID_ARGUMENT: 400,
+    # Запрос с тем же Idempotency-Key ещё выполняется
+    grpc.StatusCode.ALREADY_EXISTS: 409,
+    # Idempotency-Key уже использован с другим телом запроса
+    grpc.StatusCode.FAILED_PRECONDITION: 422,
+}
+
+async def rpc_error_handler(request: Request, exc: grpc.RpcError) -> JSONResponse:
+    """Ошибки posts_service, которые ручки не разобрали сами."""
+    status_code = _RPC_ERROR_STATUSES.get(exc.code())
+    if status_code is None:
+        return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+    return JSONResponse(status_code=status_code, content={"detail": exc.details()})
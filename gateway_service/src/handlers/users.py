@@ -56,6 +56,11 @@ class UpdateRequest(BaseModel):
     auth_data: AuthentificationData
 
 
+class FollowRequest(BaseModel):
+    auth_data: AuthentificationData
+    followee_user_id: UUID4
+
+
 @router.post("/register/v1", status_code=201)
 async def user_register_v1(body: RegisterRequest):
     return await proxy_request('POST', USERDATA_SERVICE_URL + '/register/v1', dict(body))
@@ -69,3 +74,16 @@ async def user_authorize_v1(body: AuthorizeRequest):
 @router.post("/update/v1", status_code=200)
 async def user_data_update(body: UpdateRequest):
     return await proxy_request('POST', USERDATA_SERVICE_URL + '/data/update/v1', dict(body), True)
+
+
+@router.post("/follow/v1", status_code=200)
+async def user_follow_v1(body: FollowRequest):
+    # Подписчик всегда тот, чей токен
+    request = dict(body, follower_user_id=body.auth_data.user_id)
+    return await proxy_request('POST', USERDATA_SERVICE_URL + '/follow/v1', request, True)
+
+
+@router.post("/unfollow/v1", status_code=200)
+async def user_unfollow_v1(body: FollowRequest):
+    request = dict(body, follower_user_id=body.auth_data.user_id)
+    return await proxy_request('POST', USERDATA_SERVICE_URL + '/unfollow/v1', request, True)
@@ -1,8 +1,30 @@
+from contextlib import asynccontextmanager
+
+import grpc
 from fastapi import FastAPI
 
-from handlers import users, posts
+from common.events import event_producer
+from handlers import metrics, users, posts
+from utils.grpc_pool import posts_channel_pool
+from utils.http_client import userdata_http_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await posts_channel_pool.open()
+    await userdata_http_client.open()
+    if event_producer is not None:
+        event_producer.start()
+    yield
+    if event_producer is not None:
+        await event_producer.close()
+    await userdata_http_client.close()
+    await posts_channel_pool.close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_exception_handler(grpc.RpcError, posts.rpc_error_handler)
 
 app.include_router(users.router)
 app.include_router(posts.router)
+app.include_router(metrics.router)
@@ -0,0 +1,60 @@
+import hashlib
+import zlib
+from typing import Iterable, Mapping, Optional, Sequence
+
+
+def post_etag(post_id: str, version: int, reaction_counts: Optional[Mapping[str, int]] = None) -> str:
+    """
+    Реакции не меняют version поста, поэтому их отпечаток добавляется к тегу отдельно:
+    иначе 304 отдавал бы клиенту устаревшие счётчики.
+    """
+    if not reaction_counts:
+        return f'"{post_id}-{version}"'
+    counts = ';'.join(f'{reaction}={count}' for reaction, count in sorted(reaction_counts.items()))
+    return f'"{post_id}-{version}.{zlib.crc32(counts.encode()):08x}"'
+
+
+def masked_post_etag(post_id: str, version: int, reaction_counts: Optional[Mapping[str, int]],
+                     fields: Optional[Sequence[str]]) -> str:
+    """
+    ETag ответа с ?fields=: у каждого набора полей своё представление.
+    Реакции учитываются, только если они среди запрошенных полей.
+    """
+    if not fields:
+        return post_etag(post_id, version, reaction_counts)
+    counts = reaction_counts if 'reaction_counts' in fields else None
+    return list_etag([post_etag(post_id, version, counts)], *sorted(fields))
+
+
+def list_etag(post_etags: Iterable[str], *extra) -> str:
+    digest = hashlib.sha1()
+    for etag in post_etags:
+        digest.update(f'{etag};'.encode())
+    for part in extra:
+        digest.update(f'{part};'.encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Слабое сравнение из RFC 9110: префикс W/ не учитывается."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(candidate.strip().removeprefix('W/') == opaque for candidate in if_none_match.split(','))
+
+
+def version_from_etag(if_match: Optional[str], post_id: str) -> Optional[int]:
+    """
+    Версия из If-Match вида "<post_id>-<version>[.<реакции>]"; None, если заголовок не про этот пост.
+    Отпечаток реакций не сверяется: они не конфликтуют с правкой поста.
+    """
+    if not if_match:
+        return None
+    tag = if_match.strip().removeprefix('W/').strip('"')
+    prefix = f'{post_id}-'
+    version = tag[len(prefix):].split('.', 1)[0]
+    if not tag.startswith(prefix) or not version.isdigit():
+        return None
+    return int(version)
@@ -0,0 +1,108 @@
+import asyncio
+import itertools
+import logging
+from typing import List, Optional
+
+import grpc
+
+from common.config import (
+    POSTS_GRPC_HEALTH_CHECK_INTERVAL_S,
+    POSTS_GRPC_KEEPALIVE_TIME_MS,
+    POSTS_GRPC_KEEPALIVE_TIMEOUT_MS,
+    POSTS_GRPC_POOL_SIZE,
+)
+from common.known_services import POSTS_GRPC_SERVICE_TARGET
+from proto.posts_service_pb2_grpc import PostServiceStub
+
+logger = logging.getLogger(__name__)
+
+_UNHEALTHY_STATES = (
+    grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+    grpc.ChannelConnectivity.SHUTDOWN,
+)
+
+
+class ChannelPool:
+    """
+    Набор долгоживущих gRPC-каналов к одному target.
+    Каналы создаются на старте приложения и раздаются по round-robin,
+    мёртвые каналы периодически пересоздаются.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        size: int,
+        keepalive_time_ms: int,
+        keepalive_timeout_ms: int,
+        health_check_interval: float,
+    ):
+        self.target = target
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.options = [
+            ('grpc.keepalive_time_ms', keepalive_time_ms),
+            ('grpc.keepalive_timeout_ms', keepalive_timeout_ms),
+            ('grpc.keepalive_permit_without_calls', 1),
+            ('grpc.http2.max_pings_without_data', 0),
+            # Без этого каналы с одинаковыми аргументами делят один сабканал,
+            # и пул фактически превращается в одно TCP-соединение.
+            ('grpc.use_local_subchannel_pool', 1),
+        ]
+        self._channels: List[grpc.aio.Channel] = []
+        self._stubs: List[PostServiceStub] = []
+        self._counter = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
+
+    def _make_channel(self) -> grpc.aio.Channel:
+        return grpc.aio.insecure_channel(self.target, options=self.options)
+
+    async def open(self) -> None:
+        self._channels = [self._make_channel() for _ in range(self.size)]
+        self._stubs = [PostServiceStub(channel) for channel in self._channels]
+        for channel in self._channels:
+            channel.get_state(try_to_connect=True)
+        self._health_task = asyncio.create_task(self._health_check_loop())
+        logger.info('Opened %d gRPC channels to %s', self.size, self.target)
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        await asyncio.gather(*(channel.close() for channel in self._channels))
+        self._channels = []
+        self._stubs = []
+
+    def stub(self) -> PostServiceStub:
+        if not self._stubs:
+            raise RuntimeError(f'Channel pool to {self.target} is not opened')
+        return self._stubs[next(self._counter) % len(self._stubs)]
+
+    async def _health_check_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await self.check_health()
+
+    async def check_health(self) -> None:
+        for i, channel in enumerate(self._channels):
+            state = channel.get_state(try_to_connect=True)
+            if state not in _UNHEALTHY_STATES:
+                continue
+            logger.warning('gRPC channel #%d to %s is %s, reconnecting', i, self.target, state.name)
+            new_channel = self._make_channel()
+            self._channels[i] = new_channel
+            self._stubs[i] = PostServiceStub(new_channel)
+            await channel.close()
+
+
+posts_channel_pool = ChannelPool(
+    POSTS_GRPC_SERVICE_TARGET,
+    POSTS_GRPC_POOL_SIZE,
+    POSTS_GRPC_KEEPALIVE_TIME_MS,
+    POSTS_GRPC_KEEPALIVE_TIMEOUT_MS,
+    POSTS_GRPC_HEALTH_CHECK_INTERVAL_S,
+)
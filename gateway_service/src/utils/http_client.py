@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import random
+from typing import Optional
+
+import httpx
+
+from common.config import (
+    USERDATA_HTTP_CONNECT_TIMEOUT_S,
+    USERDATA_HTTP_KEEPALIVE_EXPIRY_S,
+    USERDATA_HTTP_MAX_CONNECTIONS,
+    USERDATA_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    USERDATA_HTTP_POOL_TIMEOUT_S,
+    USERDATA_HTTP_READ_TIMEOUT_S,
+    USERDATA_HTTP_RETRIES,
+    USERDATA_HTTP_RETRY_BACKOFF_S,
+)
+from shared.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+
+class HttpClient:
+    """
+    Долгоживущий httpx.AsyncClient с keep-alive соединениями,
+    ретраями идемпотентных запросов и метриками заполненности пула.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limits: httpx.Limits,
+        timeout: httpx.Timeout,
+        retries: int,
+        retry_backoff: float,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.name = name
+        self.limits = limits
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_flight = 0
+
+        self.in_flight_gauge = registry.gauge(
+            f'gateway_{name}_http_in_flight',
+            f'Requests to {name} currently holding or waiting for a pooled connection',
+            lambda: self._in_flight,
+        )
+        self.saturation_gauge = registry.gauge(
+            f'gateway_{name}_http_pool_saturation',
+            f'In-flight requests to {name} divided by max_connections',
+            self.saturation,
+        )
+        self.pool_timeouts = registry.counter(
+            f'gateway_{name}_http_pool_timeouts_total',
+            f'Requests to {name} that timed out waiting for a free connection',
+        )
+        self.retries_total = registry.counter(
+            f'gateway_{name}_http_retries_total',
+            f'Retried requests to {name}',
+        )
+
+    def saturation(self) -> float:
+        if not self.limits.max_connections:
+            return 0.0
+        return self._in_flight / self.limits.max_connections
+
+    async def open(self) -> None:
+        self._client = httpx.AsyncClient(
+            limits=self.limits,
+            timeout=self.timeout,
+            transport=self._transport,
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        json=None,
+        idempotent: Optional[bool] = None,
+    ) -> httpx.Response:
+        if self._client is None:
+            raise RuntimeError(f'HTTP client to {self.name} is not opened')
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempts = 1 + (self.retries if idempotent else 0)
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            self._in_flight += 1
+            try:
+                response = await self._client.request(method=method, url=url, json=json)
+            except httpx.PoolTimeout:
+                self.pool_timeouts.inc()
+                raise
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+            finally:
+                self._in_flight -= 1
+
+            self.retries_total.inc()
+            delay = self.retry_backoff * 2 ** attempt
+            await asyncio.sleep(delay + random.uniform(0, delay))
+
+
+userdata_http_client = HttpClient(
+    'userdata',
+    limits=httpx.Limits(
+        max_connections=USERDATA_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=USERDATA_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=USERDATA_HTTP_KEEPALIVE_EXPIRY_S,
+    ),
+    timeout=httpx.Timeout(
+        USERDATA_HTTP_READ_TIMEOUT_S,
+        connect=USERDATA_HTTP_CONNECT_TIMEOUT_S,
+        pool=USERDATA_HTTP_POOL_TIMEOUT_S,
+    ),
+    retries=USERDATA_HTTP_RETRIES,
+    retry_backoff=USERDATA_HTTP_RETRY_BACKOFF_S,
+)
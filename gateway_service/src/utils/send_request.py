@@ -1,25 +1,52 @@
 import logging
+from datetime import datetime
+from typing import Optional
+
 import httpx
 
 from fastapi import Response
 from fastapi.encoders import jsonable_encoder
 
 from common.known_services import USERDATA_SERVICE_URL
+from utils.http_client import userdata_http_client
+from utils.single_flight import SingleFlight
+from utils.token_cache import token_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def send_request(method: str, url: str, request: dict) -> httpx.Response:
-    async with httpx.AsyncClient() as client:
-        logger.info(request)
-        return await client.request(method=method, url=url, json=jsonable_encoder(request))
+async def send_request(method: str, url: str, request: dict, idempotent: Optional[bool] = None) -> httpx.Response:
+    logger.info(request)
+    return await userdata_http_client.request(method, url, json=jsonable_encoder(request), idempotent=idempotent)
+
+
+token_checks = SingleFlight()
+posts_reads = SingleFlight()
+
+
+async def check_token(token: str, user_id) -> bool:
+    valid = token_cache.get(token, user_id)
+    if valid is not None:
+        return valid
+    return await token_checks.do((token, str(user_id)), lambda: _check_token_upstream(token, user_id))
+
+
+async def _check_token_upstream(token: str, user_id) -> bool:
+    # Проверка токена ничего не меняет, поэтому её можно безопасно ретраить
+    response = await send_request('POST', USERDATA_SERVICE_URL+'/check-token/v1', {'token': token, 'user_id': user_id}, idempotent=True)
+    if response.status_code == 200:
+        active_until = (response.json() or {}).get('active_until')
+        token_cache.set_valid(token, user_id, datetime.fromisoformat(active_until) if active_until else None)
+        return True
+    if response.status_code == 403:
+        token_cache.set_invalid(token, user_id)
+    return False
 
 
 async def proxy_request(method: str, url: str, request: dict, need_auth: bool = False) -> Response:
     if need_auth:
         auth_data = request.pop('auth_data')
-        auth_response = await send_request('POST', USERDATA_SERVICE_URL+'/check-token/v1', {'token': auth_data.token, 'user_id': auth_data.user_id})
-        if auth_response.status_code != 200:
+        if not await check_token(auth_data.token, auth_data.user_id):
             return Response(status_code=403)
     response = await send_request(method, url, request)
     return Response(response.content, response.status_code)
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from common.config import TOKEN_CACHE_MAX_SIZE, TOKEN_CACHE_NEGATIVE_TTL_S, TOKEN_CACHE_TTL_S
+from shared.metrics import registry
+from utils.ttl_cache import TtlCache
+
+
+class TokenCache:
+    """
+    Кэш результатов check-token. Положительный результат живёт не дольше
+    active_until токена, отрицательный — короткое время.
+    """
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache: TtlCache[bool] = TtlCache(max_size)
+
+        self.hits = registry.counter('gateway_token_cache_hits_total', 'Token checks answered from cache')
+        self.misses = registry.counter('gateway_token_cache_misses_total', 'Token checks sent to userdata-service')
+        self.size = registry.gauge('gateway_token_cache_size', 'Entries in token cache', lambda: len(self._cache))
+
+    @staticmethod
+    def _key(token: str, user_id) -> tuple:
+        return token, str(user_id)
+
+    def get(self, token: str, user_id) -> Optional[bool]:
+        valid = self._cache.get(self._key(token, user_id))
+        if valid is None:
+            self.misses.inc()
+        else:
+            self.hits.inc()
+        return valid
+
+    def set_valid(self, token: str, user_id, active_until: Optional[datetime] = None) -> None:
+        ttl = self.ttl
+        if active_until is not None:
+            if active_until.tzinfo is None:
+                active_until = active_until.replace(tzinfo=timezone.utc)
+            ttl = min(ttl, (active_until - datetime.now(timezone.utc)).total_seconds())
+        self._cache.set(self._key(token, user_id), True, ttl)
+
+    def set_invalid(self, token: str, user_id) -> None:
+        self._cache.set(self._key(token, user_id), False, self.negative_ttl)
+
+    def invalidate(self, token: str, user_id=None) -> None:
+        """Сбрасывает результат проверки; без user_id — для всех пользователей с этим токеном."""
+        if user_id is not None:
+            self._cache.delete(self._key(token, user_id))
+            return
+        for key in self._cache.keys():
+            if key[0] == token:
+                self._cache.delete(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+token_cache = TokenCache(TOKEN_CACHE_MAX_SIZE, TOKEN_CACHE_TTL_S, TOKEN_CACHE_NEGATIVE_TTL_S)
@@ -0,0 +1,44 @@
+from utils.etag import etag_matches, list_etag, masked_post_etag, post_etag, version_from_etag
+
+
+def test_post_etag_changes_with_version():
+    assert post_etag('post', 1) != post_etag('post', 2)
+    assert etag_matches('"other", "post-1"', post_etag('post', 1))
+    assert etag_matches('W/"post-1"', post_etag('post', 1))
+    assert etag_matches('*', post_etag('post', 1))
+    assert not etag_matches(None, post_etag('post', 1))
+    assert not etag_matches('"post-1"', post_etag('post', 2))
+
+
+def test_post_etag_changes_with_reactions():
+    assert post_etag('post', 1, {}) == post_etag('post', 1)
+    assert post_etag('post', 1, {'like': 1}) != post_etag('post', 1)
+    assert post_etag('post', 1, {'like': 1}) != post_etag('post', 1, {'like': 2})
+    assert post_etag('post', 1, {'like': 1, 'fire': 2}) == post_etag('post', 1, {'fire': 2, 'like': 1})
+
+
+def test_list_etag_depends_on_page_contents():
+    page = [post_etag('a', 1), post_etag('b', 1)]
+    assert list_etag(page, 2, '') == list_etag(iter(page), 2, '')
+    assert list_etag(page, 2, '') != list_etag([post_etag('a', 1), post_etag('b', 2)], 2, '')
+    assert list_etag(page, 2, '') != list_etag(page, 3, '')
+
+
+def test_masked_post_etag_depends_on_fields():
+    assert masked_post_etag('post', 1, {'like': 1}, None) == post_etag('post', 1, {'like': 1})
+    assert masked_post_etag('post', 1, None, ['title']) != masked_post_etag('post', 1, None, ['content_preview'])
+    assert masked_post_etag('post', 1, None, ['title', 'tags']) == masked_post_etag('post', 1, None, ['tags', 'title'])
+    assert masked_post_etag('post', 1, None, ['title']) != masked_post_etag('post', 2, None, ['title'])
+    # Реакции меняют тег, только если они запрошены
+    assert masked_post_etag('post', 1, {'like': 1}, ['title']) == masked_post_etag('post', 1, {'like': 2}, ['title'])
+    assert masked_post_etag('post', 1, {'like': 1}, ['reaction_counts']) != \
+        masked_post_etag('post', 1, {'like': 2}, ['reaction_counts'])
+
+
+def test_version_from_etag():
+    assert version_from_etag(post_etag('a-b', 7), 'a-b') == 7
+    assert version_from_etag('W/"a-b-7"', 'a-b') == 7
+    assert version_from_etag(post_etag('a-b', 7, {'like': 3}), 'a-b') == 7
+    assert version_from_etag('"c-7"', 'a-b') is None
+    assert version_from_etag('"a-b-x"', 'a-b') is None
+    assert version_from_etag(None, 'a-b') is None
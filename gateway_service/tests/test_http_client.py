@@ -0,0 +1,53 @@
+import httpx
+import pytest
+
+from utils.http_client import HttpClient
+
+
+def make_client(handler, retries=2):
+    return HttpClient(
+        'test',
+        limits=httpx.Limits(max_connections=10),
+        timeout=httpx.Timeout(1),
+        retries=retries,
+        retry_backoff=0,
+        transport=httpx.MockTransport(handler),
+    )
+
+
+@pytest.mark.asyncio
+async def test_idempotent_request_is_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200)
+
+    client = make_client(handler)
+    await client.open()
+    response = await client.request('POST', 'http://userdata/check-token/v1', json={}, idempotent=True)
+    await client.close()
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert client.retries_total.value == 2
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_request_is_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError('refused')
+
+    client = make_client(handler)
+    await client.open()
+    with pytest.raises(httpx.ConnectError):
+        await client.request('POST', 'http://userdata/register/v1', json={})
+    await client.close()
+
+    assert len(calls) == 1
+    assert client.saturation() == 0
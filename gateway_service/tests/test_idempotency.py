@@ -0,0 +1,39 @@
+import uuid
+from unittest.mock import patch
+
+import grpc
+import pytest
+from fastapi import HTTPException, Response
+
+from handlers import posts
+from utils.etag import post_etag
+
+
+class FailingStub:
+    def __init__(self, code: grpc.StatusCode):
+        self.error = grpc.aio.AioRpcError(code, grpc.aio.Metadata(), grpc.aio.Metadata(), details=code.name)
+
+    async def UpdatePost(self, request, metadata=None):
+        raise self.error
+
+
+async def update_post(code: grpc.StatusCode, if_match=None):
+    async def valid_token(token, user_id):
+        return True
+
+    request = posts.UpdatePostRequest(auth_data={'token': 't', 'user_id': str(uuid.uuid4())}, title='new')
+    with patch.object(posts.posts_channel_pool, 'stub', lambda: FailingStub(code)), \
+            patch.object(posts, 'check_token', valid_token):
+        await posts.update_post('post', request, Response(), if_match, 'key')
+
+
+@pytest.mark.asyncio
+async def test_update_in_progress_is_not_a_version_conflict():
+    with pytest.raises(grpc.RpcError) as in_progress:
+        await update_post(grpc.StatusCode.ALREADY_EXISTS, if_match=post_etag('post', 1, {}))
+    response = await posts.rpc_error_handler(None, in_progress.value)
+    assert response.status_code == 409
+
+    with pytest.raises(HTTPException) as conflict:
+        await update_post(grpc.StatusCode.ABORTED, if_match=post_etag('post', 1, {}))
+    assert conflict.value.status_code == 412
@@ -13,14 +13,8 @@ from src.proto.posts_service_pb2 import (
 )
 
 @pytest.fixture
-async def mock_grpc_channel():
-    with patch('grpc.aio.insecure_channel') as mock_channel:
-        mock_channel.return_value = AsyncMock()
-        yield mock_channel
-
-@pytest.fixture
-async def mock_post_service(mock_grpc_channel):
-    with patch('post_service_pb2_grpc.PostServiceStub') as mock_stub:
+async def mock_post_service():
+    with patch('utils.grpc_pool.posts_channel_pool.stub') as mock_stub:
         mock_service = AsyncMock()
         mock_stub.return_value = mock_service
         yield mock_service
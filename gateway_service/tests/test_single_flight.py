@@ -0,0 +1,67 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from utils import send_request
+from utils.single_flight import SingleFlight
+from utils.token_cache import token_cache
+
+FAN_OUT = 1000
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 'post'
+
+    results = await asyncio.gather(*(flight.do('post-id', upstream) for _ in range(FAN_OUT)))
+
+    assert calls == 1
+    assert results == ['post'] * FAN_OUT
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError('boom')
+
+    results = await asyncio.gather(*(flight.do('key', upstream) for _ in range(10)), return_exceptions=True)
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    with pytest.raises(RuntimeError):
+        await flight.do('key', upstream)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_token_checks_hit_userdata_once():
+    token_cache.clear()
+    calls = 0
+
+    async def fake_send_request(method, url, request, idempotent=None):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={'active_until': None})
+
+    with patch.object(send_request, 'send_request', fake_send_request):
+        results = await asyncio.gather(*(send_request.check_token('token', 'user') for _ in range(FAN_OUT)))
+
+    assert calls == 1
+    assert all(results)
@@ -0,0 +1,54 @@
+import json
+
+import grpc
+import pytest
+
+from handlers.posts import _ndjson_response, _to_comment_response
+from proto.posts_service_pb2 import CommentResponse
+
+
+class FakeCall:
+    """Стрим, который отдаёт сообщения и затем падает с error (или заканчивается EOF)."""
+
+    def __init__(self, messages, error=None):
+        self.messages = list(messages)
+        self.error = error
+        self.cancelled = False
+
+    async def read(self):
+        if self.messages:
+            return self.messages.pop(0)
+        if self.error is not None:
+            raise self.error
+        return grpc.aio.EOF
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def comment(comment_id: str) -> CommentResponse:
+    return CommentResponse(comment_id=comment_id, post_id='post', commentator_user_id='user', content='text')
+
+
+async def read_lines(call: FakeCall) -> list:
+    response = _ndjson_response(call, await call.read(), _to_comment_response)
+    return [json.loads(line) async for line in response.body_iterator]
+
+
+@pytest.mark.asyncio
+async def test_complete_stream_has_no_error_line():
+    call = FakeCall([comment('a'), comment('b')])
+    lines = await read_lines(call)
+    assert [line['comment_id'] for line in lines] == ['a', 'b']
+    assert call.cancelled
+
+
+@pytest.mark.asyncio
+async def test_failure_after_first_line_ends_with_error_line():
+    error = grpc.aio.AioRpcError(grpc.StatusCode.UNAVAILABLE, grpc.aio.Metadata(), grpc.aio.Metadata(),
+                                 details='posts-grpc-service went away')
+    call = FakeCall([comment('a'), comment('b')], error)
+    lines = await read_lines(call)
+    assert [line.get('comment_id') for line in lines[:2]] == ['a', 'b']
+    assert lines[-1] == {'error': {'code': 'UNAVAILABLE', 'detail': 'posts-grpc-service went away'}}
+    assert call.cancelled
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+from utils.token_cache import TokenCache
+from utils.ttl_cache import TtlCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    clock = FakeClock()
+    cache = TtlCache(max_size=2, clock=clock)
+    cache.set('a', 1, ttl=10)
+    cache.set('b', 2, ttl=1)
+    assert cache.get('a') == 1
+
+    cache.set('c', 3, ttl=10)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    clock.now = 10
+    assert cache.get('a') is None
+    assert cache.get('c') is None
+
+
+def test_token_cache_positive_negative_and_invalidation():
+    cache = TokenCache(max_size=10, ttl=60, negative_ttl=2)
+    assert cache.get('token', 'user') is None
+
+    cache.set_valid('token', 'user')
+    cache.set_invalid('token', 'other-user')
+    assert cache.get('token', 'user') is True
+    assert cache.get('token', 'other-user') is False
+    assert cache.hits.value == 2
+    assert cache.misses.value == 1
+
+    cache.invalidate('token')
+    assert cache.get('token', 'user') is None
+    assert cache.get('token', 'other-user') is None
+
+
+def test_token_cache_ttl_is_capped_by_active_until():
+    cache = TokenCache(max_size=10, ttl=60, negative_ttl=2)
+    cache.set_valid('expired', 'user', datetime.now(timezone.utc) - timedelta(seconds=1))
+    cache.set_valid('alive', 'user', datetime.now(timezone.utc) + timedelta(hours=1))
+    assert cache.get('expired', 'user') is None
+    assert cache.get('alive', 'user') is True
@@ -0,0 +1,64 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import Response
+
+from handlers import posts
+from proto.posts_service_pb2 import PostResponse, PostVersionResponse
+from utils.etag import masked_post_etag
+
+
+class FakeStub:
+    """GetPost отвечает с задержкой, чтобы одновременные чтения успели склеиться."""
+
+    def __init__(self, is_private: bool = False):
+        self.post = PostResponse(post_id='post', creator_user_id='author', title='t', version=1, is_private=is_private)
+        self.get_post_calls = 0
+
+    async def GetPost(self, request):
+        self.get_post_calls += 1
+        await asyncio.sleep(0.01)
+        return self.post
+
+    async def GetPostVersion(self, request):
+        return PostVersionResponse(post_id='post', version=1, creator_user_id='author', is_private=self.post.is_private)
+
+
+async def get_post(stub: FakeStub, viewers, if_none_match=None) -> list:
+    views = []
+
+    async def valid_token(token, user_id):
+        return True
+
+    with patch.object(posts.posts_channel_pool, 'stub', lambda: stub), \
+            patch.object(posts, 'check_token', valid_token), \
+            patch.object(posts, 'emit', lambda event_type, **fields: views.append((event_type, fields))):
+        await asyncio.gather(*(
+            posts.get_post('post', Response(), None, viewer, 'token', if_none_match) for viewer in viewers
+        ))
+    return views
+
+
+@pytest.mark.asyncio
+async def test_coalesced_reads_count_every_viewer():
+    stub = FakeStub()
+    views = await get_post(stub, ['alice', 'bob', 'carol'])
+    assert stub.get_post_calls == 1
+    assert sorted(fields['user_id'] for _, fields in views) == ['alice', 'bob', 'carol']
+    assert {event_type for event_type, _ in views} == {'post_viewed'}
+
+
+@pytest.mark.asyncio
+async def test_not_modified_counts_a_view():
+    stub = FakeStub()
+    etag = masked_post_etag('post', 1, {}, None)
+    views = await get_post(stub, ['alice'], if_none_match=etag)
+    assert stub.get_post_calls == 0
+    assert views == [('post_viewed', {'post_id': 'post', 'user_id': 'alice'})]
+
+
+@pytest.mark.asyncio
+async def test_forbidden_read_is_not_a_view():
+    views = await get_post(FakeStub(is_private=True), ['mallory'])
+    assert views == []
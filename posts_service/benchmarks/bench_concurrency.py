@@ -0,0 +1,52 @@
+"""
+Пропускная способность posts-grpc-service в зависимости от числа RPC в полёте.
+Рост виден, пока время RPC уходит на ожидание Postgres (отдельный хост БД). Когда
+сервис и база делят одно ядро, а ListPosts считает точный total по большой таблице,
+пропускная способность упирается в CPU при любом числе RPC.
+
+Запуск (при поднятом docker-compose):
+    PYTHONPATH=src python benchmarks/bench_concurrency.py --target localhost:50051 --duration 5
+"""
+import argparse
+import asyncio
+import time
+
+import grpc
+
+from proto.posts_service_pb2 import ListPostsRequest
+from proto.posts_service_pb2_grpc import PostServiceStub
+
+
+async def measure(stub: PostServiceStub, in_flight: int, duration: float) -> float:
+    done = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            await stub.ListPosts(ListPostsRequest(page=1, per_page=10))
+            done += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(in_flight)))
+    return done / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--target', default='localhost:50051')
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--levels', default='1,2,4,8,16,32,64')
+    args = parser.parse_args()
+
+    async with grpc.aio.insecure_channel(args.target) as channel:
+        stub = PostServiceStub(channel)
+        baseline = None
+        for in_flight in map(int, args.levels.split(',')):
+            rps = await measure(stub, in_flight, args.duration)
+            baseline = baseline or rps
+            print(f'in-flight={in_flight:>3}: {rps:8.0f} rps  x{rps / baseline:.1f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
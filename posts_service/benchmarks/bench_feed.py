@@ -0,0 +1,208 @@
+"""
+Задержка чтения ленты: гибридный FeedStore против наивного запроса
+"посты всех подписок, слитые по времени" на синтетическом графе подписок.
+Популярность авторов распределена по Zipf, поэтому часть авторов уходит в pull.
+Пользователи генерируются из --seed, так что повторный запуск переиспользует посты.
+Ленты предрассчитываются только для замеряемых читателей.
+
+Запуск (на отдельной базе с применёнными миграциями):
+    POSTGRES_DSN=... POSTGRES_STATEMENT_TIMEOUT_MS=600000 PYTHONPATH=src:.. \
+        python benchmarks/bench_feed.py --users 10000 --posts 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from main_grpc import Database, post_columns
+from utils.feed import FeedStore
+from utils.follow_graph import LocalFollowGraph
+from utils.post_cache import ByteLruCache
+from utils.postgresql import create_pool
+
+
+def make_graph(users: list, follows: int, zipf: float, rng: random.Random) -> LocalFollowGraph:
+    graph = LocalFollowGraph()
+    weights = [1 / rank ** zipf for rank in range(1, len(users) + 1)]
+    for follower in users:
+        followees = [user for user in dict.fromkeys(rng.choices(users, weights=weights, k=follows * 2))
+                     if user != follower]
+        for followee in followees[:follows]:
+            graph.follow(follower, followee)
+    return graph
+
+
+async def fill(pool, users: list, target: int, batch: int):
+    async with pool.acquire() as conn:
+        existing = await conn.fetchval("SELECT count(*) FROM posts_data WHERE creator_user_id = ANY($1::uuid[])", users)
+        started = time.perf_counter()
+        while existing < target:
+            size = min(batch, target - existing)
+            await conn.execute(
+                """
+                    INSERT INTO posts_data (creator_user_id, title, content, created_at, is_private)
+                    SELECT
+                        ($1::uuid[])[1 + floor(random() * cardinality($1::uuid[]))::int],
+                        'post ' || g,
+                        repeat('feed ', 60),
+                        now() - random() * interval '365 days',
+                        random() < 0.05
+                    FROM generate_series(1, $2) AS g
+                """,
+                users, size,
+            )
+            existing += size
+            print(f'  inserted {existing:>9} posts  ({time.perf_counter() - started:6.0f}s)', flush=True)
+        await conn.execute("ANALYZE posts_data")
+
+
+async def backfill_feeds(pool, graph: LocalFollowGraph, readers: list, pull_authors: set, max_length: int):
+    """Ленты читателей такими, какими их собрал бы push: последние max_length постов обычных авторов."""
+    followers, followees = [], []
+    for reader in readers:
+        for followee in await graph.followees(reader):
+            if followee.user_id not in pull_authors:
+                followers.append(reader)
+                followees.append(followee.user_id)
+    async with pool.acquire() as conn:
+        await conn.execute("DELETE FROM feed_items WHERE user_id = ANY($1::uuid[])", readers)
+        await conn.execute(
+            """
+                INSERT INTO feed_items (user_id, created_at, post_id)
+                SELECT follower, created_at, post_id FROM (
+                    SELECT follows.follower, posts_data.created_at, posts_data.post_id,
+                           row_number() OVER (
+                               PARTITION BY follows.follower
+                               ORDER BY posts_data.created_at DESC, posts_data.post_id DESC
+                           ) AS position
+                    FROM unnest($1::uuid[], $2::uuid[]) AS follows(follower, followee)
+                    JOIN posts_data ON posts_data.creator_user_id = follows.followee
+                    WHERE posts_data.is_private = FALSE
+                ) AS ranked
+                WHERE position <= $3
+            """,
+            followers, followees, max_length,
+        )
+        await conn.execute("ANALYZE feed_items")
+
+
+def percentile(values: list, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def report(name: str, latencies: list, elapsed: float, extra: str = ''):
+    print(
+        f'{name:>28}: n={len(latencies):>5}  p50={statistics.median(latencies):7.2f}ms  '
+        f'p95={percentile(latencies, 0.95):7.2f}ms  p99={percentile(latencies, 0.99):7.2f}ms  '
+        f'{len(latencies) / elapsed:7.0f} req/s{extra}'
+    )
+
+
+async def naive_page(pool, followees: list, per_page: int, after, columns: str):
+    after_created_at, after_post_id = after or (None, None)
+    async with pool.acquire() as conn:
+        return await conn.fetch(
+            f"""
+                SELECT {columns} FROM posts_data
+                WHERE creator_user_id = ANY($1::uuid[]) AND is_private = FALSE
+                  AND ($2::timestamp IS NULL OR (created_at, post_id) < ($2::timestamp, $3::uuid))
+                ORDER BY created_at DESC, post_id DESC
+                LIMIT $4
+            """,
+            followees, after_created_at, after_post_id, per_page,
+        )
+
+
+async def measure(name: str, read, readers: list, pages: int, concurrency: int):
+    latencies = []
+    queue = list(readers)
+
+    async def worker():
+        while queue:
+            reader = queue.pop()
+            after = None
+            for _ in range(pages):
+                started = time.perf_counter()
+                posts = await read(reader, after)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if not posts:
+                    break
+                after = (posts[-1]['created_at'], posts[-1]['post_id'])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    report(f'{name} x{concurrency}', latencies, time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--follows', type=int, default=100, help='подписок у каждого пользователя')
+    parser.add_argument('--zipf', type=float, default=1.0)
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--readers', type=int, default=500)
+    parser.add_argument('--pull-min-followers', type=int, default=2_000)
+    parser.add_argument('--max-length', type=int, default=800)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=1, help='сколько страниц курсора читать на читателя')
+    parser.add_argument('--concurrency', default='1,16')
+    parser.add_argument('--fanout-posts', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    users = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(args.users)]
+    graph = make_graph(users, args.follows, args.zipf, rng)
+    counts = {user: (await graph.followers(user, None, 1)).followers_count for user in users}
+    pull_authors = {user for user, count in counts.items() if count >= args.pull_min_followers}
+    print(f'graph: {args.users} users, {sum(counts.values())} follows, {len(pull_authors)} pull authors, '
+          f'max followers {max(counts.values())}')
+
+    pool = await create_pool()
+    try:
+        await fill(pool, users, args.posts, args.batch)
+        readers = rng.sample(users, args.readers)
+        started = time.perf_counter()
+        await backfill_feeds(pool, graph, readers, pull_authors, args.max_length)
+        print(f'backfilled {len(readers)} feeds in {time.perf_counter() - started:.1f}s')
+
+        feed = FeedStore(pool, graph, ByteLruCache(64 << 20, 1 << 20, 3600),
+                         pull_min_followers=args.pull_min_followers, max_length=args.max_length)
+        db = Database(pool)
+        columns = post_columns()
+
+        # Стоимость записи: раскладка новых постов обычных авторов по лентам подписчиков
+        authors = [user for user in users if user not in pull_authors and counts[user]]
+        latencies, written = [], 0
+        fanout_started = time.perf_counter()
+        for author in rng.sample(authors, min(args.fanout_posts, len(authors))):
+            post_id = str(uuid.uuid4())
+            post = await db.create_post(post_id, author, 'new', 'fresh', False, [])
+            started = time.perf_counter()
+            written += await feed.fan_out(author, post_id, post['created_at'])
+            latencies.append((time.perf_counter() - started) * 1000)
+        report('fan-out on write', latencies, time.perf_counter() - fanout_started,
+               f'  avg_followers={written / len(latencies):.0f}')
+
+        followees = {reader: [followee.user_id for followee in await graph.followees(reader)] for reader in readers}
+        for concurrency in map(int, args.concurrency.split(',')):
+            await measure(
+                'naive multi-author', lambda reader, after: naive_page(
+                    pool, followees[reader], args.per_page, after, columns),
+                readers, args.pages, concurrency,
+            )
+            await measure(
+                'hybrid feed', lambda reader, after: feed.read_page(
+                    uuid.UUID(reader), args.per_page, columns, after),
+                readers, args.pages, concurrency,
+            )
+    finally:
+        await pool.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
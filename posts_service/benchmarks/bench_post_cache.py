@@ -0,0 +1,78 @@
+"""
+Доля попаданий и пропускная способность PostCache на Zipf-распределённом чтении.
+Postgres заменён фиксированной задержкой, чтобы измерять именно кэш.
+L2 здесь LocalRedis без ограничения размера, поэтому строка «L1 1% + L2» — потолок
+доли попаданий: промахи в ней только холодные.
+
+Запуск:
+    PYTHONPATH=src:.. python benchmarks/bench_post_cache.py --posts 100000 --reads 200000 --zipf 1.1
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+import uuid
+
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from proto.posts_service_pb2 import PostResponse
+from utils.post_cache import ByteLruCache, LocalRedis, PostCache
+
+
+def make_post(post_id: str, content_size: int) -> bytes:
+    now = Timestamp()
+    now.GetCurrentTime()
+    return PostResponse(
+        post_id=post_id,
+        title='title',
+        content='x' * content_size,
+        creator_user_id=str(uuid.uuid4()),
+        created_at=now,
+        updated_at=now,
+        tags=['bench'],
+    ).SerializeToString()
+
+
+async def run(name: str, cache: PostCache, post_ids, payloads, reads, db_latency: float):
+    started = time.perf_counter()
+    for post_id in reads:
+        if await cache.get(post_id) is None:
+            await asyncio.sleep(db_latency)
+            await cache.set(post_id, payloads[post_id])
+    elapsed = time.perf_counter() - started
+    print(
+        f'{name:>24}: hit_ratio={cache.hit_ratio():.3f}  '
+        f'evictions={cache.l1.evictions:>7}  {len(reads) / elapsed:9.0f} reads/s'
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--reads', type=int, default=200_000)
+    parser.add_argument('--zipf', type=float, default=1.1)
+    parser.add_argument('--content-size', type=int, default=2_000)
+    parser.add_argument('--db-latency-ms', type=float, default=0.5)
+    args = parser.parse_args()
+
+    post_ids = [str(uuid.uuid4()) for _ in range(args.posts)]
+    payloads = {post_id: make_post(post_id, args.content_size) for post_id in post_ids}
+    weights = list(itertools.accumulate(1 / rank ** args.zipf for rank in range(1, args.posts + 1)))
+    reads = random.choices(post_ids, cum_weights=weights, k=args.reads)
+    item_size = len(next(iter(payloads.values())))
+    db_latency = args.db_latency_ms / 1000
+
+    for share in (0.01, 0.05, 0.2):
+        max_bytes = int(args.posts * share) * item_size
+        cache = PostCache(ByteLruCache(max_bytes, max_bytes, ttl=3600))
+        await run(f'L1 {share:.0%} of posts', cache, post_ids, payloads, reads, db_latency)
+
+    l2 = LocalRedis()
+    max_bytes = int(args.posts * 0.01) * item_size
+    cache = PostCache(ByteLruCache(max_bytes, max_bytes, ttl=3600), l2)
+    await run('L1 1% + L2', cache, post_ids, payloads, reads, db_latency)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""
+Распределение задержек SearchPosts на синтетическом корпусе.
+Недостающие до --posts посты генерируются прямо в Postgres: слова из словаря
+выбираются со скошенным распределением, поэтому есть и редкие, и очень частые термы.
+
+Запуск (на отдельной базе: посты остаются в posts_data):
+    POSTGRES_DSN=... PYTHONPATH=src:.. python benchmarks/bench_search.py --posts 1000000 --queries 200
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import time
+import uuid
+
+from main_grpc import Database
+from utils.postgresql import create_pool
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'to', 'sa', 'vi', 'de', 'po', 'zu', 'ra', 'ki', 'mo', 'te', 'li']
+VOCABULARY_SIZE = 20_000
+WORDS_PER_POST = 40
+# Чем больше, тем сильнее перекос к началу словаря
+SKEW = 3
+
+
+def make_vocabulary() -> list:
+    words = (''.join(parts) for parts in itertools.product(SYLLABLES, repeat=4))
+    return list(itertools.islice(words, VOCABULARY_SIZE))
+
+
+async def fill(pool, target: int, vocabulary: list, batch: int):
+    async with pool.acquire() as conn:
+        existing = await conn.fetchval("SELECT count(*) FROM posts_data")
+        started = time.perf_counter()
+        while existing < target:
+            size = min(batch, target - existing)
+            # g в подзапросе не даёт Postgres вычислить текст один раз на всю пачку
+            await conn.execute(
+                f"""
+                    INSERT INTO posts_data (post_id, creator_user_id, title, content, is_private, tags)
+                    SELECT
+                        gen_random_uuid(),
+                        $2::uuid,
+                        array_to_string(ARRAY(
+                            SELECT ($1::text[])[1 + floor({VOCABULARY_SIZE} * power(random(), {SKEW}))::int]
+                            FROM generate_series(1, 4 + g % 1)
+                        ), ' '),
+                        array_to_string(ARRAY(
+                            SELECT ($1::text[])[1 + floor({VOCABULARY_SIZE} * power(random(), {SKEW}))::int]
+                            FROM generate_series(1, {WORDS_PER_POST} + g % 1)
+                        ), ' '),
+                        random() < 0.1,
+                        NULL
+                    FROM generate_series(1, $3) AS g
+                """,
+                vocabulary, uuid.uuid4(), size,
+            )
+            existing += size
+            print(f'  inserted {existing:>9} posts  ({time.perf_counter() - started:6.0f}s)', flush=True)
+        await conn.execute("ANALYZE posts_data")
+
+
+def percentile(values: list, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+async def measure(db: Database, name: str, queries: list, per_page: int, pages: int):
+    latencies, hits = [], []
+    for query in queries:
+        after = None
+        for _ in range(pages):
+            started = time.perf_counter()
+            records = await db.search_posts(query, None, per_page, after)
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits.append(len(records))
+            if len(records) < per_page:
+                break
+            after = (records[-1]['rank'], records[-1]['post_id'])
+    print(
+        f'{name:>18}: n={len(latencies):>4}  p50={statistics.median(latencies):7.1f}ms  '
+        f'p95={percentile(latencies, 0.95):7.1f}ms  p99={percentile(latencies, 0.99):7.1f}ms  '
+        f'max={max(latencies):7.1f}ms  avg_hits={statistics.mean(hits):5.1f}'
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=1, help='сколько страниц курсора читать на запрос')
+    parser.add_argument('--batch', type=int, default=50_000)
+    args = parser.parse_args()
+
+    vocabulary = make_vocabulary()
+    pool = await create_pool()
+    try:
+        await fill(pool, args.posts, vocabulary, args.batch)
+        db = Database(pool)
+
+        def words(ranks: range, count: int) -> list:
+            return [vocabulary[random.choice(ranks)] for _ in range(count)]
+
+        n = args.queries
+        # Частота слова в корпусе убывает с его номером в словаре
+        await measure(db, 'rare term', words(range(15_000, VOCABULARY_SIZE), n), args.per_page, args.pages)
+        await measure(db, 'medium term', words(range(2_000, 5_000), n), args.per_page, args.pages)
+        await measure(db, 'frequent term', words(range(0, 50), n), args.per_page, args.pages)
+        await measure(
+            db, 'two terms (AND)',
+            [' '.join(pair) for pair in zip(words(range(200, 2_000), n), words(range(200, 2_000), n))],
+            args.per_page, args.pages,
+        )
+        await measure(
+            db, 'term OR term',
+            [' or '.join(pair) for pair in zip(words(range(2_000, 5_000), n), words(range(2_000, 5_000), n))],
+            args.per_page, args.pages,
+        )
+    finally:
+        await pool.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,5 @@
+QUERY='''
+CREATE INDEX IF NOT EXISTS idx_posts_public_created
+    ON posts_data (created_at DESC, post_id DESC)
+    WHERE is_private = FALSE;
+'''
@@ -0,0 +1,47 @@
+QUERY='''
+-- Счётчик разбит на шарды, чтобы конкурентные вставки не упирались в одну строку
+CREATE TABLE posts_counters (
+    name VARCHAR(64) NOT NULL,
+    shard SMALLINT NOT NULL,
+    value BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, shard)
+);
+
+INSERT INTO posts_counters (name, shard, value)
+SELECT
+    'public_posts',
+    shard,
+    CASE WHEN shard = 0 THEN (SELECT count(*) FROM posts_data WHERE is_private = FALSE) ELSE 0 END
+FROM generate_series(0, 15) AS shard;
+
+CREATE FUNCTION posts_counters_bump(counter_name VARCHAR, delta BIGINT) RETURNS void AS $$
+DECLARE
+    target_shard SMALLINT := floor(random() * 16);
+BEGIN
+    UPDATE posts_counters
+    SET value = value + delta
+    WHERE name = counter_name AND shard = target_shard;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION posts_data_count_public() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF NOT NEW.is_private THEN
+            PERFORM posts_counters_bump('public_posts', 1);
+        END IF;
+    ELSIF TG_OP = 'DELETE' THEN
+        IF NOT OLD.is_private THEN
+            PERFORM posts_counters_bump('public_posts', -1);
+        END IF;
+    ELSIF OLD.is_private <> NEW.is_private THEN
+        PERFORM posts_counters_bump('public_posts', CASE WHEN NEW.is_private THEN -1 ELSE 1 END);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER posts_data_count_public
+AFTER INSERT OR DELETE OR UPDATE OF is_private ON posts_data
+FOR EACH ROW EXECUTE FUNCTION posts_data_count_public();
+'''
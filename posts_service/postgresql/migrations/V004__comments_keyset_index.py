@@ -0,0 +1,8 @@
+QUERY='''
+CREATE INDEX IF NOT EXISTS idx_comments_post_created
+    ON comments_data (post_id, created_at DESC, comment_id DESC)
+    INCLUDE (commentator_user_id);
+
+-- Префикс нового индекса, отдельно больше не нужен
+DROP INDEX IF EXISTS idx_comments_post;
+'''
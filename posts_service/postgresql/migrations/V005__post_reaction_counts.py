@@ -0,0 +1,37 @@
+QUERY='''
+-- Одна реакция каждого типа от пользователя на пост
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reactions_post_user_type
+    ON reactions_data (post_id, user_id, reaction_type);
+
+-- Префикс уникального индекса, отдельно больше не нужен
+DROP INDEX IF EXISTS idx_reactions_post;
+
+CREATE TABLE post_reaction_counts (
+    post_id UUID NOT NULL REFERENCES posts_data(post_id) ON DELETE CASCADE,
+    reaction_type VARCHAR(50) NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (post_id, reaction_type)
+);
+
+INSERT INTO post_reaction_counts (post_id, reaction_type, count)
+SELECT post_id, reaction_type, count(*) FROM reactions_data GROUP BY post_id, reaction_type;
+
+CREATE FUNCTION reactions_data_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO post_reaction_counts (post_id, reaction_type, count)
+        VALUES (NEW.post_id, NEW.reaction_type, 1)
+        ON CONFLICT (post_id, reaction_type) DO UPDATE SET count = post_reaction_counts.count + 1;
+    ELSE
+        UPDATE post_reaction_counts
+        SET count = count - 1
+        WHERE post_id = OLD.post_id AND reaction_type = OLD.reaction_type;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reactions_data_count
+AFTER INSERT OR DELETE ON reactions_data
+FOR EACH ROW EXECUTE FUNCTION reactions_data_count();
+'''
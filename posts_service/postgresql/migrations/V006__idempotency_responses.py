@@ -0,0 +1,7 @@
+QUERY='''
+-- Ответ хранится как сериализованный protobuf; NULL, пока запрос выполняется
+ALTER TABLE idempotency_data ALTER COLUMN payload TYPE BYTEA USING convert_to(payload, 'UTF8');
+ALTER TABLE idempotency_data ADD COLUMN request_hash BYTEA;
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_created ON idempotency_data (created_at);
+'''
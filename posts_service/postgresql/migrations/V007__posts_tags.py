@@ -0,0 +1,46 @@
+QUERY='''
+-- Операторы && и @> по массиву тегов идут через этот индекс
+CREATE INDEX IF NOT EXISTS idx_posts_tags ON posts_data USING GIN (tags);
+
+-- Сколько публичных постов с каждым тегом; повторы тега внутри поста не считаются
+CREATE TABLE post_tag_counts (
+    tag TEXT PRIMARY KEY,
+    count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX idx_post_tag_counts_top ON post_tag_counts (count DESC, tag);
+
+INSERT INTO post_tag_counts (tag, count)
+SELECT tag, count(*)
+FROM posts_data, LATERAL (SELECT DISTINCT unnest(tags) AS tag) AS post_tags
+WHERE is_private = FALSE
+GROUP BY tag;
+
+CREATE FUNCTION posts_data_count_tags() RETURNS trigger AS $$
+DECLARE
+    old_tags TEXT[] := '{}';
+    new_tags TEXT[] := '{}';
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND NOT OLD.is_private THEN
+        old_tags := COALESCE(OLD.tags, '{}');
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') AND NOT NEW.is_private THEN
+        new_tags := COALESCE(NEW.tags, '{}');
+    END IF;
+
+    -- В порядке тегов, чтобы конкурентные вставки брали блокировки строк одинаково
+    INSERT INTO post_tag_counts (tag, count)
+    SELECT tag, 1 FROM (SELECT unnest(new_tags) EXCEPT SELECT unnest(old_tags)) AS added(tag)
+    ORDER BY tag
+    ON CONFLICT (tag) DO UPDATE SET count = post_tag_counts.count + 1;
+
+    UPDATE post_tag_counts SET count = count - 1
+    WHERE tag IN (SELECT unnest(old_tags) EXCEPT SELECT unnest(new_tags));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER posts_data_count_tags
+AFTER INSERT OR DELETE OR UPDATE OF tags, is_private ON posts_data
+FOR EACH ROW EXECUTE FUNCTION posts_data_count_tags();
+'''
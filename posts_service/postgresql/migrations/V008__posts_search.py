@@ -0,0 +1,11 @@
+QUERY='''
+-- Конфигурация russian стеммит и кириллицу, и латиницу (asciiword идёт в english_stem).
+-- STORED: вектор считается при записи, поиск не пересчитывает его по content.
+-- ADD COLUMN ... STORED переписывает таблицу, на большой базе запускать в окно обслуживания.
+ALTER TABLE posts_data ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('russian', title), 'A') ||
+    setweight(to_tsvector('russian', content), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_posts_search ON posts_data USING GIN (search_vector);
+'''
@@ -0,0 +1,10 @@
+QUERY='''
+-- Страница профиля: посты автора по убыванию даты. is_private в INCLUDE,
+-- чтобы чужие приватные посты отсеивались по индексу без чтения строки.
+CREATE INDEX IF NOT EXISTS idx_posts_creator_created
+    ON posts_data (creator_user_id, created_at DESC, post_id DESC)
+    INCLUDE (is_private);
+
+-- Префикс нового индекса, отдельно больше не нужен
+DROP INDEX IF EXISTS idx_posts_creator;
+'''
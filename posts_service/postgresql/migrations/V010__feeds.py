@@ -0,0 +1,12 @@
+QUERY='''
+-- Предрассчитанные ленты (fan-out on write): пост обычного автора дописывается в ленту
+-- каждого подписчика. Ключ совпадает с порядком чтения, страница ленты — диапазон индекса.
+-- Внешнего ключа на posts_data нет: удаление поста не должно обходить ленты всех
+-- подписчиков, удалённые посты отсеиваются join при чтении и уходят при обрезке ленты.
+CREATE TABLE feed_items (
+    user_id UUID NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    post_id UUID NOT NULL,
+    PRIMARY KEY (user_id, created_at, post_id)
+);
+'''
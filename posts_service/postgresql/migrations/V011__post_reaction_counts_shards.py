@@ -0,0 +1,31 @@
+QUERY='''
+-- Счётчик реакции разбит на шарды, как posts_counters: лайки популярного поста
+-- не выстраиваются в очередь за блокировкой одной строки (post_id, reaction_type).
+-- Шард выбирается случайно и создаётся при первой записи; значение шарда может уйти
+-- в минус после удалений, верна только сумма по шардам.
+ALTER TABLE post_reaction_counts ADD COLUMN shard SMALLINT NOT NULL DEFAULT 0;
+ALTER TABLE post_reaction_counts DROP CONSTRAINT post_reaction_counts_pkey;
+ALTER TABLE post_reaction_counts ADD PRIMARY KEY (post_id, reaction_type, shard);
+
+CREATE OR REPLACE FUNCTION reactions_data_count() RETURNS trigger AS $$
+DECLARE
+    target_shard SMALLINT := floor(random() * 16);
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO post_reaction_counts (post_id, reaction_type, shard, count)
+        VALUES (NEW.post_id, NEW.reaction_type, target_shard, 1)
+        ON CONFLICT (post_id, reaction_type, shard) DO UPDATE SET count = post_reaction_counts.count + 1;
+    ELSE
+        -- Реакции удалённого поста уходят каскадом вместе с его счётчиками: новый шард
+        -- для несуществующего поста нарушил бы внешний ключ
+        IF NOT EXISTS (SELECT 1 FROM posts_data WHERE post_id = OLD.post_id) THEN
+            RETURN NULL;
+        END IF;
+        INSERT INTO post_reaction_counts (post_id, reaction_type, shard, count)
+        VALUES (OLD.post_id, OLD.reaction_type, target_shard, -1)
+        ON CONFLICT (post_id, reaction_type, shard) DO UPDATE SET count = post_reaction_counts.count - 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+'''
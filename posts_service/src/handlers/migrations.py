@@ -1,5 +1,17 @@
 from fastapi import APIRouter
-from postgresql.migrations import V001__init_migration
+from postgresql.migrations import (
+    V001__init_migration,
+    V002__posts_keyset_index,
+    V003__posts_counters,
+    V004__comments_keyset_index,
+    V005__post_reaction_counts,
+    V006__idempotency_responses,
+    V007__posts_tags,
+    V008__posts_search,
+    V009__posts_author_index,
+    V010__feeds,
+    V011__post_reaction_counts_shards,
+)
 from utils.postgresql import connect, execute_query, Connection
 
 router = APIRouter()
@@ -7,6 +19,16 @@ router = APIRouter()
 
 migrations = {
     1: V001__init_migration.QUERY,
+    2: V002__posts_keyset_index.QUERY,
+    3: V003__posts_counters.QUERY,
+    4: V004__comments_keyset_index.QUERY,
+    5: V005__post_reaction_counts.QUERY,
+    6: V006__idempotency_responses.QUERY,
+    7: V007__posts_tags.QUERY,
+    8: V008__posts_search.QUERY,
+    9: V009__posts_author_index.QUERY,
+    10: V010__feeds.QUERY,
+    11: V011__post_reaction_counts_shards.QUERY,
 }
 
 
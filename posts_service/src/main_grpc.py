@@ -1,15 +1,17 @@
 # posts_service/main.py
+import json
 import logging
+import os
 import uuid
 from datetime import datetime
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 import asyncpg
 import grpc
+from google.protobuf.field_mask_pb2 import FieldMask
 from google.protobuf.timestamp_pb2 import Timestamp
 import asyncio
 from grpc_reflection.v1alpha import reflection
-from sqlalchemy import delete, func, select, update
 from proto.posts_service_pb2 import (
     CreatePostRequest,
     GetPostRequest,
@@ -19,174 +21,944 @@ from proto.posts_service_pb2 import (
     PostResponse,
     ListPostsResponse,
     DeletePostResponse,
+    DeletePostsRequest,
+    DeletePostsResponse,
+    TotalMode,
+    BatchGetPostsRequest,
+    BatchGetPostsResponse,
+    StreamPostsRequest,
+    PostVersionResponse,
+    CreateCommentRequest,
+    ListCommentsRequest,
+    ListCommentsResponse,
+    StreamCommentsRequest,
+    CommentResponse,
+    ReactionRequest,
+    ReactionResponse,
+    TopTagsRequest,
+    TopTagsResponse,
+    TagCount,
+    SearchPostsRequest,
+    SearchPostsResponse,
+    SearchHit,
+    ListPostsByAuthorRequest,
+    ListPostsByAuthorResponse,
+    GetFeedRequest,
+    GetFeedResponse,
     DESCRIPTOR,
 )
 from proto.posts_service_pb2_grpc import PostServiceServicer, add_PostServiceServicer_to_server
-from utils.postgresql import *
+from shared.events import EventProducer, create_event_producer
+from shared.metrics import registry, serve_metrics
+from utils.page_token import (
+    InvalidPageToken,
+    decode_page_token,
+    decode_search_token,
+    encode_page_token,
+    encode_search_token,
+)
+from utils.feed import FeedStore, create_feed_store
+from utils.idempotency import IdempotencyStore, create_idempotency_store, idempotent
+from utils.post_cache import PostCache, create_post_cache
+from utils.postgresql import create_pool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MAX_BATCH_SIZE = 100
+DEFAULT_STREAM_CHUNK_SIZE = 500
+DEFAULT_COMMENTS_PAGE_SIZE = 20
+MAX_COMMENTS_PAGE_SIZE = 100
+MAX_REACTION_TYPE_LENGTH = 50
+MAX_TAG_FILTERS = 20
+DEFAULT_TOP_TAGS_LIMIT = 10
+UPDATABLE_FIELDS = ('title', 'content', 'is_private', 'tags')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9100))
+
+# Счётчики реакций агрегированы триггером по шардам (V011): здесь шарды складываются
+# и собираются в один jsonb. Это не больше 16 строк индекса на тип реакции
+REACTION_COUNTS = """
+    COALESCE((
+        SELECT jsonb_object_agg(reaction_type, count) FROM (
+            SELECT reaction_type, sum(count)::bigint AS count FROM post_reaction_counts
+            WHERE post_reaction_counts.post_id = posts_data.post_id
+            GROUP BY reaction_type
+            HAVING sum(count) > 0
+        ) AS counts
+    ), '{}') AS reaction_counts
+"""
+# Явный список вместо posts_data.*: search_vector не нужен клиентам и не должен ездить по сети
+POST_FIELDS = (
+    'post_id', 'creator_user_id', 'title', 'content', 'version',
+    'created_at', 'updated_at', 'is_private', 'tags',
+)
+CONTENT_PREVIEW_LENGTH = int(os.getenv('CONTENT_PREVIEW_LENGTH', 280))
+# SQL для каждого поля, которое можно запросить через read_mask.
+# substr, а не left: left распаковывает TOAST целиком, substr читает только начало несжатого значения
+READ_MASK_COLUMNS = {
+    **{field: f'posts_data.{field}' for field in POST_FIELDS},
+    'reaction_counts': REACTION_COUNTS,
+    'content_preview': f'substr(posts_data.content, 1, {CONTENT_PREVIEW_LENGTH}) AS content_preview',
+}
+# Нужны для проверки доступа, курсора и ETag, поэтому читаются при любой маске
+ALWAYS_READ_FIELDS = ('post_id', 'creator_user_id', 'is_private', 'created_at', 'version')
+FULL_POST_FIELDS = (*POST_FIELDS, 'reaction_counts')
+# Для карточек в профиле: без content, чтобы не поднимать из TOAST и не гонять тела постов
+SUMMARY_POST_FIELDS = tuple(field for field in FULL_POST_FIELDS if field != 'content')
+
+
+def post_columns(fields: Sequence[str] = FULL_POST_FIELDS) -> str:
+    return ', '.join(READ_MASK_COLUMNS[field] for field in fields)
+
+
+POST_COLUMNS = post_columns()
+SEARCH_CONFIG = 'russian'
+SEARCH_HEADLINE_OPTIONS = 'MaxFragments=2, MinWords=5, MaxWords=20, StartSel=<b>, StopSel=</b>'
+DEFAULT_SEARCH_PAGE_SIZE = 20
+DEFAULT_AUTHOR_PAGE_SIZE = 20
+DEFAULT_FEED_PAGE_SIZE = 20
+
 class Database:
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+
     async def create_post(self, post_id: str, creator_user_id: str, title: str, content: str, 
-                         is_private: bool, tags: List[str]) -> None:
-        with connect() as conn:
-            with conn.begin():
-                query = text("""
+                         is_private: bool, tags: List[str]) -> asyncpg.Record:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchrow(
+                f"""
                     INSERT INTO posts_data 
                     (post_id, creator_user_id, title, content, is_private, tags)
-                    VALUES (:post_id, :creator_user_id, :title, :content, :is_private, :tags)
-                    RETURNING *
-                """)
-                return conn.execute(
-                    query,
-                    {
-                        "post_id": str(post_id),
-                        "creator_user_id": str(creator_user_id),
-                        "title": title,
-                        "content": content,
-                        "is_private": is_private,
-                        "tags": tags
-                    }
-                ).fetchone()
-
-    async def get_post(self, post_id: str) -> asyncpg.Record:
-        with connect() as conn:
-            query = select(text("*")).select_from(text("posts_data")).where(text("post_id = :post_id"))
-            result = conn.execute(query, {"post_id": str(post_id)})
-            return result.fetchone()
-
-    async def update_post(self, post_id: str, title: str, content: str, 
-                          is_private: bool, tags: List[str]) -> None:
-        with connect() as conn:
-            with conn.begin():
-                stmt = """
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    RETURNING {POST_COLUMNS}
+                """,
+                str(post_id), str(creator_user_id), title, content, is_private, tags,
+            )
+
+    async def get_post(self, post_id: str, columns: str = POST_COLUMNS) -> asyncpg.Record:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchrow(f"SELECT {columns} FROM posts_data WHERE post_id = $1", str(post_id))
+
+    async def get_post_version(self, post_id: str) -> asyncpg.Record:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchrow(
+                f"""
+                    SELECT post_id, version, creator_user_id, is_private, {REACTION_COUNTS}
+                    FROM posts_data WHERE post_id = $1
+                """,
+                str(post_id),
+            )
+
+    async def get_posts(self, post_ids: List[uuid.UUID]) -> List[asyncpg.Record]:
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(f"SELECT {POST_COLUMNS} FROM posts_data WHERE post_id = ANY($1::uuid[])", post_ids)
+
+    async def update_post(self, post_id: str, fields: Dict[str, Any], expected_version: int = 0) -> asyncpg.Record:
+        """
+        Меняет только колонки из fields. Версия сверяется в том же UPDATE:
+        при несовпадении, как и при отсутствии поста, возвращается None.
+        """
+        assignments = [f'{column} = ${i}' for i, column in enumerate(fields, start=3)]
+        async with self.pool.acquire() as conn:
+            return await conn.fetchrow(
+                f"""
                     UPDATE posts_data
                     SET
-                        title = :title,
-                        content = :content,
-                        is_private = :is_private,
-                        tags = :tags
-                    WHERE post_id = :post_id
+                        {', '.join(assignments + ['version = version + 1', 'updated_at = CURRENT_TIMESTAMP'])}
+                    WHERE post_id = $1 AND ($2 = 0 OR version = $2)
+                    RETURNING {POST_COLUMNS}
+                """,
+                str(post_id), expected_version, *fields.values(),
+            )
+
+    async def delete_post(self, post_id: uuid.UUID, user_id: uuid.UUID) -> asyncpg.Record:
+        """
+        Удаляет пост, только если он принадлежит user_id. Одним запросом возвращает
+        found и deleted, чтобы отличить отсутствующий пост от чужого без чтения строки.
+        """
+        async with self.pool.acquire() as conn:
+            return await conn.fetchrow(
+                """
+                    WITH target AS (
+                        SELECT post_id FROM posts_data WHERE post_id = $1
+                    ), deleted AS (
+                        DELETE FROM posts_data
+                        WHERE post_id = $1 AND creator_user_id = $2
+                        RETURNING post_id
+                    )
+                    SELECT
+                        EXISTS (SELECT 1 FROM target) AS found,
+                        EXISTS (SELECT 1 FROM deleted) AS deleted
+                """,
+                post_id, user_id,
+            )
+
+    async def delete_posts(self, post_ids: List[uuid.UUID], user_id: uuid.UUID) -> List[asyncpg.Record]:
+        """Пакетный вариант delete_post: строка (post_id, deleted) на каждый существующий пост."""
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(
+                """
+                    WITH target AS (
+                        SELECT post_id FROM posts_data WHERE post_id = ANY($1::uuid[])
+                    ), deleted AS (
+                        DELETE FROM posts_data
+                        WHERE post_id = ANY($1::uuid[]) AND creator_user_id = $2
+                        RETURNING post_id
+                    )
+                    SELECT target.post_id, deleted.post_id IS NOT NULL AS deleted
+                    FROM target LEFT JOIN deleted USING (post_id)
+                """,
+                post_ids, user_id,
+            )
+
+    async def list_posts(self, page: int, per_page: int, tags_any: List[str] = (),
+                         tags_all: List[str] = (), columns: str = POST_COLUMNS) -> List[asyncpg.Record]:
+        args = [per_page, (max(page, 1) - 1) * per_page]
+        conditions = ["is_private = FALSE", *self._tag_conditions(tags_any, tags_all, args)]
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(
+                f"""
+                    SELECT {columns} FROM posts_data
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY created_at DESC, post_id DESC
+                    LIMIT $1
+                    OFFSET $2
+                """,
+                *args,
+            )
+
+    async def list_posts_after(self, created_at: datetime, post_id: uuid.UUID, per_page: int,
+                               tags_any: List[str] = (), tags_all: List[str] = (),
+                               columns: str = POST_COLUMNS) -> List[asyncpg.Record]:
+        args = [created_at, post_id, per_page]
+        conditions = ["is_private = FALSE", *self._tag_conditions(tags_any, tags_all, args)]
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(
+                f"""
+                    SELECT {columns} FROM posts_data
+                    WHERE {' AND '.join(conditions)}
+                      AND (created_at, post_id) < ($1, $2)
+                    ORDER BY created_at DESC, post_id DESC
+                    LIMIT $3
+                """,
+                *args,
+            )
+
+    async def list_posts_by_author(self, creator_user_id: uuid.UUID, include_private: bool, per_page: int,
+                                   after: Optional[Tuple[datetime, uuid.UUID]] = None,
+                                   columns: str = POST_COLUMNS) -> List[asyncpg.Record]:
+        after_created_at, after_post_id = after or (None, None)
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(
+                f"""
+                    SELECT {columns} FROM posts_data
+                    WHERE creator_user_id = $1
+                      AND ($2 OR is_private = FALSE)
+                      AND ($3::timestamp IS NULL OR (created_at, post_id) < ($3::timestamp, $4::uuid))
+                    ORDER BY created_at DESC, post_id DESC
+                    LIMIT $5
+                """,
+                creator_user_id, include_private, after_created_at, after_post_id, per_page,
+            )
+
+    @staticmethod
+    def _tag_conditions(tags_any: List[str], tags_all: List[str], args: list) -> List[str]:
+        """Условия по тегам в форме, которую умеет GIN-индекс idx_posts_tags; параметры дописываются в args."""
+        conditions = []
+        if tags_any:
+            args.append(list(tags_any))
+            conditions.append(f"tags && ${len(args)}::text[]")
+        if tags_all:
+            args.append(list(tags_all))
+            conditions.append(f"tags @> ${len(args)}::text[]")
+        return conditions
+
+    async def stream_posts(self, creator_user_id: Optional[uuid.UUID], tag: str, include_private: bool,
+                           chunk_size: int, tags_any: List[str] = (),
+                           tags_all: List[str] = ()) -> AsyncIterator[asyncpg.Record]:
+        conditions, args = [], []
+        if creator_user_id:
+            args.append(creator_user_id)
+            conditions.append(f"creator_user_id = ${len(args)}")
+        if tag:
+            tags_all = [*tags_all, tag]
+        conditions.extend(self._tag_conditions(tags_any, tags_all, args))
+        if not include_private:
+            conditions.append("is_private = FALSE")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        async with self.pool.acquire() as conn:
+            # Курсор живёт только внутри транзакции; строки читаются пачками по chunk_size
+            async with conn.transaction(readonly=True):
+                query = f"SELECT {POST_COLUMNS} FROM posts_data {where} ORDER BY created_at DESC, post_id DESC"
+                async for record in conn.cursor(query, *args, prefetch=chunk_size):
+                    yield record
+
+    async def search_posts(self, query: str, viewer_user_id: Optional[uuid.UUID], per_page: int,
+                           after: Optional[Tuple[float, uuid.UUID]] = None) -> List[asyncpg.Record]:
+        """
+        Ранжирование требует rank для всех совпадений, поэтому сначала отбираются только
+        post_id и rank, а колонки поста и ts_headline считаются для одной страницы.
+        """
+        after_rank, after_post_id = after or (None, None)
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(
+                f"""
+                    WITH query AS (
+                        SELECT websearch_to_tsquery('{SEARCH_CONFIG}', $1) AS q
+                    ), ranked AS (
+                        SELECT posts_data.post_id, ts_rank_cd(posts_data.search_vector, query.q) AS rank
+                        FROM posts_data, query
+                        WHERE posts_data.search_vector @@ query.q
+                          AND (posts_data.is_private = FALSE OR posts_data.creator_user_id = $2)
+                    ), page AS (
+                        SELECT post_id, rank FROM ranked
+                        WHERE $3::real IS NULL OR (rank, post_id) < ($3::real, $4::uuid)
+                        ORDER BY rank DESC, post_id DESC
+                        LIMIT $5
+                    )
+                    SELECT
+                        {POST_COLUMNS},
+                        page.rank,
+                        ts_headline('{SEARCH_CONFIG}', posts_data.content, query.q, '{SEARCH_HEADLINE_OPTIONS}') AS snippet
+                    FROM page
+                    JOIN posts_data ON posts_data.post_id = page.post_id
+                    CROSS JOIN query
+                    ORDER BY page.rank DESC, page.post_id DESC
+                """,
+                query, viewer_user_id, after_rank, after_post_id, per_page,
+            )
+
+    async def create_comment(self, post_id: uuid.UUID, commentator_user_id: uuid.UUID,
+                             content: str) -> asyncpg.Record:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchrow(
+                """
+                    INSERT INTO comments_data (post_id, commentator_user_id, content)
+                    VALUES ($1, $2, $3)
                     RETURNING *
+                """,
+                post_id, commentator_user_id, content,
+            )
+
+    async def list_comments(self, post_id: uuid.UUID, per_page: int) -> List[asyncpg.Record]:
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(
                 """
-                return conn.execute(text(stmt), {"title": title, "content": content, "is_private": is_private, "tags": tags, "post_id": str(post_id)}).fetchone()
+                    SELECT * FROM comments_data
+                    WHERE post_id = $1
+                    ORDER BY created_at DESC, comment_id DESC
+                    LIMIT $2
+                """,
+                post_id, per_page,
+            )
 
-    async def delete_post(self, post_id: str) -> bool:
-        with connect() as conn:
-            with conn.begin():
-                stmt = """
-                    DELETE FROM posts_data WHERE post_id = :post_id
+    async def list_comments_after(self, post_id: uuid.UUID, created_at: datetime, comment_id: uuid.UUID,
+                                  per_page: int) -> List[asyncpg.Record]:
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(
                 """
-                result = conn.execute(text(stmt), {"post_id": str(post_id)})
-                return result.rowcount > 0
-
-    async def list_posts(self, page: int, per_page: int) -> List[asyncpg.Record]:
-        with connect() as conn:
-            offset = (page - 1) * per_page
-            query = """
-                SELECT * FROM posts_data
-                WHERE is_private = FALSE
-                ORDER BY created_at DESC
-                LIMIT :per_page
-                OFFSET :offset
+                    SELECT * FROM comments_data
+                    WHERE post_id = $1 AND (created_at, comment_id) < ($2, $3)
+                    ORDER BY created_at DESC, comment_id DESC
+                    LIMIT $4
+                """,
+                post_id, created_at, comment_id, per_page,
+            )
+
+    async def stream_comments(self, post_id: uuid.UUID, chunk_size: int) -> AsyncIterator[asyncpg.Record]:
+        async with self.pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                query = "SELECT * FROM comments_data WHERE post_id = $1 ORDER BY created_at DESC, comment_id DESC"
+                async for record in conn.cursor(query, post_id, prefetch=chunk_size):
+                    yield record
+
+    async def add_reaction(self, post_id: uuid.UUID, user_id: uuid.UUID, reaction_type: str) -> asyncpg.Record:
+        """Возвращает (changed, count); счётчик обновляет триггер в той же транзакции."""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                changed = await conn.fetchval(
+                    """
+                        INSERT INTO reactions_data (post_id, user_id, reaction_type)
+                        VALUES ($1, $2, $3)
+                        ON CONFLICT (post_id, user_id, reaction_type) DO NOTHING
+                        RETURNING TRUE
+                    """,
+                    post_id, user_id, reaction_type,
+                )
+                return await self._reaction_count(conn, post_id, reaction_type, bool(changed))
+
+    async def remove_reaction(self, post_id: uuid.UUID, user_id: uuid.UUID, reaction_type: str) -> asyncpg.Record:
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                changed = await conn.fetchval(
+                    """
+                        DELETE FROM reactions_data
+                        WHERE post_id = $1 AND user_id = $2 AND reaction_type = $3
+                        RETURNING TRUE
+                    """,
+                    post_id, user_id, reaction_type,
+                )
+                return await self._reaction_count(conn, post_id, reaction_type, bool(changed))
+
+    @staticmethod
+    async def _reaction_count(conn: asyncpg.Connection, post_id: uuid.UUID, reaction_type: str,
+                              changed: bool) -> asyncpg.Record:
+        return await conn.fetchrow(
             """
-            result = conn.execute(text(query), {"per_page": per_page, "offset": offset})
-            return result.fetchall()
+                SELECT $3::bool AS changed, (
+                    SELECT COALESCE(sum(count), 0)::bigint FROM post_reaction_counts
+                    WHERE post_id = $1 AND reaction_type = $2
+                ) AS count
+            """,
+            post_id, reaction_type, changed,
+        )
+
+    async def count_public_posts(self) -> int:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval("SELECT count(*) FROM posts_data WHERE is_private = FALSE")
+
+    async def count_public_posts_cached(self) -> int:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval(
+                "SELECT COALESCE(sum(value), 0)::bigint FROM posts_counters WHERE name = 'public_posts'"
+            )
+
+    async def estimate_public_posts(self) -> int:
+        # Частичный индекс содержит ровно публичные посты, его reltuples и есть оценка
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval(
+                "SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = 'idx_posts_public_created'::regclass"
+            )
 
-    async def count_posts(self) -> int:
-        with connect() as conn:
-            query = select(func.count()).select_from(text("posts_data"))
-            result = conn.execute(query)
-            return result.scalar()
+    async def count_public_posts_tagged(self, tags_any: List[str], tags_all: List[str]) -> int:
+        args = []
+        conditions = ["is_private = FALSE", *self._tag_conditions(tags_any, tags_all, args)]
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval(f"SELECT count(*) FROM posts_data WHERE {' AND '.join(conditions)}", *args)
+
+    async def top_tags(self, limit: int) -> List[asyncpg.Record]:
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(
+                """
+                    SELECT tag, count FROM post_tag_counts
+                    WHERE count > 0
+                    ORDER BY count DESC, tag
+                    LIMIT $1
+                """,
+                limit,
+            )
+
+    async def total_public_posts(self, mode: int, tags_any: List[str] = (), tags_all: List[str] = ()) -> int:
+        if mode == TotalMode.TOTAL_NONE:
+            return -1
+        if tags_any or tags_all:
+            # Счётчики и оценка есть только для всей ленты, с фильтром считаем по GIN-индексу
+            return await self.count_public_posts_tagged(tags_any, tags_all)
+        if mode == TotalMode.TOTAL_CACHED:
+            return await self.count_public_posts_cached()
+        if mode == TotalMode.TOTAL_ESTIMATED:
+            return await self.estimate_public_posts()
+        return await self.count_public_posts()
 
 
 class PostService(PostServiceServicer):
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, cache: PostCache, idempotency: Optional[IdempotencyStore] = None,
+                 feed: Optional[FeedStore] = None, events: Optional[EventProducer] = None):
         self.db = db
+        self.cache = cache
+        self.idempotency = idempotency
+        self.feed = feed
+        self.events = events
+
+    def _emit(self, event_type: str, **fields) -> None:
+        if self.events is not None:
+            self.events.emit(event_type, **fields)
 
+    @idempotent(PostResponse)
     async def CreatePost(self, request: CreatePostRequest, context) -> PostResponse:
         post_id = str(uuid.uuid4())
-        return await self._record_to_response(await self.db.create_post(
+        post = await self.db.create_post(
             post_id=post_id,
             creator_user_id=request.creator_user_id,
             title=request.title,
             content=request.content,
             is_private=request.is_private,
             tags=list(request.tags)
-        ))
+        )
+        if self.feed is not None and not post['is_private']:
+            self.feed.schedule_fan_out(request.creator_user_id, post_id, post['created_at'])
+        self._emit('post_created', post_id=post_id, user_id=request.creator_user_id, is_private=post['is_private'])
+        return await self._record_to_response(post)
 
     async def GetPost(self, request: GetPostRequest, context) -> PostResponse:
-        return await self._get_post_response(request.post_id, context)
+        fields = await self._read_fields(request.read_mask, context)
+        cached = await self.cache.get(request.post_id)
+        if cached is not None:
+            response = PostResponse.FromString(cached)
+            return response if fields is None else self._mask_response(response, fields)
+        if fields is not None:
+            # В кэше только полные посты: частичный ответ читает из базы свои колонки и не кэшируется
+            return await self._get_post_response(request.post_id, context, post_columns(fields))
+        token = self.cache.begin_fill(request.post_id)
+        try:
+            response = await self._get_post_response(request.post_id, context)
+            await self.cache.fill(request.post_id, response.SerializeToString(), token)
+        finally:
+            self.cache.cancel_fill(request.post_id, token)
+        return response
+
+    async def GetPostVersion(self, request: GetPostRequest, context) -> PostVersionResponse:
+        version = await self._post_version(request.post_id)
+        if version is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Post not found")
+        return version
 
+    @idempotent(PostResponse)
     async def UpdatePost(self, request: UpdatePostRequest, context) -> PostResponse:
-        return await self._record_to_response(await self.db.update_post(
-            post_id=request.post_id,
-            title=request.title,
-            content=request.content,
-            is_private=request.is_private,
-            tags=list(request.tags)
-        ))
+        paths = list(dict.fromkeys(request.update_mask.paths)) or UPDATABLE_FIELDS
+        unknown = [path for path in paths if path not in UPDATABLE_FIELDS]
+        if unknown:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown update_mask paths: {', '.join(unknown)}")
+        fields = {path: getattr(request, path) for path in paths}
+        if 'tags' in fields:
+            fields['tags'] = list(fields['tags'])
 
-    async def DeletePost(self, request, context: grpc.ServicerContext):
-        post = await self.db.get_post(request.post_id)
+        post = await self.db.update_post(request.post_id, fields, request.expected_version)
         if not post:
+            await self.cache.invalidate(request.post_id)
+            # Версию читаем только на пути ошибки, чтобы отличить конфликт от удалённого поста
+            if request.expected_version and await self.db.get_post_version(request.post_id):
+                await context.abort(grpc.StatusCode.ABORTED, "Post version mismatch")
             await context.abort(grpc.StatusCode.NOT_FOUND, "Post not found")
+        response = await self._record_to_response(post)
+        await self.cache.set(request.post_id, response.SerializeToString())
+        return response
 
-        if str(post[1]) != request.user_id:
+    @idempotent(DeletePostResponse)
+    async def DeletePost(self, request, context: grpc.ServicerContext):
+        try:
+            post_id = uuid.UUID(request.post_id)
+        except ValueError:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Post not found")
+        try:
+            user_id = uuid.UUID(request.user_id)
+        except ValueError:
             await context.abort(grpc.StatusCode.PERMISSION_DENIED, "Permission denied")
 
-        success = await self.db.delete_post(request.post_id)
-        return DeletePostResponse(success=success)
+        result = await self.db.delete_post(post_id, user_id)
+        if not result['found']:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Post not found")
+        if not result['deleted']:
+            await context.abort(grpc.StatusCode.PERMISSION_DENIED, "Permission denied")
+
+        await self.cache.invalidate(request.post_id)
+        return DeletePostResponse(success=True)
+
+    @idempotent(DeletePostsResponse)
+    async def DeletePosts(self, request: DeletePostsRequest, context) -> DeletePostsResponse:
+        if len(request.post_ids) > MAX_BATCH_SIZE:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"At most {MAX_BATCH_SIZE} post ids per batch")
+        try:
+            user_id = uuid.UUID(request.user_id)
+        except ValueError:
+            await context.abort(grpc.StatusCode.PERMISSION_DENIED, "Permission denied")
+
+        requested = []
+        for post_id in dict.fromkeys(request.post_ids):
+            try:
+                requested.append((post_id, uuid.UUID(post_id)))
+            except ValueError:
+                requested.append((post_id, None))
+
+        records = await self.db.delete_posts([parsed for _, parsed in requested if parsed is not None], user_id)
+        deleted = {record['post_id']: record['deleted'] for record in records}
+
+        response = DeletePostsResponse()
+        for post_id, parsed in requested:
+            if parsed not in deleted:
+                response.missing_post_ids.append(post_id)
+            elif deleted[parsed]:
+                response.deleted_post_ids.append(post_id)
+                await self.cache.invalidate(post_id)
+            else:
+                response.forbidden_post_ids.append(post_id)
+        return response
 
     async def ListPosts(self, request: ListPostsRequest, context) -> ListPostsResponse:
-        posts = await self.db.list_posts(request.page, request.per_page)
-        total = await self.db.count_posts()
+        await self._check_tag_filters(request, context)
+        if request.per_page < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "per_page must not be negative")
+        fields = await self._read_fields(request.read_mask, context)
+        columns = post_columns(fields or FULL_POST_FIELDS)
+        tags_any, tags_all = list(request.tags_any), list(request.tags_all)
+        if request.page_token:
+            try:
+                created_at, post_id = decode_page_token(request.page_token)
+            except InvalidPageToken as e:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            list_query = self.db.list_posts_after(created_at, post_id, request.per_page, tags_any, tags_all, columns)
+        else:
+            list_query = self.db.list_posts(request.page, request.per_page, tags_any, tags_all, columns)
+        posts, total = await asyncio.gather(
+            list_query,
+            self.db.total_public_posts(request.total_mode, tags_any, tags_all),
+        )
+
+        next_page_token = ''
+        if posts and len(posts) == request.per_page:
+            next_page_token = encode_page_token(posts[-1]['created_at'], posts[-1]['post_id'])
+
         return ListPostsResponse(
             posts=[await self._record_to_response(post) for post in posts],
-            total=total
+            total=total,
+            next_page_token=next_page_token,
+        )
+
+    async def ListPostsByAuthor(self, request: ListPostsByAuthorRequest, context) -> ListPostsByAuthorResponse:
+        try:
+            creator_user_id = uuid.UUID(request.creator_user_id)
+        except ValueError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid creator_user_id")
+        after = None
+        if request.page_token:
+            try:
+                after = decode_page_token(request.page_token)
+            except InvalidPageToken as e:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        fields = await self._read_fields(request.read_mask, context)
+        if fields is None:
+            fields = SUMMARY_POST_FIELDS if request.summary else FULL_POST_FIELDS
+
+        per_page = await self._page_size(request.per_page, DEFAULT_AUTHOR_PAGE_SIZE, MAX_BATCH_SIZE, context)
+        # Приватные посты видит только сам автор; решается без запроса к посту
+        include_private = request.viewer_user_id == request.creator_user_id
+        posts = await self.db.list_posts_by_author(
+            creator_user_id, include_private, per_page, after, post_columns(fields),
+        )
+
+        next_page_token = ''
+        if len(posts) == per_page:
+            next_page_token = encode_page_token(posts[-1]['created_at'], posts[-1]['post_id'])
+        return ListPostsByAuthorResponse(
+            posts=[await self._record_to_response(post) for post in posts],
+            next_page_token=next_page_token,
+        )
+
+    async def GetFeed(self, request: GetFeedRequest, context) -> GetFeedResponse:
+        if self.feed is None:
+            await context.abort(grpc.StatusCode.UNIMPLEMENTED, "Feed is not configured")
+        try:
+            user_id = uuid.UUID(request.user_id)
+        except ValueError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid user_id")
+        after = None
+        if request.page_token:
+            try:
+                after = decode_page_token(request.page_token)
+            except InvalidPageToken as e:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        fields = await self._read_fields(request.read_mask, context)
+
+        per_page = await self._page_size(request.per_page, DEFAULT_FEED_PAGE_SIZE, MAX_BATCH_SIZE, context)
+        posts = await self.feed.read_page(user_id, per_page, post_columns(fields or FULL_POST_FIELDS), after)
+
+        next_page_token = ''
+        if len(posts) == per_page:
+            next_page_token = encode_page_token(posts[-1]['created_at'], posts[-1]['post_id'])
+        return GetFeedResponse(
+            posts=[await self._record_to_response(post) for post in posts],
+            next_page_token=next_page_token,
+        )
+
+    async def BatchGetPosts(self, request: BatchGetPostsRequest, context) -> BatchGetPostsResponse:
+        if len(request.post_ids) > MAX_BATCH_SIZE:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"At most {MAX_BATCH_SIZE} post ids per batch")
+
+        requested = []
+        for post_id in dict.fromkeys(request.post_ids):
+            try:
+                requested.append((post_id, uuid.UUID(post_id)))
+            except ValueError:
+                requested.append((post_id, None))
+
+        records = await self.db.get_posts([parsed for _, parsed in requested if parsed is not None])
+        by_id = {record['post_id']: record for record in records}
+
+        posts, missing_post_ids = [], []
+        for post_id, parsed in requested:
+            record = by_id.get(parsed)
+            if record is None:
+                missing_post_ids.append(post_id)
+            else:
+                posts.append(await self._record_to_response(record))
+        return BatchGetPostsResponse(posts=posts, missing_post_ids=missing_post_ids)
+
+    async def StreamPosts(self, request: StreamPostsRequest, context) -> AsyncIterator[PostResponse]:
+        chunk_size = request.chunk_size or DEFAULT_STREAM_CHUNK_SIZE
+        creator_user_id = None
+        if request.creator_user_id:
+            try:
+                creator_user_id = uuid.UUID(request.creator_user_id)
+            except ValueError:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid creator_user_id")
+        await self._check_tag_filters(request, context)
+
+        async for record in self.db.stream_posts(
+            creator_user_id,
+            request.tag,
+            request.include_private,
+            chunk_size,
+            list(request.tags_any),
+            list(request.tags_all),
+        ):
+            yield await self._record_to_response(record)
+
+    async def TopTags(self, request: TopTagsRequest, context) -> TopTagsResponse:
+        limit = await self._page_size(request.limit, DEFAULT_TOP_TAGS_LIMIT, MAX_BATCH_SIZE, context, 'limit')
+        return TopTagsResponse(tags=[
+            TagCount(tag=record['tag'], count=record['count']) for record in await self.db.top_tags(limit)
+        ])
+
+    async def SearchPosts(self, request: SearchPostsRequest, context) -> SearchPostsResponse:
+        if not request.query.strip():
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Empty search query")
+        viewer_user_id = None
+        if request.viewer_user_id:
+            try:
+                viewer_user_id = uuid.UUID(request.viewer_user_id)
+            except ValueError:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid viewer_user_id")
+        after = None
+        if request.page_token:
+            try:
+                after = decode_search_token(request.page_token)
+            except InvalidPageToken as e:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        per_page = await self._page_size(request.per_page, DEFAULT_SEARCH_PAGE_SIZE, MAX_BATCH_SIZE, context)
+        records = await self.db.search_posts(request.query, viewer_user_id, per_page, after)
+
+        next_page_token = ''
+        if len(records) == per_page:
+            next_page_token = encode_search_token(records[-1]['rank'], records[-1]['post_id'])
+        return SearchPostsResponse(
+            hits=[
+                SearchHit(post=await self._record_to_response(record), rank=record['rank'], snippet=record['snippet'])
+                for record in records
+            ],
+            next_page_token=next_page_token,
+        )
+
+    @staticmethod
+    async def _page_size(requested: int, default: int, maximum: int, context, name: str = 'per_page') -> int:
+        """0 — размер по умолчанию; отрицательный — ошибка клиента, а не LIMIT, который отвергнет Postgres."""
+        if requested < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"{name} must not be negative")
+        return min(requested or default, maximum)
+
+    async def _check_tag_filters(self, request, context):
+        if len(request.tags_any) > MAX_TAG_FILTERS or len(request.tags_all) > MAX_TAG_FILTERS:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"At most {MAX_TAG_FILTERS} tags per filter")
+
+    @idempotent(CommentResponse)
+    async def CreateComment(self, request: CreateCommentRequest, context) -> CommentResponse:
+        post_id = await self._visible_post_id(request.post_id, request.commentator_user_id, context)
+        try:
+            comment = await self.db.create_comment(post_id, uuid.UUID(request.commentator_user_id), request.content)
+        except asyncpg.ForeignKeyViolationError:
+            # Пост удалили между проверкой и вставкой
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Post not found")
+        self._emit('post_commented', post_id=request.post_id, user_id=request.commentator_user_id,
+                   comment_id=comment['comment_id'])
+        return self._comment_to_response(comment)
+
+    async def ListComments(self, request: ListCommentsRequest, context) -> ListCommentsResponse:
+        post_id = await self._visible_post_id(request.post_id, request.viewer_user_id, context)
+        per_page = await self._page_size(request.per_page, DEFAULT_COMMENTS_PAGE_SIZE, MAX_COMMENTS_PAGE_SIZE, context)
+        if request.page_token:
+            try:
+                created_at, comment_id = decode_page_token(request.page_token)
+            except InvalidPageToken as e:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            comments = await self.db.list_comments_after(post_id, created_at, comment_id, per_page)
+        else:
+            comments = await self.db.list_comments(post_id, per_page)
+
+        next_page_token = ''
+        if len(comments) == per_page:
+            next_page_token = encode_page_token(comments[-1]['created_at'], comments[-1]['comment_id'])
+        return ListCommentsResponse(
+            comments=[self._comment_to_response(comment) for comment in comments],
+            next_page_token=next_page_token,
+        )
+
+    async def StreamComments(self, request: StreamCommentsRequest, context) -> AsyncIterator[CommentResponse]:
+        post_id = await self._visible_post_id(request.post_id, request.viewer_user_id, context)
+        async for record in self.db.stream_comments(post_id, request.chunk_size or DEFAULT_STREAM_CHUNK_SIZE):
+            yield self._comment_to_response(record)
+
+    @idempotent(ReactionResponse)
+    async def AddReaction(self, request: ReactionRequest, context) -> ReactionResponse:
+        post_id = await self._visible_post_id(request.post_id, request.user_id, context)
+        await self._check_reaction_type(request.reaction_type, context)
+        try:
+            result = await self.db.add_reaction(post_id, uuid.UUID(request.user_id), request.reaction_type)
+        except asyncpg.ForeignKeyViolationError:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Post not found")
+        if result['changed']:
+            self._emit('post_liked', post_id=request.post_id, user_id=request.user_id,
+                       reaction_type=request.reaction_type)
+        return await self._reaction_response(request, result)
+
+    @idempotent(ReactionResponse)
+    async def RemoveReaction(self, request: ReactionRequest, context) -> ReactionResponse:
+        post_id = await self._visible_post_id(request.post_id, request.user_id, context)
+        await self._check_reaction_type(request.reaction_type, context)
+        result = await self.db.remove_reaction(post_id, uuid.UUID(request.user_id), request.reaction_type)
+        return await self._reaction_response(request, result)
+
+    async def _check_reaction_type(self, reaction_type: str, context):
+        if not reaction_type or len(reaction_type) > MAX_REACTION_TYPE_LENGTH:
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f"reaction_type must be 1..{MAX_REACTION_TYPE_LENGTH} characters",
+            )
+
+    async def _reaction_response(self, request: ReactionRequest, result: asyncpg.Record) -> ReactionResponse:
+        if result['changed']:
+            # Счётчики лежат внутри закэшированного PostResponse
+            await self.cache.invalidate(request.post_id)
+        return ReactionResponse(
+            post_id=request.post_id,
+            reaction_type=request.reaction_type,
+            count=result['count'],
+            changed=result['changed'],
         )
 
-    async def _get_post_response(self, post_id: str, context: grpc.ServicerContext) -> PostResponse:
-        post = await self.db.get_post(post_id)
+    async def _post_version(self, post_id: str) -> Optional[PostVersionResponse]:
+        # peek: проверки версии и видимости не должны попадать в долю попаданий GetPost
+        cached = await self.cache.peek(post_id)
+        if cached is not None:
+            post = PostResponse.FromString(cached)
+            return PostVersionResponse(
+                post_id=post.post_id,
+                version=post.version,
+                creator_user_id=post.creator_user_id,
+                is_private=post.is_private,
+                reaction_counts=post.reaction_counts,
+            )
+
+        record = await self.db.get_post_version(post_id)
+        if not record:
+            return None
+        return PostVersionResponse(
+            post_id=str(record['post_id']),
+            version=record['version'],
+            creator_user_id=str(record['creator_user_id']),
+            is_private=record['is_private'],
+            reaction_counts=json.loads(record['reaction_counts']),
+        )
+
+    async def _visible_post_id(self, post_id: str, user_id: str, context) -> uuid.UUID:
+        """Проверка, что user_id может видеть пост и его комментарии."""
+        try:
+            parsed = uuid.UUID(post_id)
+            uuid.UUID(user_id)
+        except ValueError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid post_id or user_id")
+        version = await self._post_version(post_id)
+        if version is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Post not found")
+        if version.is_private and version.creator_user_id != user_id:
+            await context.abort(grpc.StatusCode.PERMISSION_DENIED, "Permission denied")
+        return parsed
+
+    async def _get_post_response(self, post_id: str, context: grpc.ServicerContext,
+                                 columns: str = POST_COLUMNS) -> PostResponse:
+        post = await self.db.get_post(post_id, columns)
         logger.info(post)
         if not post:
             await context.abort(grpc.StatusCode.NOT_FOUND, "Post not found")
         return await self._record_to_response(post)
 
+    async def _read_fields(self, read_mask: FieldMask, context) -> Optional[Tuple[str, ...]]:
+        """Поля по read_mask вместе с обязательными; None, если маска пустая и нужен весь пост."""
+        if not read_mask.paths:
+            return None
+        unknown = [path for path in read_mask.paths if path not in READ_MASK_COLUMNS]
+        if unknown:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown read_mask paths: {', '.join(unknown)}")
+        return tuple(dict.fromkeys([*ALWAYS_READ_FIELDS, *read_mask.paths]))
+
+    @staticmethod
+    def _mask_response(post: PostResponse, fields: Sequence[str]) -> PostResponse:
+        """Урезает полный пост из кэша до полей маски."""
+        masked = PostResponse()
+        FieldMask(paths=[field for field in fields if field != 'content_preview']).MergeMessage(post, masked)
+        if 'content_preview' in fields:
+            masked.content_preview = post.content[:CONTENT_PREVIEW_LENGTH]
+        return masked
+
     async def _record_to_response(self, post: asyncpg.Record) -> PostResponse:
+        # В записи могут быть не все колонки (read_mask): незапрошенные поля остаются пустыми
+        response = PostResponse(
+            post_id=str(post['post_id']),
+            creator_user_id=str(post['creator_user_id']),
+            is_private=post['is_private'],
+            version=post['version'],
+        )
+        response.created_at.FromDatetime(post['created_at'])
+        if 'updated_at' in post:
+            response.updated_at.FromDatetime(post['updated_at'])
+        for field in ('title', 'content', 'content_preview'):
+            if field in post:
+                setattr(response, field, post[field])
+        if post.get('tags'):
+            response.tags.extend(post['tags'])
+        if 'reaction_counts' in post:
+            response.reaction_counts.update(json.loads(post['reaction_counts']))
+        return response
+
+    def _comment_to_response(self, comment: asyncpg.Record) -> CommentResponse:
         created_at = Timestamp()
-        created_at.FromDatetime(post[5])
+        created_at.FromDatetime(comment['created_at'])
         updated_at = Timestamp()
-        updated_at.FromDatetime(post[6])
-
-        post_id = post[0]
-        title=post[2]
-        content=post[3]
-        creator_user_id=post[1]
-        is_private=post[7]
-        tags=post[8]
-    
-        return PostResponse(
-            post_id=str(post_id),
-            title=title,
-            content=content,
-            creator_user_id=str(creator_user_id),
+        updated_at.FromDatetime(comment['updated_at'])
+        return CommentResponse(
+            comment_id=str(comment['comment_id']),
+            post_id=str(comment['post_id']),
+            commentator_user_id=str(comment['commentator_user_id']),
+            content=comment['content'],
             created_at=created_at,
             updated_at=updated_at,
-            is_private=is_private,
-            tags=tags
         )
 
 
 async def serve():
-    # TODO: Вынести в env
-    
-    db = Database()
+    pool = await create_pool()
+    db = Database(pool)
+    metrics_server = await serve_metrics('0.0.0.0', METRICS_PORT)
 
     print("gRPC server started")
-    server = grpc.aio.server()
-    add_PostServiceServicer_to_server(PostService(db), server)
+    server = grpc.aio.server(options=[
+        # Gateway держит долгоживущие каналы с keepalive-пингами, их нужно разрешить
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.http2.min_recv_ping_interval_without_data_ms', 10_000),
+        ('grpc.http2.max_ping_strikes', 0),
+    ])
+    idempotency = create_idempotency_store(pool)
+    purge_task = asyncio.create_task(idempotency.run_purge())
+    feed = create_feed_store(pool)
+    events = create_event_producer('posts_service')
+    if events is not None:
+        events.start()
+        for name in ('sent', 'shed', 'dropped', 'spilled', 'replayed', 'send_failures'):
+            registry.gauge(f'posts_events_{name}', f'Statistics events: {name}',
+                           lambda name=name: getattr(events, name))
+        registry.gauge('posts_events_queue_depth', 'Statistics events waiting for the broker', events.queue_depth)
+    add_PostServiceServicer_to_server(PostService(db, create_post_cache(), idempotency, feed, events), server)
     
     SERVICE_NAMES = (
         DESCRIPTOR.services_by_name["PostService"].full_name,
@@ -196,7 +968,15 @@ async def serve():
     
     server.add_insecure_port('0.0.0.0:50051')
     await server.start()
-    await server.wait_for_termination()
+    try:
+        await server.wait_for_termination()
+    finally:
+        purge_task.cancel()
+        await feed.close()
+        if events is not None:
+            await events.close()
+        metrics_server.close()
+        await pool.close()
 
 
 if __name__ == "__main__":
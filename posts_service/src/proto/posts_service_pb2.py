@@ -22,32 +22,89 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
 from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13posts_service.proto\x12\x0bpostservice\x1a\x1fgoogle/protobuf/timestamp.proto\"n\n\x11\x43reatePostRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x17\n\x0f\x63reator_user_id\x18\x03 \x01(\t\x12\x12\n\nis_private\x18\x04 \x01(\x08\x12\x0c\n\x04tags\x18\x05 \x03(\t\"!\n\x0eGetPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\"f\n\x11UpdatePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x12\n\nis_private\x18\x04 \x01(\x08\x12\x0c\n\x04tags\x18\x05 \x03(\t\"5\n\x11\x44\x65letePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"%\n\x12\x44\x65letePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"2\n\x10ListPostsRequest\x12\x0c\n\x04page\x18\x01 \x01(\x05\x12\x10\n\x08per_page\x18\x02 \x01(\x05\"L\n\x11ListPostsResponse\x12(\n\x05posts\x18\x01 \x03(\x0b\x32\x19.postservice.PostResponse\x12\r\n\x05total\x18\x02 \x01(\x05\"\xda\x01\n\x0cPostResponse\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x17\n\x0f\x63reator_user_id\x18\x04 \x01(\t\x12.\n\ncreated_at\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12.\n\nupdated_at\x18\x06 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x12\n\nis_private\x18\x07 \x01(\x08\x12\x0c\n\x04tags\x18\x08 \x03(\t2\xfd\x02\n\x0bPostService\x12G\n\nCreatePost\x12\x1e.postservice.CreatePostRequest\x1a\x19.postservice.PostResponse\x12\x41\n\x07GetPost\x12\x1b.postservice.GetPostRequest\x1a\x19.postservice.PostResponse\x12G\n\nUpdatePost\x12\x1e.postservice.UpdatePostRequest\x1a\x19.postservice.PostResponse\x12M\n\nDeletePost\x12\x1e.postservice.DeletePostRequest\x1a\x1f.postservice.DeletePostResponse\x12J\n\tListPosts\x12\x1d.postservice.ListPostsRequest\x1a\x1e.postservice.ListPostsResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13posts_service.proto\x12\x0bpostservice\x1a google/protobuf/field_mask.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"n\n\x11\x43reatePostRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x17\n\x0f\x63reator_user_id\x18\x03 \x01(\t\x12\x12\n\nis_private\x18\x04 \x01(\x08\x12\x0c\n\x04tags\x18\x05 \x03(\t\"f\n\x0eGetPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12-\n\tread_mask\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.FieldMaskJ\x04\x08\x03\x10\x04R\x0eviewer_user_id\"\xb1\x01\n\x11UpdatePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x12\n\nis_private\x18\x04 \x01(\x08\x12\x0c\n\x04tags\x18\x05 \x03(\t\x12/\n\x0bupdate_mask\x18\x06 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\x12\x18\n\x10\x65xpected_version\x18\x07 \x01(\x05\"5\n\x11\x44\x65letePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"%\n\x12\x44\x65letePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"7\n\x12\x44\x65letePostsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08post_ids\x18\x02 \x03(\t\"e\n\x13\x44\x65letePostsResponse\x12\x18\n\x10\x64\x65leted_post_ids\x18\x01 \x03(\t\x12\x18\n\x10missing_post_ids\x18\x02 \x03(\t\x12\x1a\n\x12\x66orbidden_post_ids\x18\x03 \x03(\t\"\xc5\x01\n\x10ListPostsRequest\x12\x0c\n\x04page\x18\x01 \x01(\x05\x12\x10\n\x08per_page\x18\x02 \x01(\x05\x12\x12\n\npage_token\x18\x03 \x01(\t\x12*\n\ntotal_mode\x18\x04 \x01(\x0e\x32\x16.postservice.TotalMode\x12\x10\n\x08tags_any\x18\x05 \x03(\t\x12\x10\n\x08tags_all\x18\x06 \x03(\t\x12-\n\tread_mask\x18\x07 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"e\n\x11ListPostsResponse\x12(\n\x05posts\x18\x01 \x03(\x0b\x32\x19.postservice.PostResponse\x12\r\n\x05total\x18\x02 \x01(\x05\x12\x17\n\x0fnext_page_token\x18\x03 \x01(\t\"\xb1\x01\n\x18ListPostsByAuthorRequest\x12\x17\n\x0f\x63reator_user_id\x18\x01 \x01(\t\x12\x16\n\x0eviewer_user_id\x18\x02 \x01(\t\x12\x10\n\x08per_page\x18\x03 \x01(\x05\x12\x12\n\npage_token\x18\x04 \x01(\t\x12\x0f\n\x07summary\x18\x05 \x01(\x08\x12-\n\tread_mask\x18\x06 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"^\n\x19ListPostsByAuthorResponse\x12(\n\x05posts\x18\x01 \x03(\x0b\x32\x19.postservice.PostResponse\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\"v\n\x0eGetFeedRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08per_page\x18\x02 \x01(\x05\x12\x12\n\npage_token\x18\x03 \x01(\t\x12-\n\tread_mask\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"T\n\x0fGetFeedResponse\x12(\n\x05posts\x18\x01 \x03(\x0b\x32\x19.postservice.PostResponse\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\"(\n\x14\x42\x61tchGetPostsRequest\x12\x10\n\x08post_ids\x18\x01 \x03(\t\"[\n\x15\x42\x61tchGetPostsResponse\x12(\n\x05posts\x18\x01 \x03(\x0b\x32\x19.postservice.PostResponse\x12\x18\n\x10missing_post_ids\x18\x02 \x03(\t\"\x8b\x01\n\x12StreamPostsRequest\x12\x17\n\x0f\x63reator_user_id\x18\x01 \x01(\t\x12\x0b\n\x03tag\x18\x02 \x01(\t\x12\x17\n\x0finclude_private\x18\x03 \x01(\x08\x12\x12\n\nchunk_size\x18\x04 \x01(\x05\x12\x10\n\x08tags_any\x18\x05 \x03(\t\x12\x10\n\x08tags_all\x18\x06 \x03(\t\"\x83\x03\n\x0cPostResponse\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x17\n\x0f\x63reator_user_id\x18\x04 \x01(\t\x12.\n\ncreated_at\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12.\n\nupdated_at\x18\x06 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x12\n\nis_private\x18\x07 \x01(\x08\x12\x0c\n\x04tags\x18\x08 \x03(\t\x12\x0f\n\x07version\x18\t \x01(\x05\x12\x46\n\x0freaction_counts\x18\n \x03(\x0b\x32-.postservice.PostResponse.ReactionCountsEntry\x12\x17\n\x0f\x63ontent_preview\x18\x0b \x01(\t\x1a\x35\n\x13ReactionCountsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\"\xea\x01\n\x13PostVersionResponse\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x05\x12\x17\n\x0f\x63reator_user_id\x18\x03 \x01(\t\x12\x12\n\nis_private\x18\x04 \x01(\x08\x12M\n\x0freaction_counts\x18\x05 \x03(\x0b\x32\x34.postservice.PostVersionResponse.ReactionCountsEntry\x1a\x35\n\x13ReactionCountsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\"U\n\x14\x43reateCommentRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x1b\n\x13\x63ommentator_user_id\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\"d\n\x13ListCommentsRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x16\n\x0eviewer_user_id\x18\x02 \x01(\t\x12\x10\n\x08per_page\x18\x03 \x01(\x05\x12\x12\n\npage_token\x18\x04 \x01(\t\"_\n\x14ListCommentsResponse\x12.\n\x08\x63omments\x18\x01 \x03(\x0b\x32\x1c.postservice.CommentResponse\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\"T\n\x15StreamCommentsRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x16\n\x0eviewer_user_id\x18\x02 \x01(\t\x12\x12\n\nchunk_size\x18\x03 \x01(\x05\"\xc4\x01\n\x0f\x43ommentResponse\x12\x12\n\ncomment_id\x18\x01 \x01(\t\x12\x0f\n\x07post_id\x18\x02 \x01(\t\x12\x1b\n\x13\x63ommentator_user_id\x18\x03 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x04 \x01(\t\x12.\n\ncreated_at\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12.\n\nupdated_at\x18\x06 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"J\n\x0fReactionRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x15\n\rreaction_type\x18\x03 \x01(\t\"Z\n\x10ReactionResponse\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x15\n\rreaction_type\x18\x02 \x01(\t\x12\r\n\x05\x63ount\x18\x03 \x01(\x03\x12\x0f\n\x07\x63hanged\x18\x04 \x01(\x08\"\x1f\n\x0eTopTagsRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\"&\n\x08TagCount\x12\x0b\n\x03tag\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x03\"6\n\x0fTopTagsResponse\x12#\n\x04tags\x18\x01 \x03(\x0b\x32\x15.postservice.TagCount\"a\n\x12SearchPostsRequest\x12\r\n\x05query\x18\x01 \x01(\t\x12\x16\n\x0eviewer_user_id\x18\x02 \x01(\t\x12\x10\n\x08per_page\x18\x03 \x01(\x05\x12\x12\n\npage_token\x18\x04 \x01(\t\"S\n\tSearchHit\x12\'\n\x04post\x18\x01 \x01(\x0b\x32\x19.postservice.PostResponse\x12\x0c\n\x04rank\x18\x02 \x01(\x02\x12\x0f\n\x07snippet\x18\x03 \x01(\t\"T\n\x13SearchPostsResponse\x12$\n\x04hits\x18\x01 \x03(\x0b\x32\x16.postservice.SearchHit\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t*S\n\tTotalMode\x12\x0f\n\x0bTOTAL_EXACT\x10\x00\x12\x10\n\x0cTOTAL_CACHED\x10\x01\x12\x13\n\x0fTOTAL_ESTIMATED\x10\x02\x12\x0e\n\nTOTAL_NONE\x10\x03\x32\x9f\x0b\n\x0bPostService\x12G\n\nCreatePost\x12\x1e.postservice.CreatePostRequest\x1a\x19.postservice.PostResponse\x12\x41\n\x07GetPost\x12\x1b.postservice.GetPostRequest\x1a\x19.postservice.PostResponse\x12G\n\nUpdatePost\x12\x1e.postservice.UpdatePostRequest\x1a\x19.postservice.PostResponse\x12M\n\nDeletePost\x12\x1e.postservice.DeletePostRequest\x1a\x1f.postservice.DeletePostResponse\x12P\n\x0b\x44\x65letePosts\x12\x1f.postservice.DeletePostsRequest\x1a .postservice.DeletePostsResponse\x12J\n\tListPosts\x12\x1d.postservice.ListPostsRequest\x1a\x1e.postservice.ListPostsResponse\x12\x62\n\x11ListPostsByAuthor\x12%.postservice.ListPostsByAuthorRequest\x1a&.postservice.ListPostsByAuthorResponse\x12\x44\n\x07GetFeed\x12\x1b.postservice.GetFeedRequest\x1a\x1c.postservice.GetFeedResponse\x12V\n\rBatchGetPosts\x12!.postservice.BatchGetPostsRequest\x1a\".postservice.BatchGetPostsResponse\x12K\n\x0bStreamPosts\x12\x1f.postservice.StreamPostsRequest\x1a\x19.postservice.PostResponse0\x01\x12O\n\x0eGetPostVersion\x12\x1b.postservice.GetPostRequest\x1a .postservice.PostVersionResponse\x12P\n\rCreateComment\x12!.postservice.CreateCommentRequest\x1a\x1c.postservice.CommentResponse\x12S\n\x0cListComments\x12 .postservice.ListCommentsRequest\x1a!.postservice.ListCommentsResponse\x12T\n\x0eStreamComments\x12\".postservice.StreamCommentsRequest\x1a\x1c.postservice.CommentResponse0\x01\x12J\n\x0b\x41\x64\x64Reaction\x12\x1c.postservice.ReactionRequest\x1a\x1d.postservice.ReactionResponse\x12M\n\x0eRemoveReaction\x12\x1c.postservice.ReactionRequest\x1a\x1d.postservice.ReactionResponse\x12\x44\n\x07TopTags\x12\x1b.postservice.TopTagsRequest\x1a\x1c.postservice.TopTagsResponse\x12P\n\x0bSearchPosts\x12\x1f.postservice.SearchPostsRequest\x1a .postservice.SearchPostsResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'posts_service_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_CREATEPOSTREQUEST']._serialized_start=69
-  _globals['_CREATEPOSTREQUEST']._serialized_end=179
-  _globals['_GETPOSTREQUEST']._serialized_start=181
-  _globals['_GETPOSTREQUEST']._serialized_end=214
-  _globals['_UPDATEPOSTREQUEST']._serialized_start=216
-  _globals['_UPDATEPOSTREQUEST']._serialized_end=318
-  _globals['_DELETEPOSTREQUEST']._serialized_start=320
-  _globals['_DELETEPOSTREQUEST']._serialized_end=373
-  _globals['_DELETEPOSTRESPONSE']._serialized_start=375
-  _globals['_DELETEPOSTRESPONSE']._serialized_end=412
-  _globals['_LISTPOSTSREQUEST']._serialized_start=414
-  _globals['_LISTPOSTSREQUEST']._serialized_end=464
-  _globals['_LISTPOSTSRESPONSE']._serialized_start=466
-  _globals['_LISTPOSTSRESPONSE']._serialized_end=542
-  _globals['_POSTRESPONSE']._serialized_start=545
-  _globals['_POSTRESPONSE']._serialized_end=763
-  _globals['_POSTSERVICE']._serialized_start=766
-  _globals['_POSTSERVICE']._serialized_end=1147
+  _globals['_POSTRESPONSE_REACTIONCOUNTSENTRY']._loaded_options = None
+  _globals['_POSTRESPONSE_REACTIONCOUNTSENTRY']._serialized_options = b'8\001'
+  _globals['_POSTVERSIONRESPONSE_REACTIONCOUNTSENTRY']._loaded_options = None
+  _globals['_POSTVERSIONRESPONSE_REACTIONCOUNTSENTRY']._serialized_options = b'8\001'
+  _globals['_TOTALMODE']._serialized_start=3580
+  _globals['_TOTALMODE']._serialized_end=3663
+  _globals['_CREATEPOSTREQUEST']._serialized_start=103
+  _globals['_CREATEPOSTREQUEST']._serialized_end=213
+  _globals['_GETPOSTREQUEST']._serialized_start=215
+  _globals['_GETPOSTREQUEST']._serialized_end=317
+  _globals['_UPDATEPOSTREQUEST']._serialized_start=320
+  _globals['_UPDATEPOSTREQUEST']._serialized_end=497
+  _globals['_DELETEPOSTREQUEST']._serialized_start=499
+  _globals['_DELETEPOSTREQUEST']._serialized_end=552
+  _globals['_DELETEPOSTRESPONSE']._serialized_start=554
+  _globals['_DELETEPOSTRESPONSE']._serialized_end=591
+  _globals['_DELETEPOSTSREQUEST']._serialized_start=593
+  _globals['_DELETEPOSTSREQUEST']._serialized_end=648
+  _globals['_DELETEPOSTSRESPONSE']._serialized_start=650
+  _globals['_DELETEPOSTSRESPONSE']._serialized_end=751
+  _globals['_LISTPOSTSREQUEST']._serialized_start=754
+  _globals['_LISTPOSTSREQUEST']._serialized_end=951
+  _globals['_LISTPOSTSRESPONSE']._serialized_start=953
+  _globals['_LISTPOSTSRESPONSE']._serialized_end=1054
+  _globals['_LISTPOSTSBYAUTHORREQUEST']._serialized_start=1057
+  _globals['_LISTPOSTSBYAUTHORREQUEST']._serialized_end=1234
+  _globals['_LISTPOSTSBYAUTHORRESPONSE']._serialized_start=1236
+  _globals['_LISTPOSTSBYAUTHORRESPONSE']._serialized_end=1330
+  _globals['_GETFEEDREQUEST']._serialized_start=1332
+  _globals['_GETFEEDREQUEST']._serialized_end=1450
+  _globals['_GETFEEDRESPONSE']._serialized_start=1452
+  _globals['_GETFEEDRESPONSE']._serialized_end=1536
+  _globals['_BATCHGETPOSTSREQUEST']._serialized_start=1538
+  _globals['_BATCHGETPOSTSREQUEST']._serialized_end=1578
+  _globals['_BATCHGETPOSTSRESPONSE']._serialized_start=1580
+  _globals['_BATCHGETPOSTSRESPONSE']._serialized_end=1671
+  _globals['_STREAMPOSTSREQUEST']._serialized_start=1674
+  _globals['_STREAMPOSTSREQUEST']._serialized_end=1813
+  _globals['_POSTRESPONSE']._serialized_start=1816
+  _globals['_POSTRESPONSE']._serialized_end=2203
+  _globals['_POSTRESPONSE_REACTIONCOUNTSENTRY']._serialized_start=2150
+  _globals['_POSTRESPONSE_REACTIONCOUNTSENTRY']._serialized_end=2203
+  _globals['_POSTVERSIONRESPONSE']._serialized_start=2206
+  _globals['_POSTVERSIONRESPONSE']._serialized_end=2440
+  _globals['_POSTVERSIONRESPONSE_REACTIONCOUNTSENTRY']._serialized_start=2150
+  _globals['_POSTVERSIONRESPONSE_REACTIONCOUNTSENTRY']._serialized_end=2203
+  _globals['_CREATECOMMENTREQUEST']._serialized_start=2442
+  _globals['_CREATECOMMENTREQUEST']._serialized_end=2527
+  _globals['_LISTCOMMENTSREQUEST']._serialized_start=2529
+  _globals['_LISTCOMMENTSREQUEST']._serialized_end=2629
+  _globals['_LISTCOMMENTSRESPONSE']._serialized_start=2631
+  _globals['_LISTCOMMENTSRESPONSE']._serialized_end=2726
+  _globals['_STREAMCOMMENTSREQUEST']._serialized_start=2728
+  _globals['_STREAMCOMMENTSREQUEST']._serialized_end=2812
+  _globals['_COMMENTRESPONSE']._serialized_start=2815
+  _globals['_COMMENTRESPONSE']._serialized_end=3011
+  _globals['_REACTIONREQUEST']._serialized_start=3013
+  _globals['_REACTIONREQUEST']._serialized_end=3087
+  _globals['_REACTIONRESPONSE']._serialized_start=3089
+  _globals['_REACTIONRESPONSE']._serialized_end=3179
+  _globals['_TOPTAGSREQUEST']._serialized_start=3181
+  _globals['_TOPTAGSREQUEST']._serialized_end=3212
+  _globals['_TAGCOUNT']._serialized_start=3214
+  _globals['_TAGCOUNT']._serialized_end=3252
+  _globals['_TOPTAGSRESPONSE']._serialized_start=3254
+  _globals['_TOPTAGSRESPONSE']._serialized_end=3308
+  _globals['_SEARCHPOSTSREQUEST']._serialized_start=3310
+  _globals['_SEARCHPOSTSREQUEST']._serialized_end=3407
+  _globals['_SEARCHHIT']._serialized_start=3409
+  _globals['_SEARCHHIT']._serialized_end=3492
+  _globals['_SEARCHPOSTSRESPONSE']._serialized_start=3494
+  _globals['_SEARCHPOSTSRESPONSE']._serialized_end=3578
+  _globals['_POSTSERVICE']._serialized_start=3666
+  _globals['_POSTSERVICE']._serialized_end=5105
 # @@protoc_insertion_point(module_scope)
@@ -54,11 +54,76 @@ class PostServiceStub(object):
                 request_serializer=posts__service__pb2.DeletePostRequest.SerializeToString,
                 response_deserializer=posts__service__pb2.DeletePostResponse.FromString,
                 _registered_method=True)
+        self.DeletePosts = channel.unary_unary(
+                '/postservice.PostService/DeletePosts',
+                request_serializer=posts__service__pb2.DeletePostsRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.DeletePostsResponse.FromString,
+                _registered_method=True)
         self.ListPosts = channel.unary_unary(
                 '/postservice.PostService/ListPosts',
                 request_serializer=posts__service__pb2.ListPostsRequest.SerializeToString,
                 response_deserializer=posts__service__pb2.ListPostsResponse.FromString,
                 _registered_method=True)
+        self.ListPostsByAuthor = channel.unary_unary(
+                '/postservice.PostService/ListPostsByAuthor',
+                request_serializer=posts__service__pb2.ListPostsByAuthorRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.ListPostsByAuthorResponse.FromString,
+                _registered_method=True)
+        self.GetFeed = channel.unary_unary(
+                '/postservice.PostService/GetFeed',
+                request_serializer=posts__service__pb2.GetFeedRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.GetFeedResponse.FromString,
+                _registered_method=True)
+        self.BatchGetPosts = channel.unary_unary(
+                '/postservice.PostService/BatchGetPosts',
+                request_serializer=posts__service__pb2.BatchGetPostsRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.BatchGetPostsResponse.FromString,
+                _registered_method=True)
+        self.StreamPosts = channel.unary_stream(
+                '/postservice.PostService/StreamPosts',
+                request_serializer=posts__service__pb2.StreamPostsRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.PostResponse.FromString,
+                _registered_method=True)
+        self.GetPostVersion = channel.unary_unary(
+                '/postservice.PostService/GetPostVersion',
+                request_serializer=posts__service__pb2.GetPostRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.PostVersionResponse.FromString,
+                _registered_method=True)
+        self.CreateComment = channel.unary_unary(
+                '/postservice.PostService/CreateComment',
+                request_serializer=posts__service__pb2.CreateCommentRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.CommentResponse.FromString,
+                _registered_method=True)
+        self.ListComments = channel.unary_unary(
+                '/postservice.PostService/ListComments',
+                request_serializer=posts__service__pb2.ListCommentsRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.ListCommentsResponse.FromString,
+                _registered_method=True)
+        self.StreamComments = channel.unary_stream(
+                '/postservice.PostService/StreamComments',
+                request_serializer=posts__service__pb2.StreamCommentsRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.CommentResponse.FromString,
+                _registered_method=True)
+        self.AddReaction = channel.unary_unary(
+                '/postservice.PostService/AddReaction',
+                request_serializer=posts__service__pb2.ReactionRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.ReactionResponse.FromString,
+                _registered_method=True)
+        self.RemoveReaction = channel.unary_unary(
+                '/postservice.PostService/RemoveReaction',
+                request_serializer=posts__service__pb2.ReactionRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.ReactionResponse.FromString,
+                _registered_method=True)
+        self.TopTags = channel.unary_unary(
+                '/postservice.PostService/TopTags',
+                request_serializer=posts__service__pb2.TopTagsRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.TopTagsResponse.FromString,
+                _registered_method=True)
+        self.SearchPosts = channel.unary_unary(
+                '/postservice.PostService/SearchPosts',
+                request_serializer=posts__service__pb2.SearchPostsRequest.SerializeToString,
+                response_deserializer=posts__service__pb2.SearchPostsResponse.FromString,
+                _registered_method=True)
 
 
 class PostServiceServicer(object):
@@ -88,12 +153,96 @@ class PostServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def DeletePosts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ListPosts(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListPostsByAuthor(self, request, context):
+        """Посты автора от новых к старым, для страницы профиля
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetFeed(self, request, context):
+        """Лента подписок пользователя от новых постов к старым
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchGetPosts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamPosts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetPostVersion(self, request, context):
+        """Версия поста без content: для условных GET в gateway
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CreateComment(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListComments(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamComments(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AddReaction(self, request, context):
+        """Идемпотентны по (post_id, user_id, reaction_type)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RemoveReaction(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TopTags(self, request, context):
+        """Самые частые теги публичных постов из таблицы post_tag_counts
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SearchPosts(self, request, context):
+        """Полнотекстовый поиск по title и content
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_PostServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -117,11 +266,76 @@ def add_PostServiceServicer_to_server(servicer, server):
                     request_deserializer=posts__service__pb2.DeletePostRequest.FromString,
                     response_serializer=posts__service__pb2.DeletePostResponse.SerializeToString,
             ),
+            'DeletePosts': grpc.unary_unary_rpc_method_handler(
+                    servicer.DeletePosts,
+                    request_deserializer=posts__service__pb2.DeletePostsRequest.FromString,
+                    response_serializer=posts__service__pb2.DeletePostsResponse.SerializeToString,
+            ),
             'ListPosts': grpc.unary_unary_rpc_method_handler(
                     servicer.ListPosts,
                     request_deserializer=posts__service__pb2.ListPostsRequest.FromString,
                     response_serializer=posts__service__pb2.ListPostsResponse.SerializeToString,
             ),
+            'ListPostsByAuthor': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListPostsByAuthor,
+                    request_deserializer=posts__service__pb2.ListPostsByAuthorRequest.FromString,
+                    response_serializer=posts__service__pb2.ListPostsByAuthorResponse.SerializeToString,
+            ),
+            'GetFeed': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetFeed,
+                    request_deserializer=posts__service__pb2.GetFeedRequest.FromString,
+                    response_serializer=posts__service__pb2.GetFeedResponse.SerializeToString,
+            ),
+            'BatchGetPosts': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetPosts,
+                    request_deserializer=posts__service__pb2.BatchGetPostsRequest.FromString,
+                    response_serializer=posts__service__pb2.BatchGetPostsResponse.SerializeToString,
+            ),
+            'StreamPosts': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamPosts,
+                    request_deserializer=posts__service__pb2.StreamPostsRequest.FromString,
+                    response_serializer=posts__service__pb2.PostResponse.SerializeToString,
+            ),
+            'GetPostVersion': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetPostVersion,
+                    request_deserializer=posts__service__pb2.GetPostRequest.FromString,
+                    response_serializer=posts__service__pb2.PostVersionResponse.SerializeToString,
+            ),
+            'CreateComment': grpc.unary_unary_rpc_method_handler(
+                    servicer.CreateComment,
+                    request_deserializer=posts__service__pb2.CreateCommentRequest.FromString,
+                    response_serializer=posts__service__pb2.CommentResponse.SerializeToString,
+            ),
+            'ListComments': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListComments,
+                    request_deserializer=posts__service__pb2.ListCommentsRequest.FromString,
+                    response_serializer=posts__service__pb2.ListCommentsResponse.SerializeToString,
+            ),
+            'StreamComments': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamComments,
+                    request_deserializer=posts__service__pb2.StreamCommentsRequest.FromString,
+                    response_serializer=posts__service__pb2.CommentResponse.SerializeToString,
+            ),
+            'AddReaction': grpc.unary_unary_rpc_method_handler(
+                    servicer.AddReaction,
+                    request_deserializer=posts__service__pb2.ReactionRequest.FromString,
+                    response_serializer=posts__service__pb2.ReactionResponse.SerializeToString,
+            ),
+            'RemoveReaction': grpc.unary_unary_rpc_method_handler(
+                    servicer.RemoveReaction,
+                    request_deserializer=posts__service__pb2.ReactionRequest.FromString,
+                    response_serializer=posts__service__pb2.ReactionResponse.SerializeToString,
+            ),
+            'TopTags': grpc.unary_unary_rpc_method_handler(
+                    servicer.TopTags,
+                    request_deserializer=posts__service__pb2.TopTagsRequest.FromString,
+                    response_serializer=posts__service__pb2.TopTagsResponse.SerializeToString,
+            ),
+            'SearchPosts': grpc.unary_unary_rpc_method_handler(
+                    servicer.SearchPosts,
+                    request_deserializer=posts__service__pb2.SearchPostsRequest.FromString,
+                    response_serializer=posts__service__pb2.SearchPostsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'postservice.PostService', rpc_method_handlers)
@@ -241,6 +455,33 @@ class PostService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def DeletePosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/DeletePosts',
+            posts__service__pb2.DeletePostsRequest.SerializeToString,
+            posts__service__pb2.DeletePostsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def ListPosts(request,
             target,
@@ -267,3 +508,327 @@ class PostService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def ListPostsByAuthor(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/ListPostsByAuthor',
+            posts__service__pb2.ListPostsByAuthorRequest.SerializeToString,
+            posts__service__pb2.ListPostsByAuthorResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetFeed(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/GetFeed',
+            posts__service__pb2.GetFeedRequest.SerializeToString,
+            posts__service__pb2.GetFeedResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatchGetPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/BatchGetPosts',
+            posts__service__pb2.BatchGetPostsRequest.SerializeToString,
+            posts__service__pb2.BatchGetPostsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/postservice.PostService/StreamPosts',
+            posts__service__pb2.StreamPostsRequest.SerializeToString,
+            posts__service__pb2.PostResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetPostVersion(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/GetPostVersion',
+            posts__service__pb2.GetPostRequest.SerializeToString,
+            posts__service__pb2.PostVersionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CreateComment(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/CreateComment',
+            posts__service__pb2.CreateCommentRequest.SerializeToString,
+            posts__service__pb2.CommentResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListComments(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/ListComments',
+            posts__service__pb2.ListCommentsRequest.SerializeToString,
+            posts__service__pb2.ListCommentsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamComments(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/postservice.PostService/StreamComments',
+            posts__service__pb2.StreamCommentsRequest.SerializeToString,
+            posts__service__pb2.CommentResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def AddReaction(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/AddReaction',
+            posts__service__pb2.ReactionRequest.SerializeToString,
+            posts__service__pb2.ReactionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RemoveReaction(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/RemoveReaction',
+            posts__service__pb2.ReactionRequest.SerializeToString,
+            posts__service__pb2.ReactionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def TopTags(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/TopTags',
+            posts__service__pb2.TopTagsRequest.SerializeToString,
+            posts__service__pb2.TopTagsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SearchPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/postservice.PostService/SearchPosts',
+            posts__service__pb2.SearchPostsRequest.SerializeToString,
+            posts__service__pb2.SearchPostsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
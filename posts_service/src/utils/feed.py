@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+
+import asyncpg
+import httpx
+
+from shared.metrics import registry
+from utils.follow_graph import Followee, FollowGraph, create_follow_graph
+from utils.post_cache import ByteLruCache
+
+logger = logging.getLogger(__name__)
+
+# Авторы с таким числом подписчиков не раскладываются по лентам: их посты подмешиваются при чтении
+FEED_PULL_MIN_FOLLOWERS = int(os.getenv('FEED_PULL_MIN_FOLLOWERS', 10_000))
+FEED_MAX_LENGTH = int(os.getenv('FEED_MAX_LENGTH', 800))
+FEED_FANOUT_BATCH_SIZE = int(os.getenv('FEED_FANOUT_BATCH_SIZE', 1_000))
+# Обрезка до FEED_MAX_LENGTH стоит чтения FEED_MAX_LENGTH записей индекса на подписчика,
+# поэтому делается не на каждой раскладке: лента может временно вырасти примерно на столько постов
+FEED_TRIM_EVERY = int(os.getenv('FEED_TRIM_EVERY', 16))
+FEED_FOLLOWEES_CACHE_TTL_S = float(os.getenv('FEED_FOLLOWEES_CACHE_TTL_S', 30))
+FEED_FOLLOWEES_CACHE_MAX_BYTES = int(os.getenv('FEED_FOLLOWEES_CACHE_MAX_BYTES', 4 * 1024 * 1024))
+
+
+class FeedStore:
+    """
+    Гибридная лента подписок. Посты обычных авторов при публикации дописываются в feed_items
+    каждого подписчика (push), посты авторов с аудиторией от pull_min_followers читаются
+    из posts_data при открытии ленты (pull) и сливаются с предрассчитанной частью по времени.
+    Отписка не трогает feed_items: предрассчитанные записи при чтении сверяются с текущими
+    подписками (с задержкой до FEED_FOLLOWEES_CACHE_TTL_S), а старые уходят при обрезке.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, graph: FollowGraph, followees_cache: ByteLruCache,
+                 pull_min_followers: int = FEED_PULL_MIN_FOLLOWERS, max_length: int = FEED_MAX_LENGTH,
+                 fanout_batch_size: int = FEED_FANOUT_BATCH_SIZE, trim_every: int = FEED_TRIM_EVERY):
+        self.pool = pool
+        self.graph = graph
+        self.followees_cache = followees_cache
+        self.pull_min_followers = pull_min_followers
+        self.max_length = max_length
+        self.fanout_batch_size = fanout_batch_size
+        self.trim_every = trim_every
+        self._pushes = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.pushed = registry.counter('posts_feed_pushed_total', 'Feed entries written on post creation')
+        self.pulled_posts = registry.counter('posts_feed_pull_authors_total',
+                                             'Posts not fanned out because the author has too many followers')
+        self.failures = registry.counter('posts_feed_fanout_failures_total', 'Fan-outs that failed')
+        registry.gauge('posts_feed_fanouts_in_flight', 'Fan-outs running in background', lambda: len(self._tasks))
+
+    def schedule_fan_out(self, creator_user_id: str, post_id: str, created_at: datetime) -> None:
+        """Раскладывает пост в фоне, чтобы CreatePost не ждал подписчиков."""
+        task = asyncio.create_task(self.fan_out(creator_user_id, post_id, created_at))
+        self._tasks.add(task)
+        task.add_done_callback(self._fan_out_done)
+
+    def _fan_out_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.failures.inc()
+            logger.error('Feed fan-out failed', exc_info=task.exception())
+
+    async def fan_out(self, creator_user_id: str, post_id: str, created_at: datetime) -> int:
+        """Дописывает пост в ленты подписчиков; возвращает число лент, 0 для pull-автора."""
+        written = 0
+        after = None
+        while True:
+            page = await self.graph.followers(creator_user_id, after, self.fanout_batch_size)
+            if page.followers_count >= self.pull_min_followers:
+                self.pulled_posts.inc()
+                return 0
+            if page.followers:
+                await self._push(page.followers, post_id, created_at)
+                written += len(page.followers)
+            if page.next_after is None:
+                break
+            after = page.next_after
+        self.pushed.inc(written)
+        return written
+
+    async def _push(self, user_ids: List[str], post_id: str, created_at: datetime) -> None:
+        self._pushes += 1
+        async with self.pool.acquire() as conn:
+            # ON CONFLICT: повтор раскладки того же поста не дублирует записи
+            await conn.execute(
+                """
+                    INSERT INTO feed_items (user_id, created_at, post_id)
+                    SELECT user_id, $2, $3 FROM unnest($1::uuid[]) AS user_id
+                    ON CONFLICT DO NOTHING
+                """,
+                user_ids, created_at, post_id,
+            )
+            if self._pushes % self.trim_every == 0:
+                await conn.execute(
+                    """
+                        DELETE FROM feed_items
+                        USING unnest($1::uuid[]) AS follower(user_id)
+                        CROSS JOIN LATERAL (
+                            SELECT kept.created_at, kept.post_id FROM feed_items AS kept
+                            WHERE kept.user_id = follower.user_id
+                            ORDER BY kept.created_at DESC, kept.post_id DESC
+                            OFFSET $2 LIMIT 1
+                        ) AS boundary
+                        WHERE feed_items.user_id = follower.user_id
+                          AND (feed_items.created_at, feed_items.post_id) <= (boundary.created_at, boundary.post_id)
+                    """,
+                    user_ids, self.max_length,
+                )
+
+    async def followees(self, user_id: str) -> Optional[List[Followee]]:
+        """
+        Подписки пользователя с числом подписчиков; None, если userdata недоступен.
+        Кэшируется на FEED_FOLLOWEES_CACHE_TTL_S.
+        """
+        cached = self.followees_cache.get(user_id)
+        if cached is not None:
+            return [Followee(*followee) for followee in json.loads(cached)]
+        try:
+            followees = await self.graph.followees(user_id)
+        except httpx.HTTPError:
+            logger.warning('Cannot load followees of %s, serving pushed feed only', user_id, exc_info=True)
+            return None
+        self.followees_cache.set(user_id, json.dumps(followees).encode())
+        return followees
+
+    async def read_page(self, user_id: uuid.UUID, per_page: int, columns: str,
+                        after: Optional[Tuple[datetime, uuid.UUID]] = None) -> List[asyncpg.Record]:
+        followees = await self.followees(str(user_id))
+        pull_authors = [
+            followee.user_id for followee in followees or ()
+            if followee.followers_count >= self.pull_min_followers
+        ]
+        # Без userdata лента собирается только из предрассчитанной части, и её не с чем сверить
+        followee_ids = [followee.user_id for followee in followees] if followees is not None else None
+        after_created_at, after_post_id = after or (None, None)
+        async with self.pool.acquire() as conn:
+            # У каждого pull-автора берётся не больше страницы через idx_posts_creator_created,
+            # поэтому стоимость растёт с числом таких авторов, а не с числом их постов
+            return await conn.fetch(
+                f"""
+                    WITH pushed AS (
+                        SELECT feed_items.post_id, feed_items.created_at
+                        FROM feed_items JOIN posts_data USING (post_id)
+                        WHERE feed_items.user_id = $1
+                          AND posts_data.is_private = FALSE
+                          AND ($6::uuid[] IS NULL OR posts_data.creator_user_id = ANY($6::uuid[]))
+                          AND ($2::timestamp IS NULL
+                               OR (feed_items.created_at, feed_items.post_id) < ($2::timestamp, $3::uuid))
+                        ORDER BY feed_items.created_at DESC, feed_items.post_id DESC
+                        LIMIT $4
+                    ),
+                    pulled AS (
+                        SELECT recent.post_id, recent.created_at
+                        FROM unnest($5::uuid[]) AS author(creator_user_id)
+                        CROSS JOIN LATERAL (
+                            SELECT post_id, created_at FROM posts_data
+                            WHERE posts_data.creator_user_id = author.creator_user_id
+                              AND is_private = FALSE
+                              AND ($2::timestamp IS NULL OR (created_at, post_id) < ($2::timestamp, $3::uuid))
+                            ORDER BY created_at DESC, post_id DESC
+                            LIMIT $4
+                        ) AS recent
+                    ),
+                    page AS (
+                        SELECT post_id, created_at FROM pushed
+                        UNION
+                        SELECT post_id, created_at FROM pulled
+                        ORDER BY created_at DESC, post_id DESC
+                        LIMIT $4
+                    )
+                    SELECT {columns} FROM page JOIN posts_data USING (post_id)
+                    ORDER BY page.created_at DESC, page.post_id DESC
+                """,
+                user_id, after_created_at, after_post_id, per_page, pull_authors, followee_ids,
+            )
+
+    async def close(self) -> None:
+        """Дожидается начатых раскладок, чтобы не терять посты при остановке."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.graph.close()
+
+
+def create_feed_store(pool: asyncpg.Pool) -> FeedStore:
+    followees_cache = ByteLruCache(FEED_FOLLOWEES_CACHE_MAX_BYTES, FEED_FOLLOWEES_CACHE_MAX_BYTES,
+                                   FEED_FOLLOWEES_CACHE_TTL_S)
+    return FeedStore(pool, create_follow_graph(), followees_cache)
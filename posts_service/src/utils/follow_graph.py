@@ -0,0 +1,97 @@
+import os
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Protocol, Set
+
+import httpx
+
+USERDATA_SERVICE_URL = os.getenv('USERDATA_SERVICE_URL', 'http://userdata-service:8002')
+USERDATA_HTTP_TIMEOUT_S = float(os.getenv('USERDATA_HTTP_TIMEOUT_S', 2))
+USERDATA_HTTP_MAX_CONNECTIONS = int(os.getenv('USERDATA_HTTP_MAX_CONNECTIONS', 20))
+
+
+class FollowersPage(NamedTuple):
+    # Всего подписчиков у автора, не только на этой странице
+    followers_count: int
+    followers: List[str]
+    # Курсор следующей страницы; None на последней
+    next_after: Optional[str]
+
+
+class Followee(NamedTuple):
+    user_id: str
+    followers_count: int
+
+
+class FollowGraph(Protocol):
+    """Граф подписок, который хранит userdata_service."""
+
+    async def followers(self, user_id: str, after: Optional[str], limit: int) -> FollowersPage: ...
+
+    async def followees(self, user_id: str, min_followers: int = 0) -> List[Followee]: ...
+
+
+class HttpFollowGraph:
+    """Ходит в userdata_service по HTTP через общий пул keep-alive соединений."""
+
+    def __init__(self, base_url: str = USERDATA_SERVICE_URL, client: Optional[httpx.AsyncClient] = None):
+        self.base_url = base_url
+        self.client = client or httpx.AsyncClient(
+            timeout=USERDATA_HTTP_TIMEOUT_S,
+            limits=httpx.Limits(max_connections=USERDATA_HTTP_MAX_CONNECTIONS),
+        )
+
+    async def followers(self, user_id: str, after: Optional[str], limit: int) -> FollowersPage:
+        params = {'user_id': user_id, 'limit': limit}
+        if after:
+            params['after'] = after
+        response = await self.client.get(f'{self.base_url}/followers/v1', params=params)
+        response.raise_for_status()
+        body = response.json()
+        return FollowersPage(body['followers_count'], body['followers'], body.get('next_after'))
+
+    async def followees(self, user_id: str, min_followers: int = 0) -> List[Followee]:
+        response = await self.client.get(
+            f'{self.base_url}/followees/v1', params={'user_id': user_id, 'min_followers': min_followers},
+        )
+        response.raise_for_status()
+        return [Followee(followee['user_id'], followee['followers_count']) for followee in response.json()['followees']]
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class LocalFollowGraph:
+    """
+    Граф подписок в памяти процесса для тестов и нагрузочных прогонов:
+    тот же интерфейс, что у HttpFollowGraph.
+    """
+
+    def __init__(self):
+        self._followers: Dict[str, Set[str]] = defaultdict(set)
+        self._followees: Dict[str, Set[str]] = defaultdict(set)
+
+    def follow(self, follower_user_id: str, followee_user_id: str) -> None:
+        self._followers[followee_user_id].add(follower_user_id)
+        self._followees[follower_user_id].add(followee_user_id)
+
+    def unfollow(self, follower_user_id: str, followee_user_id: str) -> None:
+        self._followers[followee_user_id].discard(follower_user_id)
+        self._followees[follower_user_id].discard(followee_user_id)
+
+    async def followers(self, user_id: str, after: Optional[str], limit: int) -> FollowersPage:
+        followers = sorted(follower for follower in self._followers[user_id] if after is None or follower > after)
+        page = followers[:limit]
+        return FollowersPage(len(self._followers[user_id]), page, page[-1] if len(followers) > limit else None)
+
+    async def followees(self, user_id: str, min_followers: int = 0) -> List[Followee]:
+        return [
+            Followee(followee, len(self._followers[followee])) for followee in self._followees[user_id]
+            if len(self._followers[followee]) >= min_followers
+        ]
+
+    async def close(self) -> None:
+        pass
+
+
+def create_follow_graph() -> HttpFollowGraph:
+    return HttpFollowGraph()
@@ -0,0 +1,202 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import uuid
+from typing import Optional, Type
+
+import asyncpg
+import grpc
+
+from shared.metrics import registry
+from utils.post_cache import ByteLruCache
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_METADATA_KEY = 'idempotency-key'
+# Пользователь, от имени которого gateway выполняет запрос: ключи разных пользователей не пересекаются
+IDEMPOTENCY_USER_METADATA_KEY = 'user-id'
+IDEMPOTENCY_MAX_KEY_LENGTH = 200
+IDEMPOTENCY_TTL_S = float(os.getenv('IDEMPOTENCY_TTL_S', 24 * 60 * 60))
+# Захват без сохранённого ответа старше этого считается брошенным (процесс упал посреди запроса)
+IDEMPOTENCY_CLAIM_TIMEOUT_S = float(os.getenv('IDEMPOTENCY_CLAIM_TIMEOUT_S', 60))
+IDEMPOTENCY_PURGE_INTERVAL_S = float(os.getenv('IDEMPOTENCY_PURGE_INTERVAL_S', 300))
+IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv('IDEMPOTENCY_PURGE_BATCH_SIZE', 1000))
+IDEMPOTENCY_FRONT_CACHE_MAX_BYTES = int(os.getenv('IDEMPOTENCY_FRONT_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+
+FINGERPRINT_SIZE = hashlib.sha256().digest_size
+
+
+class IdempotencyKeyReused(Exception):
+    """Ключ уже использован для запроса с другим телом."""
+
+
+class IdempotencyInProgress(Exception):
+    """Запрос с этим ключом ещё выполняется."""
+
+
+class IdempotencyStore:
+    """
+    Сохранённые ответы на запросы с Idempotency-Key в idempotency_data.
+    Завершённые ответы дублируются в небольшой LRU в памяти, чтобы повторы не ходили в Postgres.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, front: ByteLruCache, ttl: float = IDEMPOTENCY_TTL_S,
+                 claim_timeout: float = IDEMPOTENCY_CLAIM_TIMEOUT_S):
+        self.pool = pool
+        self.front = front
+        self.ttl = ttl
+        self.claim_timeout = claim_timeout
+
+        self.front_replays = registry.counter('posts_idempotency_front_replays_total',
+                                              'Replays answered from the in-memory front cache')
+        self.db_replays = registry.counter('posts_idempotency_db_replays_total',
+                                           'Replays answered from idempotency_data')
+        self.purged = registry.counter('posts_idempotency_purged_total', 'Expired idempotency records deleted')
+
+    async def begin(self, token: str, fingerprint: bytes) -> Optional[bytes]:
+        """
+        Захватывает ключ и возвращает None, если запрос нужно выполнить,
+        или сохранённый ответ, если он уже был выполнен.
+        """
+        front = self.front.get(token)
+        if front is not None:
+            self._check_fingerprint(front[:FINGERPRINT_SIZE], fingerprint)
+            self.front_replays.inc()
+            return front[FINGERPRINT_SIZE:]
+
+        async with self.pool.acquire() as conn:
+            # Просроченную запись или брошенный захват можно перехватить
+            claimed = await conn.fetchval(
+                """
+                    INSERT INTO idempotency_data (idempotency_token, request_hash, payload, created_at)
+                    VALUES ($1, $2, NULL, CURRENT_TIMESTAMP)
+                    ON CONFLICT (idempotency_token) DO UPDATE
+                    SET request_hash = EXCLUDED.request_hash, payload = NULL, created_at = EXCLUDED.created_at
+                    WHERE idempotency_data.created_at < CURRENT_TIMESTAMP - make_interval(secs => $3)
+                       OR (idempotency_data.payload IS NULL
+                           AND idempotency_data.created_at < CURRENT_TIMESTAMP - make_interval(secs => $4))
+                    RETURNING TRUE
+                """,
+                token, fingerprint, self.ttl, self.claim_timeout,
+            )
+            if claimed:
+                return None
+            record = await conn.fetchrow(
+                "SELECT request_hash, payload FROM idempotency_data WHERE idempotency_token = $1", token,
+            )
+
+        if record is None or record['payload'] is None:
+            raise IdempotencyInProgress(token)
+        self._check_fingerprint(record['request_hash'], fingerprint)
+        self.front.set(token, record['request_hash'] + record['payload'])
+        self.db_replays.inc()
+        return record['payload']
+
+    async def complete(self, token: str, fingerprint: bytes, payload: bytes) -> None:
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE idempotency_data SET payload = $2 WHERE idempotency_token = $1", token, payload,
+            )
+        self.front.set(token, fingerprint + payload)
+
+    async def release(self, token: str) -> None:
+        """Снимает захват после ошибки, чтобы повтор с тем же ключом выполнился заново."""
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                "DELETE FROM idempotency_data WHERE idempotency_token = $1 AND payload IS NULL", token,
+            )
+
+    async def purge(self) -> int:
+        deleted = 0
+        async with self.pool.acquire() as conn:
+            # Пачками, чтобы не держать долгую транзакцию на большой таблице
+            while True:
+                result = await conn.execute(
+                    """
+                        DELETE FROM idempotency_data
+                        WHERE idempotency_token IN (
+                            SELECT idempotency_token FROM idempotency_data
+                            WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => $1)
+                            LIMIT $2
+                        )
+                    """,
+                    self.ttl, IDEMPOTENCY_PURGE_BATCH_SIZE,
+                )
+                batch = int(result.split()[-1])
+                deleted += batch
+                if batch < IDEMPOTENCY_PURGE_BATCH_SIZE:
+                    break
+        self.purged.inc(deleted)
+        return deleted
+
+    async def run_purge(self, interval: float = IDEMPOTENCY_PURGE_INTERVAL_S) -> None:
+        while True:
+            try:
+                await self.purge()
+            except (OSError, asyncpg.PostgresError):
+                logger.exception('Idempotency purge failed')
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _check_fingerprint(stored: bytes, fingerprint: bytes) -> None:
+        if stored != fingerprint:
+            raise IdempotencyKeyReused()
+
+
+def create_idempotency_store(pool: asyncpg.Pool) -> IdempotencyStore:
+    front = ByteLruCache(IDEMPOTENCY_FRONT_CACHE_MAX_BYTES, IDEMPOTENCY_FRONT_CACHE_MAX_BYTES, IDEMPOTENCY_TTL_S)
+    return IdempotencyStore(pool, front)
+
+
+def idempotent(response_cls: Type):
+    """
+    Делает RPC идемпотентным по метаданным idempotency-key: повтор с тем же ключом
+    и тем же запросом получает сохранённый ответ. Ключ действует в пределах пользователя
+    из метаданных user-id. Ожидает self.idempotency у сервиса.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, request, context):
+            store: Optional[IdempotencyStore] = self.idempotency
+            metadata = dict(context.invocation_metadata() or ())
+            key = metadata.get(IDEMPOTENCY_METADATA_KEY)
+            if not key or store is None:
+                return await method(self, request, context)
+            if len(key) > IDEMPOTENCY_MAX_KEY_LENGTH:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                                    f"Idempotency key is longer than {IDEMPOTENCY_MAX_KEY_LENGTH}")
+            try:
+                user_id = uuid.UUID(metadata.get(IDEMPOTENCY_USER_METADATA_KEY, ''))
+            except ValueError:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                                    f"Idempotency key requires {IDEMPOTENCY_USER_METADATA_KEY} metadata")
+
+            # Без пользователя в токене чужой запрос с тем же ключом получал бы отказ или ждал бы чужой захват
+            token = f'{method.__name__}:{user_id}:{key}'
+            fingerprint = hashlib.sha256(request.SerializeToString(deterministic=True)).digest()
+            try:
+                replay = await store.begin(token, fingerprint)
+            except IdempotencyKeyReused:
+                await context.abort(grpc.StatusCode.FAILED_PRECONDITION,
+                                    "Idempotency key was already used with a different request")
+            except IdempotencyInProgress:
+                # Не ABORTED: им UpdatePost сообщает о конфликте версий, а здесь повтор нужно просто подождать
+                await context.abort(grpc.StatusCode.ALREADY_EXISTS,
+                                    "Request with this idempotency key is still in progress")
+            if replay is not None:
+                return response_cls.FromString(replay)
+
+            try:
+                response = await method(self, request, context)
+            except BaseException:
+                await store.release(token)
+                raise
+            await store.complete(token, fingerprint, response.SerializeToString())
+            return response
+
+        return wrapper
+
+    return decorator
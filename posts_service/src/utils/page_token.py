@@ -0,0 +1,37 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+
+class InvalidPageToken(ValueError):
+    pass
+
+
+def encode_page_token(created_at: datetime, post_id) -> str:
+    raw = f'{created_at.isoformat()}|{post_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_page_token(token: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        created_at, post_id = raw.split('|')
+        return datetime.fromisoformat(created_at), uuid.UUID(post_id)
+    except ValueError as e:
+        raise InvalidPageToken(f'Invalid page token: {token}') from e
+
+
+def encode_search_token(rank: float, post_id) -> str:
+    # repr сохраняет float без потерь, курсор сравнивается с тем же rank точно
+    raw = f'{rank!r}|{post_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_search_token(token: str) -> Tuple[float, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        rank, post_id = raw.split('|')
+        return float(rank), uuid.UUID(post_id)
+    except ValueError as e:
+        raise InvalidPageToken(f'Invalid page token: {token}') from e
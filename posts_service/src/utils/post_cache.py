@@ -0,0 +1,212 @@
+import itertools
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Protocol, Tuple
+
+from shared.metrics import Counter, registry
+
+POSTS_CACHE_MAX_BYTES = int(os.getenv('POSTS_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+POSTS_CACHE_MAX_ITEM_BYTES = int(os.getenv('POSTS_CACHE_MAX_ITEM_BYTES', 256 * 1024))
+POSTS_CACHE_TTL_S = float(os.getenv('POSTS_CACHE_TTL_S', 30))
+POSTS_CACHE_L2_TTL_S = float(os.getenv('POSTS_CACHE_L2_TTL_S', 300))
+POSTS_CACHE_REDIS_URL = os.getenv('POSTS_CACHE_REDIS_URL')
+
+
+class ByteLruCache:
+    """
+    LRU-кэш сериализованных значений с TTL, ограниченный суммарным размером в байтах.
+    Не потокобезопасен: рассчитан на один event loop.
+    """
+
+    def __init__(self, max_bytes: int, max_item_bytes: int, ttl: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.ttl = ttl
+        self.size_bytes = 0
+        self.evictions = 0
+        self._clock = clock
+        self._data: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= self._clock():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._remove(key)
+        if len(value) > self.max_item_bytes:
+            return
+        self._data[key] = (self._clock() + self.ttl, value)
+        self.size_bytes += len(value)
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.size_bytes -= len(item[1])
+
+
+class SecondTier(Protocol):
+    """Подмножество команд Redis, которое нужно кэшу. Подходит redis.asyncio.Redis."""
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None, nx: bool = False) -> None: ...
+
+    async def delete(self, *keys: str) -> int: ...
+
+
+class LocalRedis:
+    """
+    Локальная замена Redis для тестов и разработки: тот же интерфейс get/set/delete,
+    данные живут в памяти процесса.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None, nx: bool = False) -> None:
+        if nx and await self.get(key) is not None:
+            return
+        self._data[key] = (self._clock() + ex if ex else None, value)
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+
+class PostCache:
+    """
+    Read-through кэш сериализованных PostResponse: L1 в памяти процесса,
+    опционально общий L2 (Redis). L1 других инстансов может отставать не больше чем на его TTL.
+    Ключи — канонический вид UUID поста. Заполнение после промаха (begin_fill/fill)
+    отменяется, если пока шло чтение из базы, ключ перезаписали или инвалидировали:
+    иначе старая строка из базы затёрла бы более новую запись.
+    """
+
+    KEY_PREFIX = 'post:'
+
+    def __init__(self, l1: ByteLruCache, l2: Optional[SecondTier] = None, l2_ttl: float = POSTS_CACHE_L2_TTL_S):
+        self.l1 = l1
+        self.l2 = l2
+        self.l2_ttl = l2_ttl
+        self._fills: Dict[str, int] = {}
+        self._fill_tokens = itertools.count()
+
+        self.hits = registry.counter('posts_cache_hits_total', 'GetPost answered from L1 cache')
+        self.l2_hits = registry.counter('posts_cache_l2_hits_total', 'GetPost answered from L2 cache')
+        self.misses = registry.counter('posts_cache_misses_total', 'GetPost that went to Postgres')
+        registry.gauge('posts_cache_hit_ratio', 'Share of GetPost answered from any cache tier', self.hit_ratio)
+        registry.gauge('posts_cache_l1_evictions', 'Entries evicted from L1 to stay under max bytes',
+                       lambda: self.l1.evictions)
+        registry.gauge('posts_cache_size_bytes', 'Bytes held in L1', lambda: self.l1.size_bytes)
+        registry.gauge('posts_cache_entries', 'Entries held in L1', lambda: len(self.l1))
+
+    def hit_ratio(self) -> float:
+        total = self.hits.value + self.l2_hits.value + self.misses.value
+        return (self.hits.value + self.l2_hits.value) / total if total else 0.0
+
+    @staticmethod
+    def key(post_id: str) -> str:
+        """'ABC…' и 'abc…' — один пост; иначе инвалидация по одному написанию не найдёт запись под другим."""
+        try:
+            return str(uuid.UUID(post_id))
+        except ValueError:
+            return post_id
+
+    async def get(self, post_id: str) -> Optional[bytes]:
+        value, counter = await self._lookup(post_id)
+        counter.inc()
+        return value
+
+    async def peek(self, post_id: str) -> Optional[bytes]:
+        """Как get, но без учёта в hits/misses: служебные чтения не должны искажать долю попаданий GetPost."""
+        value, _ = await self._lookup(post_id)
+        return value
+
+    async def _lookup(self, post_id: str) -> Tuple[Optional[bytes], Counter]:
+        post_id = self.key(post_id)
+        value = self.l1.get(post_id)
+        if value is not None:
+            return value, self.hits
+        if self.l2 is not None:
+            value = await self.l2.get(self.KEY_PREFIX + post_id)
+            if value is not None:
+                self.l1.set(post_id, value)
+                return value, self.l2_hits
+        return None, self.misses
+
+    async def set(self, post_id: str, value: bytes) -> None:
+        """Запись после изменения поста: перезаписывает оба уровня и отменяет начатые заполнения."""
+        post_id = self.key(post_id)
+        self._fills.pop(post_id, None)
+        self.l1.set(post_id, value)
+        if self.l2 is not None:
+            await self.l2.set(self.KEY_PREFIX + post_id, value, ex=int(self.l2_ttl))
+
+    def begin_fill(self, post_id: str) -> int:
+        """Вызывается перед чтением из базы после промаха; токен передаётся в fill."""
+        token = next(self._fill_tokens)
+        self._fills[self.key(post_id)] = token
+        return token
+
+    async def fill(self, post_id: str, value: bytes, token: int) -> None:
+        """Кладёт прочитанное из базы, если с begin_fill ключ не трогали set, invalidate или другое заполнение."""
+        post_id = self.key(post_id)
+        if self._fills.get(post_id) != token:
+            return
+        del self._fills[post_id]
+        self.l1.set(post_id, value)
+        if self.l2 is not None:
+            # nx: запись другого инстанса после изменения поста новее нашего чтения
+            await self.l2.set(self.KEY_PREFIX + post_id, value, ex=int(self.l2_ttl), nx=True)
+
+    def cancel_fill(self, post_id: str, token: int) -> None:
+        """Снимает заполнение, которое не дошло до fill (пост не найден, запрос отменён)."""
+        post_id = self.key(post_id)
+        if self._fills.get(post_id) == token:
+            del self._fills[post_id]
+
+    async def invalidate(self, post_id: str) -> None:
+        post_id = self.key(post_id)
+        self._fills.pop(post_id, None)
+        self.l1.delete(post_id)
+        if self.l2 is not None:
+            await self.l2.delete(self.KEY_PREFIX + post_id)
+
+
+def create_post_cache() -> PostCache:
+    l2 = None
+    if POSTS_CACHE_REDIS_URL:
+        # redis нужен только если настроен второй уровень
+        import redis.asyncio
+        l2 = redis.asyncio.from_url(POSTS_CACHE_REDIS_URL)
+    return PostCache(ByteLruCache(POSTS_CACHE_MAX_BYTES, POSTS_CACHE_MAX_ITEM_BYTES, POSTS_CACHE_TTL_S), l2)
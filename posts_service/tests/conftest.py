@@ -0,0 +1,47 @@
+import importlib.util
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import asyncpg
+import pytest
+import pytest_asyncio
+
+# Модули сервиса импортируют друг друга как top-level пакеты (handlers, utils, ...),
+# общий код — как пакет shared из корня репозитория (в образ он копируется рядом с src)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+
+# Тесты SQL идут в настоящий Postgres: каждый тест получает свою схему с применёнными миграциями
+POSTGRES_TEST_DSN = os.getenv('POSTGRES_TEST_DSN')
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / 'postgresql' / 'migrations'
+
+
+def migration_queries():
+    for path in sorted(MIGRATIONS_DIR.glob('V*.py')):
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module.QUERY
+
+
+@pytest_asyncio.fixture
+async def pool():
+    if not POSTGRES_TEST_DSN:
+        pytest.skip('POSTGRES_TEST_DSN is not set')
+    schema = f'test_{uuid.uuid4().hex}'
+    admin = await asyncpg.connect(POSTGRES_TEST_DSN)
+    await admin.execute(f'CREATE SCHEMA {schema}')
+    pool = await asyncpg.create_pool(POSTGRES_TEST_DSN, min_size=1, max_size=4,
+                                     server_settings={'search_path': f'{schema}, public'})
+    try:
+        async with pool.acquire() as conn:
+            for query in migration_queries():
+                await conn.execute(query)
+        yield pool
+    finally:
+        await pool.close()
+        await admin.execute(f'DROP SCHEMA {schema} CASCADE')
+        await admin.close()
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from shared.events import BrokerError, EventProducer, FileBroker, decode_batch, read_frames
+
+
+def topic_events(broker: FileBroker, topic: str = 'events') -> list:
+    return [event for _, headers, payload in read_frames(broker.topic_path(topic))
+            for event in decode_batch(payload, headers)]
+
+
+class DownBroker(FileBroker):
+    """Брокер, который отказывает, пока up не станет True."""
+
+    def __init__(self, directory: str):
+        super().__init__(directory)
+        self.up = False
+
+    async def send(self, topic, payload, headers):
+        if not self.up:
+            raise BrokerError('broker is down')
+        await super().send(topic, payload, headers)
+
+
+@pytest.mark.asyncio
+async def test_events_are_batched_compressed_and_delivered(tmp_path):
+    broker = FileBroker(str(tmp_path / 'broker'))
+    producer = EventProducer(broker, 'posts_service', topic='events', batch_max_events=10,
+                             linger=0.01, spill_dir=str(tmp_path / 'spill'))
+    producer.start()
+    for i in range(25):
+        assert producer.emit('post_viewed', post_id=str(i), user_id='u')
+    await producer.close()
+
+    events = topic_events(broker)
+    assert [event['post_id'] for event in events] == [str(i) for i in range(25)]
+    assert {event['source'] for event in events} == {'posts_service'}
+    assert producer.batches == 3
+    assert producer.bytes_sent < producer.bytes_raw
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_views_and_spills_the_rest(tmp_path):
+    broker = DownBroker(str(tmp_path / 'broker'))
+    producer = EventProducer(broker, 'posts_service', topic='events', max_queue=10, shed_watermark=0.5,
+                             batch_max_events=5, linger=0.01, retries=0, spill_dir=str(tmp_path / 'spill'))
+    # Отправитель не запущен: emit не ждёт брокер, лишнее уходит по политике переполнения
+    for i in range(5):
+        assert producer.emit('post_created', post_id=f'c{i}')
+    assert not producer.emit('post_viewed', post_id='v')
+    for i in range(5, 20):
+        producer.emit('post_created', post_id=f'c{i}')
+    assert producer.queue_depth() == 10
+    # emit не пишет на диск сам: пачку переполнения сбрасывает фоновая задача
+    assert producer.spilled == 0 and not list((tmp_path / 'spill').iterdir())
+    await producer._spilling
+    assert (producer.shed, producer.spilled) == (1, 10)
+
+    producer.start()
+    await asyncio.sleep(0.1)
+    assert producer.send_failures and not broker.topic_path('events').exists()
+
+    broker.up = True
+    for _ in range(50):
+        await asyncio.sleep(0.02)
+        if not producer.spill_bytes:
+            break
+    await producer.close()
+
+    assert sorted(event['post_id'] for event in topic_events(broker)) == sorted(f'c{i}' for i in range(20))
+    assert not list((tmp_path / 'spill').iterdir())
+
+
+@pytest.mark.asyncio
+async def test_drop_policy_loses_events_without_touching_disk(tmp_path):
+    producer = EventProducer(DownBroker(str(tmp_path / 'broker')), 'userdata_service', max_queue=2,
+                             overflow='drop', retries=0, linger=0.01, spill_dir=str(tmp_path / 'spill'))
+    for i in range(5):
+        producer.emit('user_registered', user_id=str(i))
+    producer.start()
+    await producer.close()
+
+    assert producer.dropped == 5
+    assert not (tmp_path / 'spill').exists()
@@ -0,0 +1,142 @@
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from main_grpc import POST_COLUMNS
+from utils.feed import FeedStore
+from utils.follow_graph import Followee, LocalFollowGraph
+from utils.post_cache import ByteLruCache
+
+
+@pytest.mark.asyncio
+async def test_local_follow_graph_pages_followers():
+    graph = LocalFollowGraph()
+    for follower in ('a', 'b', 'c'):
+        graph.follow(follower, 'author')
+    graph.follow('a', 'other')
+
+    first = await graph.followers('author', None, 2)
+    assert first == (3, ['a', 'b'], 'b')
+    assert await graph.followers('author', first.next_after, 2) == (3, ['c'], None)
+    assert sorted(await graph.followees('a')) == [('author', 3), ('other', 1)]
+    assert await graph.followees('a', min_followers=2) == [Followee('author', 3)]
+
+    graph.unfollow('a', 'author')
+    assert (await graph.followers('author', None, 10)).followers == ['b', 'c']
+
+
+@pytest.mark.asyncio
+async def test_popular_author_is_not_fanned_out():
+    graph = LocalFollowGraph()
+    for follower in ('a', 'b', 'c'):
+        graph.follow(follower, 'celebrity')
+    # До базы дело не доходит: pull-автор отсекается по числу подписчиков
+    feed = FeedStore(None, graph, ByteLruCache(1024, 1024, ttl=60), pull_min_followers=3)
+
+    assert await feed.fan_out('celebrity', 'post', None) == 0
+    assert await feed.followees('a') == [('celebrity', 3)]
+
+
+@pytest.mark.asyncio
+async def test_followees_survive_userdata_outage():
+    class BrokenGraph(LocalFollowGraph):
+        async def followees(self, user_id, min_followers=0):
+            raise httpx.ConnectError('userdata is down')
+
+    cache = ByteLruCache(1024, 1024, ttl=60)
+    feed = FeedStore(None, BrokenGraph(), cache)
+
+    assert await feed.followees('a') is None
+    # Ответ из-за сбоя не кэшируется
+    assert cache.get('a') is None
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+T0 = datetime(2026, 1, 1)
+
+
+async def insert_post(pool, creator_user_id: str, minutes: int, is_private: bool = False) -> str:
+    async with pool.acquire() as conn:
+        post_id = await conn.fetchval(
+            """
+                INSERT INTO posts_data (creator_user_id, title, content, created_at, is_private)
+                VALUES ($1, 'title', 'content', $2, $3) RETURNING post_id
+            """,
+            uuid.UUID(creator_user_id), T0 + timedelta(minutes=minutes), is_private,
+        )
+    return str(post_id)
+
+
+async def feed_post_ids(pool, user_id: str) -> list:
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            "SELECT post_id FROM feed_items WHERE user_id = $1 ORDER BY created_at DESC, post_id DESC",
+            uuid.UUID(user_id),
+        )
+    return [str(row['post_id']) for row in rows]
+
+
+def user() -> str:
+    return str(uuid.uuid4())
+
+
+@pytest.mark.asyncio
+async def test_push_is_idempotent_and_trims_to_max_length(pool):
+    graph = LocalFollowGraph()
+    author, reader = user(), user()
+    graph.follow(reader, author)
+    feed = FeedStore(pool, graph, ByteLruCache(1024, 1024, ttl=60), max_length=2, trim_every=3)
+
+    posts = [await insert_post(pool, author, minutes) for minutes in range(4)]
+    for minutes, post in enumerate(posts[:3]):
+        assert await feed.fan_out(author, post, T0 + timedelta(minutes=minutes)) == 1
+    # Третья раскладка обрезала ленту до двух последних постов
+    assert await feed_post_ids(pool, reader) == posts[2:0:-1]
+
+    await feed.fan_out(author, posts[3], T0 + timedelta(minutes=3))
+    await feed.fan_out(author, posts[3], T0 + timedelta(minutes=3))
+    # Между обрезками лента растёт, повтор раскладки записей не дублирует
+    assert await feed_post_ids(pool, reader) == posts[3:0:-1]
+
+
+@pytest.mark.asyncio
+async def test_read_page_merges_pushed_and_pulled_posts(pool):
+    graph = LocalFollowGraph()
+    author, celebrity, reader, fan = user(), user(), user(), user()
+    graph.follow(reader, author)
+    graph.follow(reader, celebrity)
+    graph.follow(fan, celebrity)
+    clock = Clock()
+    feed = FeedStore(pool, graph, ByteLruCache(1 << 16, 1 << 16, ttl=30, clock=clock), pull_min_followers=2)
+
+    pushed = []
+    for minutes in (0, 2, 4):
+        post = await insert_post(pool, author, minutes)
+        await feed.fan_out(author, post, T0 + timedelta(minutes=minutes))
+        pushed.append(post)
+    pulled = [await insert_post(pool, celebrity, minutes) for minutes in (1, 3)]
+    # Приватный пост в ленту не попадает, даже если успел разложиться
+    secret = await insert_post(pool, author, 5, is_private=True)
+    await feed.fan_out(author, secret, T0 + timedelta(minutes=5))
+    assert await feed.fan_out(celebrity, pulled[1], T0 + timedelta(minutes=3)) == 0
+
+    first = await feed.read_page(uuid.UUID(reader), 3, POST_COLUMNS)
+    assert [str(row['post_id']) for row in first] == [pushed[2], pulled[1], pushed[1]]
+    last = first[-1]
+    second = await feed.read_page(uuid.UUID(reader), 3, POST_COLUMNS, (last['created_at'], last['post_id']))
+    assert [str(row['post_id']) for row in second] == [pulled[0], pushed[0]]
+
+    # После отписки разложенные посты автора пропадают из ленты, как только истечёт кэш подписок
+    graph.unfollow(reader, author)
+    clock.now += 31
+    page = await feed.read_page(uuid.UUID(reader), 10, POST_COLUMNS)
+    assert [str(row['post_id']) for row in page] == pulled[::-1]
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import uuid
+
+import grpc
+import pytest
+
+from proto.posts_service_pb2 import ReactionRequest, ReactionResponse
+from utils.idempotency import IdempotencyInProgress, IdempotencyKeyReused, IdempotencyStore, idempotent
+from utils.post_cache import ByteLruCache
+
+
+def fingerprint(value: str) -> bytes:
+    return hashlib.sha256(value.encode()).digest()
+
+
+def make_store(pool, **kwargs) -> IdempotencyStore:
+    return IdempotencyStore(pool, ByteLruCache(1 << 16, 1 << 16, ttl=60), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_completed_response_is_replayed(pool):
+    store = make_store(pool)
+    assert await store.begin('CreatePost:k', fingerprint('a')) is None
+    with pytest.raises(IdempotencyInProgress):
+        await store.begin('CreatePost:k', fingerprint('a'))
+    await store.complete('CreatePost:k', fingerprint('a'), b'response')
+
+    assert await store.begin('CreatePost:k', fingerprint('a')) == b'response'
+    # Другой процесс без ответа в памяти читает его из idempotency_data
+    other = make_store(pool)
+    assert await other.begin('CreatePost:k', fingerprint('a')) == b'response'
+    assert other.front.get('CreatePost:k') == fingerprint('a') + b'response'
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_other_request_is_rejected(pool):
+    store = make_store(pool)
+    await store.begin('CreatePost:k', fingerprint('a'))
+    await store.complete('CreatePost:k', fingerprint('a'), b'response')
+    with pytest.raises(IdempotencyKeyReused):
+        await store.begin('CreatePost:k', fingerprint('b'))
+    with pytest.raises(IdempotencyKeyReused):
+        await make_store(pool).begin('CreatePost:k', fingerprint('b'))
+
+
+@pytest.mark.asyncio
+async def test_released_and_abandoned_claims_can_be_taken_over(pool):
+    store = make_store(pool, claim_timeout=0.05)
+    assert await store.begin('CreatePost:released', fingerprint('a')) is None
+    await store.release('CreatePost:released')
+    # После ошибки повтор выполняется заново, в том числе с другим телом
+    assert await store.begin('CreatePost:released', fingerprint('b')) is None
+
+    assert await store.begin('CreatePost:abandoned', fingerprint('a')) is None
+    with pytest.raises(IdempotencyInProgress):
+        await store.begin('CreatePost:abandoned', fingerprint('a'))
+    await asyncio.sleep(0.1)
+    # Процесс, захвативший ключ, упал: по истечении claim_timeout ключ перехватывается
+    assert await store.begin('CreatePost:abandoned', fingerprint('a')) is None
+    await store.complete('CreatePost:abandoned', fingerprint('a'), b'response')
+    # release не трогает завершённый ответ
+    await store.release('CreatePost:abandoned')
+    assert await make_store(pool).begin('CreatePost:abandoned', fingerprint('a')) == b'response'
+
+
+class Aborted(Exception):
+    def __init__(self, code: grpc.StatusCode, details: str):
+        super().__init__(details)
+        self.code = code
+
+
+class FakeContext:
+    def __init__(self, key: str, user_id: str):
+        self.metadata = (('idempotency-key', key), ('user-id', user_id))
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    async def abort(self, code, details):
+        raise Aborted(code, details)
+
+
+class FakeService:
+    def __init__(self, store: IdempotencyStore):
+        self.idempotency = store
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    @idempotent(ReactionResponse)
+    async def AddReaction(self, request: ReactionRequest, context) -> ReactionResponse:
+        self.calls += 1
+        await self.release.wait()
+        return ReactionResponse(post_id=request.post_id, reaction_type=request.reaction_type, count=self.calls)
+
+
+@pytest.mark.asyncio
+async def test_decorator_scopes_keys_by_user_and_maps_errors(pool):
+    service = FakeService(make_store(pool))
+    alice, bob = str(uuid.uuid4()), str(uuid.uuid4())
+    like = ReactionRequest(post_id='p', user_id=alice, reaction_type='like')
+
+    first = await service.AddReaction(like, FakeContext('k', alice))
+    assert await service.AddReaction(like, FakeContext('k', alice)) == first
+    assert service.calls == 1
+
+    # Тот же ключ у другого пользователя — отдельный запрос, а не конфликт
+    bob_like = ReactionRequest(post_id='p', user_id=bob, reaction_type='like')
+    assert (await service.AddReaction(bob_like, FakeContext('k', bob))).count == 2
+
+    with pytest.raises(Aborted) as reused:
+        await service.AddReaction(ReactionRequest(post_id='other', user_id=alice), FakeContext('k', alice))
+    assert reused.value.code == grpc.StatusCode.FAILED_PRECONDITION
+
+    service.release.clear()
+    running = asyncio.create_task(service.AddReaction(like, FakeContext('slow', alice)))
+    await asyncio.sleep(0.05)
+    with pytest.raises(Aborted) as in_progress:
+        await service.AddReaction(like, FakeContext('slow', alice))
+    assert in_progress.value.code == grpc.StatusCode.ALREADY_EXISTS
+    service.release.set()
+    await running
+
+    with pytest.raises(Aborted) as anonymous:
+        await service.AddReaction(like, FakeContext('k', ''))
+    assert anonymous.value.code == grpc.StatusCode.INVALID_ARGUMENT
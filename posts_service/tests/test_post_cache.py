@@ -0,0 +1,105 @@
+import pytest
+
+from utils.post_cache import ByteLruCache, LocalRedis, PostCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_l1_is_bounded_by_bytes_and_ttl():
+    clock = FakeClock()
+    cache = ByteLruCache(max_bytes=10, max_item_bytes=8, ttl=5, clock=clock)
+    cache.set('a', b'1234')
+    cache.set('b', b'1234')
+    cache.get('a')
+    cache.set('c', b'1234')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234'
+    assert cache.size_bytes == 8
+    assert cache.evictions == 1
+
+    cache.set('huge', b'123456789')
+    assert cache.get('huge') is None
+
+    clock.now = 5
+    assert cache.get('a') is None
+    assert cache.size_bytes == 4
+
+
+@pytest.mark.asyncio
+async def test_read_through_tiers_and_invalidation():
+    l2 = LocalRedis()
+    cache = PostCache(ByteLruCache(1024, 1024, ttl=60), l2)
+    other_instance = PostCache(ByteLruCache(1024, 1024, ttl=60), l2)
+
+    assert await cache.get('post') is None
+    await cache.set('post', b'payload')
+    assert await cache.get('post') == b'payload'
+    assert await other_instance.get('post') == b'payload'
+    assert other_instance.l2_hits.value == 1
+
+    await cache.invalidate('post')
+    assert await cache.get('post') is None
+    assert await l2.get(PostCache.KEY_PREFIX + 'post') is None
+
+
+@pytest.mark.asyncio
+async def test_peek_is_not_counted_in_hit_ratio():
+    l2 = LocalRedis()
+    cache = PostCache(ByteLruCache(1024, 1024, ttl=60), l2)
+    assert await cache.peek('post') is None
+    await PostCache(ByteLruCache(1024, 1024, ttl=60), l2).set('post', b'payload')
+    assert await cache.peek('post') == b'payload'
+    assert await cache.peek('post') == b'payload'
+    assert (cache.hits.value, cache.l2_hits.value, cache.misses.value) == (0, 0, 0)
+
+    # peek поднял запись из L2 в L1: GetPost после него — попадание в L1
+    assert await cache.get('post') == b'payload'
+    assert (cache.hits.value, cache.hit_ratio()) == (1, 1.0)
+
+
+@pytest.mark.asyncio
+async def test_keys_are_canonical_uuids():
+    cache = PostCache(ByteLruCache(1024, 1024, ttl=60), LocalRedis())
+    post_id = 'A5D4C3B2-0000-4000-8000-00000000000F'
+    await cache.set(post_id, b'payload')
+    assert await cache.get(post_id.lower()) == b'payload'
+
+    await cache.invalidate('{' + post_id.lower() + '}')
+    assert await cache.get(post_id) is None
+
+
+@pytest.mark.asyncio
+async def test_fill_loses_to_writes_made_during_the_read():
+    l2 = LocalRedis()
+    cache = PostCache(ByteLruCache(1024, 1024, ttl=60), l2)
+
+    # UpdatePost записал новую версию, пока GetPost читал старую строку из базы
+    token = cache.begin_fill('post')
+    await cache.set('post', b'v2')
+    await cache.fill('post', b'v1', token)
+    assert await cache.get('post') == b'v2'
+
+    # То же с удалением: удалённый пост не возвращается в кэш
+    token = cache.begin_fill('post')
+    await cache.invalidate('post')
+    await cache.fill('post', b'v2', token)
+    assert await cache.get('post') is None
+
+    token = cache.begin_fill('post')
+    await cache.fill('post', b'v3', token)
+    assert await cache.get('post') == b'v3'
+    cache.cancel_fill('post', token)
+    assert not cache._fills
+
+    # Заполнение L2 не затирает запись другого инстанса
+    await l2.set(PostCache.KEY_PREFIX + 'other', b'newer')
+    token = cache.begin_fill('other')
+    await cache.fill('other', b'older', token)
+    assert await l2.get(PostCache.KEY_PREFIX + 'other') == b'newer'
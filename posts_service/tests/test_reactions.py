@@ -0,0 +1,53 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from main_grpc import Database
+
+
+@pytest.mark.asyncio
+async def test_sharded_reaction_counts_sum_on_read(pool):
+    db = Database(pool)
+    post = await db.create_post(uuid.uuid4(), uuid.uuid4(), 'title', 'content', False, [])
+    post_id = post['post_id']
+    users = [uuid.uuid4() for _ in range(40)]
+
+    results = await asyncio.gather(*(db.add_reaction(post_id, user, 'like') for user in users))
+    assert all(result['changed'] for result in results)
+    await db.add_reaction(post_id, users[0], 'fire')
+    # Повторная реакция не считается
+    assert dict(await db.add_reaction(post_id, users[0], 'like')) == {'changed': False, 'count': 40}
+
+    for user in users[:30]:
+        await db.remove_reaction(post_id, user, 'like')
+    assert dict(await db.remove_reaction(post_id, users[0], 'fire')) == {'changed': True, 'count': 0}
+
+    async with pool.acquire() as conn:
+        shards = await conn.fetchval(
+            "SELECT count(*) FROM post_reaction_counts WHERE post_id = $1 AND reaction_type = 'like'", post_id,
+        )
+    # 40 вставок и 30 удалений по случайным шардам не ложатся в одну строку
+    assert shards > 1
+    # Тип с нулевой суммой в ответ не попадает
+    assert json.loads((await db.get_post(post_id))['reaction_counts']) == {'like': 10}
+    assert json.loads((await db.get_post_version(post_id))['reaction_counts']) == {'like': 10}
+
+
+@pytest.mark.asyncio
+async def test_deleting_post_with_reactions_drops_its_counters(pool):
+    db = Database(pool)
+    author = uuid.uuid4()
+    post = await db.create_post(uuid.uuid4(), author, 'title', 'content', False, [])
+    post_id = post['post_id']
+    users = [uuid.uuid4() for _ in range(5)]
+    for user in users:
+        await db.add_reaction(post_id, user, 'like')
+    await db.remove_reaction(post_id, users[0], 'like')
+
+    # Каскад из posts_data удаляет реакции; триггер не должен писать счётчик уже удалённого поста
+    assert dict(await db.delete_post(post_id, author)) == {'found': True, 'deleted': True}
+    async with pool.acquire() as conn:
+        assert await conn.fetchval("SELECT count(*) FROM post_reaction_counts WHERE post_id = $1", post_id) == 0
+        assert await conn.fetchval("SELECT count(*) FROM reactions_data WHERE post_id = $1", post_id) == 0
@@ -0,0 +1,405 @@
+# Общая библиотека событий статистики: её используют posts_service, userdata_service и statistics_service
+import asyncio
+import itertools
+import json
+import logging
+import os
+import struct
+import time
+import uuid
+import zlib
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVENTS_BROKER_URL = os.getenv('EVENTS_BROKER_URL')
+EVENTS_TOPIC = os.getenv('EVENTS_TOPIC', 'statistics-events')
+EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', 100_000))
+# После этой доли очереди события из SHEDDABLE_EVENTS сбрасываются, чтобы оставить место остальным
+EVENTS_SHED_WATERMARK = float(os.getenv('EVENTS_SHED_WATERMARK', 0.8))
+EVENTS_BATCH_MAX_EVENTS = int(os.getenv('EVENTS_BATCH_MAX_EVENTS', 1_000))
+EVENTS_BATCH_MAX_BYTES = int(os.getenv('EVENTS_BATCH_MAX_BYTES', 512 * 1024))
+EVENTS_LINGER_S = float(os.getenv('EVENTS_LINGER_S', 0.2))
+# Уровень zlib; 0 — пачки уходят без сжатия
+EVENTS_COMPRESSION_LEVEL = int(os.getenv('EVENTS_COMPRESSION_LEVEL', 1))
+EVENTS_SEND_RETRIES = int(os.getenv('EVENTS_SEND_RETRIES', 3))
+EVENTS_RETRY_BACKOFF_S = float(os.getenv('EVENTS_RETRY_BACKOFF_S', 0.1))
+# drop — лишние события теряются; spill — пишутся на диск и досылаются, когда брокер доступен
+EVENTS_OVERFLOW = os.getenv('EVENTS_OVERFLOW', 'spill')
+EVENTS_SPILL_DIR = os.getenv('EVENTS_SPILL_DIR', '/tmp/events-spill')
+EVENTS_SPILL_MAX_BYTES = int(os.getenv('EVENTS_SPILL_MAX_BYTES', 256 * 1024 * 1024))
+EVENTS_CLOSE_TIMEOUT_S = float(os.getenv('EVENTS_CLOSE_TIMEOUT_S', 5))
+
+# Массовые и наименее ценные события: при заполненной очереди теряются первыми
+SHEDDABLE_EVENTS = frozenset({'post_viewed'})
+
+FRAME_HEADER = struct.Struct('>II')
+
+
+class BrokerError(Exception):
+    """Брокер не принял пачку."""
+
+
+class Broker(Protocol):
+    async def send(self, topic: str, payload: bytes, headers: Dict[str, str]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+def encode_frame(headers: Dict[str, str], payload: bytes) -> bytes:
+    header = json.dumps(headers).encode()
+    return FRAME_HEADER.pack(len(header), len(payload)) + header + payload
+
+
+def read_frames(path: Path, offset: int = 0) -> Iterator[Tuple[int, Dict[str, str], bytes]]:
+    """Кадры из файла FileBroker или spill-файла начиная с offset; вместе с кадром отдаёт offset следующего."""
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        while True:
+            prefix = file.read(FRAME_HEADER.size)
+            if len(prefix) < FRAME_HEADER.size:
+                return
+            header_size, payload_size = FRAME_HEADER.unpack(prefix)
+            header = file.read(header_size)
+            payload = file.read(payload_size)
+            if len(payload) < payload_size:
+                # Кадр ещё дописывается
+                return
+            offset += FRAME_HEADER.size + header_size + payload_size
+            yield offset, json.loads(header), payload
+
+
+def encode_event(event: dict) -> bytes:
+    return json.dumps(event, default=str).encode() + b'\n'
+
+
+def encode_batch(events: List[dict], compression_level: int = EVENTS_COMPRESSION_LEVEL) -> Tuple[bytes, Dict[str, str]]:
+    return encode_lines([encode_event(event) for event in events], compression_level)
+
+
+def encode_lines(lines: List[bytes], compression_level: int = EVENTS_COMPRESSION_LEVEL) -> Tuple[bytes, Dict[str, str]]:
+    payload = b''.join(lines)
+    headers = {'content-type': 'application/x-ndjson', 'events': str(len(lines))}
+    if compression_level:
+        payload = zlib.compress(payload, compression_level)
+        headers['content-encoding'] = 'deflate'
+    return payload, headers
+
+
+def decode_batch(payload: bytes, headers: Dict[str, str]) -> List[dict]:
+    if headers.get('content-encoding') == 'deflate':
+        payload = zlib.decompress(payload)
+    # json.dumps экранирует переводы строк, поэтому пачка разбирается одним вызовом как массив
+    return json.loads(b'[' + payload.rstrip(b'\n').replace(b'\n', b',') + b']')
+
+
+class FileBroker:
+    """
+    Локальная замена брокера для тестов и разработки: пачки дописываются кадрами
+    в <directory>/<topic>.log, потребитель читает их через read_frames.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def topic_path(self, topic: str) -> Path:
+        return self.directory / f'{topic}.log'
+
+    async def send(self, topic: str, payload: bytes, headers: Dict[str, str]) -> None:
+        await asyncio.to_thread(self._append, self.topic_path(topic), encode_frame(headers, payload))
+
+    @staticmethod
+    def _append(path: Path, frame: bytes) -> None:
+        with open(path, 'ab') as file:
+            file.write(frame)
+
+    async def close(self) -> None:
+        pass
+
+
+class KafkaBroker:
+    """Пачка уходит одним сообщением Kafka; сжатие и батчинг уже сделаны продюсером."""
+
+    def __init__(self, bootstrap_servers: str):
+        # aiokafka нужен только если брокер — Kafka
+        from aiokafka import AIOKafkaProducer
+        from aiokafka.errors import KafkaError
+        self._kafka_error = KafkaError
+        self._producer = AIOKafkaProducer(bootstrap_servers=bootstrap_servers, acks='all')
+        self._started = False
+
+    async def send(self, topic: str, payload: bytes, headers: Dict[str, str]) -> None:
+        try:
+            if not self._started:
+                await self._producer.start()
+                self._started = True
+            await self._producer.send_and_wait(
+                topic, payload, headers=[(name, value.encode()) for name, value in headers.items()],
+            )
+        except self._kafka_error as e:
+            raise BrokerError(str(e)) from e
+
+    async def close(self) -> None:
+        if self._started:
+            await self._producer.stop()
+
+
+class EventProducer:
+    """
+    Неблокирующая отправка событий в брокер. emit только кладёт событие в очередь в памяти,
+    фоновая задача собирает пачки по размеру или по linger, сжимает и отправляет с ретраями.
+    Если брокер недоступен или очередь переполнена, события по политике overflow
+    теряются или пишутся на диск и досылаются позже. Не потокобезопасен: рассчитан на один event loop.
+    """
+
+    def __init__(self, broker: Broker, source: str, topic: str = EVENTS_TOPIC,
+                 max_queue: int = EVENTS_QUEUE_SIZE, shed_watermark: float = EVENTS_SHED_WATERMARK,
+                 batch_max_events: int = EVENTS_BATCH_MAX_EVENTS, batch_max_bytes: int = EVENTS_BATCH_MAX_BYTES,
+                 linger: float = EVENTS_LINGER_S, compression_level: int = EVENTS_COMPRESSION_LEVEL,
+                 retries: int = EVENTS_SEND_RETRIES, retry_backoff: float = EVENTS_RETRY_BACKOFF_S,
+                 overflow: str = EVENTS_OVERFLOW, spill_dir: str = EVENTS_SPILL_DIR,
+                 spill_max_bytes: int = EVENTS_SPILL_MAX_BYTES):
+        if overflow not in ('drop', 'spill'):
+            raise ValueError(f'Unknown overflow policy: {overflow}')
+        self.broker = broker
+        self.source = source
+        self.topic = topic
+        self.max_queue = max_queue
+        self.shed_at = int(max_queue * shed_watermark)
+        self.batch_max_events = batch_max_events
+        self.batch_max_bytes = batch_max_bytes
+        self.linger = linger
+        self.compression_level = compression_level
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.overflow = overflow
+        self.spill_dir = Path(spill_dir)
+        self.spill_max_bytes = spill_max_bytes
+
+        self._queue: Deque[dict] = deque()
+        # События, не поместившиеся в очередь: возвращаются в неё, когда освободится место,
+        # или целой пачкой уходят на диск
+        self._overflow: List[dict] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._spilling: Optional[asyncio.Task] = None
+        self._closing = False
+        self._healthy = True
+        self._spill_seq = itertools.count()
+        self.spill_bytes = 0
+        if overflow == 'spill':
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            # Досылаются и файлы, оставшиеся от прошлого запуска
+            self.spill_bytes = sum(path.stat().st_size for path in self._spill_files())
+
+        self.emitted = 0
+        self.sent = 0
+        self.batches = 0
+        self.bytes_raw = 0
+        self.bytes_sent = 0
+        self.shed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.send_failures = 0
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def emit(self, event_type: str, **fields) -> bool:
+        """Кладёт событие в очередь и сразу возвращается; False, если оно не попало в очередь."""
+        event = {
+            'event_id': uuid.uuid4().hex,
+            'event_type': event_type,
+            'source': self.source,
+            'timestamp': time.time(),
+            **fields,
+        }
+        self.emitted += 1
+        depth = len(self._queue)
+        if event_type in SHEDDABLE_EVENTS and depth >= self.shed_at:
+            self.shed += 1
+            return False
+        if depth >= self.max_queue:
+            self._overflow_event(event)
+            return False
+        self._queue.append(event)
+        if depth == 0 or depth + 1 >= self.batch_max_events:
+            self._wakeup.set()
+        return True
+
+    def _overflow_event(self, event: dict) -> None:
+        # Переполнение тоже ограничено: пока запись на диск не успевает, лишнее теряется
+        if self.overflow == 'drop' or len(self._overflow) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._overflow.append(event)
+        if len(self._overflow) >= self.batch_max_events and self._spilling is None:
+            # Диск пишет отдельная задача: emit не ждёт ни брокер, ни файловую систему,
+            # а _run может в это время висеть на ретраях отправки
+            self._spilling = asyncio.create_task(self._spill_overflow())
+
+    async def _spill_overflow(self) -> None:
+        try:
+            while len(self._overflow) >= self.batch_max_events:
+                batch = self._overflow[:self.batch_max_events]
+                self._overflow = self._overflow[self.batch_max_events:]
+                await self._spill(*encode_batch(batch, self.compression_level))
+        finally:
+            self._spilling = None
+
+    async def _run(self) -> None:
+        while True:
+            events = await self._collect()
+            if events:
+                await self._deliver(events)
+            elif self._closing:
+                return
+            if self._overflow and len(self._queue) + len(self._overflow) <= self.max_queue:
+                self._queue.extend(self._overflow)
+                self._overflow = []
+            # Пока брокер недоступен, досылка пробует его только в простое, не задерживая свежие события
+            if self.spill_bytes and not self._closing and (self._healthy or not self._queue):
+                await self._replay_one()
+
+    async def _collect(self) -> List[dict]:
+        """Первое событие ждёт не дольше linger, затем добирает пачку до batch_max_events или до конца linger."""
+        if not self._queue and not self._closing:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.linger)
+            except asyncio.TimeoutError:
+                return []
+        deadline = time.monotonic() + self.linger
+        while len(self._queue) < self.batch_max_events and not self._closing:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return [self._queue.popleft() for _ in range(min(len(self._queue), self.batch_max_events))]
+
+    async def _deliver(self, events: List[dict]) -> None:
+        # Пачка ограничена и по байтам: лишние события возвращаются в начало очереди
+        lines, size = [], 0
+        for event in events:
+            line = encode_event(event)
+            if lines and size + len(line) > self.batch_max_bytes:
+                break
+            lines.append(line)
+            size += len(line)
+        self._queue.extendleft(reversed(events[len(lines):]))
+
+        payload, headers = encode_lines(lines, self.compression_level)
+        self.bytes_raw += size
+        if await self._send(payload, headers):
+            self.sent += len(lines)
+        elif self.overflow == 'spill':
+            await self._spill(payload, headers)
+        else:
+            self.dropped += len(lines)
+
+    async def _send(self, payload: bytes, headers: Dict[str, str]) -> bool:
+        for attempt in range(self.retries + 1):
+            try:
+                await self.broker.send(self.topic, payload, headers)
+            except (BrokerError, OSError):
+                logger.warning('Event batch was not accepted by the broker', exc_info=True)
+                if attempt < self.retries and not self._closing:
+                    await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+                    continue
+                self.send_failures += 1
+                self._healthy = False
+                return False
+            self._healthy = True
+            self.batches += 1
+            self.bytes_sent += len(payload)
+            return True
+        return False
+
+    def _spill_files(self) -> List[Path]:
+        return sorted(self.spill_dir.glob('*.spill'))
+
+    async def _spill(self, payload: bytes, headers: Dict[str, str]) -> None:
+        count = int(headers['events'])
+        frame = encode_frame(headers, payload)
+        if self.spill_bytes + len(frame) > self.spill_max_bytes:
+            self.dropped += count
+            return
+        # Место резервируется до записи, чтобы параллельные записи не превысили лимит
+        self.spill_bytes += len(frame)
+        # Время в имени сохраняет порядок досылки, в том числе между перезапусками
+        path = self.spill_dir / f'{time.time_ns():020d}-{next(self._spill_seq):06d}.spill'
+        try:
+            await asyncio.to_thread(path.write_bytes, frame)
+        except OSError:
+            logger.exception('Cannot spill events to %s', path)
+            self.spill_bytes -= len(frame)
+            self.dropped += count
+            return
+        self.spilled += count
+
+    async def _replay_one(self) -> None:
+        """
+        Досылает самый старый spill-файл. Если брокер откажет посреди файла, файл позже
+        уйдёт целиком: доставка at-least-once, повторы отсекаются по event_id.
+        """
+        # Файловые операции — в пуле потоков, как и запись spill: event loop обслуживает RPC
+        files = await asyncio.to_thread(self._spill_files)
+        if not files:
+            self.spill_bytes = 0
+            return
+        path = files[0]
+        frames = await asyncio.to_thread(lambda: list(read_frames(path)))
+        for _, headers, payload in frames:
+            if not await self._send(payload, headers):
+                return
+            self.replayed += int(headers['events'])
+        size = (await asyncio.to_thread(path.stat)).st_size
+        await asyncio.to_thread(path.unlink)
+        self.spill_bytes = max(0, self.spill_bytes - size)
+
+    async def close(self, timeout: float = EVENTS_CLOSE_TIMEOUT_S) -> None:
+        """Досылает очередь; что не успело уйти за timeout, по политике spill пишется на диск."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                pass
+        if self._spilling is not None:
+            await self._spilling
+        leftover = [*self._queue, *self._overflow]
+        self._queue.clear()
+        self._overflow = []
+        if leftover:
+            if self.overflow == 'spill':
+                await self._spill(*encode_batch(leftover, self.compression_level))
+            else:
+                self.dropped += len(leftover)
+        await self.broker.close()
+
+
+def create_broker(url: str) -> Broker:
+    if url.startswith('file://'):
+        return FileBroker(url[len('file://'):])
+    if url.startswith('kafka://'):
+        return KafkaBroker(url[len('kafka://'):])
+    raise ValueError(f'Unsupported EVENTS_BROKER_URL: {url}')
+
+
+def create_event_producer(source: str) -> Optional[EventProducer]:
+    """None, если брокер не настроен: сервис работает и без статистики."""
+    if not EVENTS_BROKER_URL:
+        return None
+    return EventProducer(create_broker(EVENTS_BROKER_URL), source)
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Callable, Dict, List
+
+
+class Counter:
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    def __init__(self, name: str, description: str, getter: Callable[[], float] = None):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._getter = getter
+
+    @property
+    def value(self) -> float:
+        if self._getter is not None:
+            return self._getter()
+        return self._value
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._value -= amount
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Counter | Gauge] = {}
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(self, name: str, description: str, getter: Callable[[], float] = None) -> Gauge:
+        return self._register(Gauge(name, description, getter))
+
+    def _register(self, metric):
+        # Повторная регистрация заменяет метрику: так пересоздание клиента или кэша не ломает экспорт
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Отдаёт метрики в текстовом формате Prometheus."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            kind = 'counter' if isinstance(metric, Counter) else 'gauge'
+            lines.append(f'# HELP {metric.name} {metric.description}')
+            lines.append(f'# TYPE {metric.name} {kind}')
+            lines.append(f'{metric.name} {metric.value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+async def serve_metrics(host: str, port: int) -> asyncio.Server:
+    """
+    Минимальный HTTP-эндпоинт для Prometheus рядом с gRPC-сервером:
+    на любой запрос отдаёт registry.render().
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await reader.readuntil(b'\r\n\r\n')
+            body = registry.render().encode()
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: text/plain; version=0.0.4\r\n'
+                + f'Content-Length: {len(body)}\r\n'.encode()
+                + b'Connection: close\r\n\r\n'
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,140 @@
+"""
+Пропускная способность статистики в событиях в секунду: разбор пачек продюсера,
+раскладка по колонкам, свёртка в бакеты (против словаря на чистом Python) и запись партиций,
+плюс задержки запросов на наполненном хранилище.
+Популярность постов распределена по Zipf, события равномерно растянуты на --days.
+
+Запуск:
+    PYTHONPATH=src:.. python benchmarks/bench_ingest.py --events 5000000 --posts 200000
+"""
+import argparse
+import asyncio
+import collections
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from shared.events import decode_batch, encode_batch
+from utils.partitions import NpzFormat, PartitionStorage
+from utils.stats_store import KINDS, VIEWED, StatsStore, aggregate
+
+# Доли типов событий: просмотров на порядки больше остального
+KIND_SHARES = (0.9, 0.07, 0.03)
+
+
+def make_batches(args, rng: np.random.Generator) -> tuple:
+    post_ids = [f'{i:08x}-0000-4000-8000-{i:012x}' for i in range(args.posts)]
+    author_ids = [f'author-{i}' for i in range(args.authors)]
+    started = time.time() - args.days * 86400
+    batches = [encode_batch([
+        {'event_type': 'post_created', 'post_id': post_id, 'user_id': author_ids[i % args.authors],
+         'timestamp': started, 'source': 'posts_service'}
+        for i, post_id in enumerate(post_ids)
+    ])]
+    posts = np.minimum(rng.zipf(args.zipf, args.events) - 1, args.posts - 1)
+    kinds = rng.choice(len(KIND_SHARES), args.events, p=KIND_SHARES)
+    timestamps = np.sort(rng.uniform(started, time.time(), args.events))
+    for start in range(0, args.events, args.batch):
+        end = min(start + args.batch, args.events)
+        batches.append(encode_batch([
+            {'event_type': KINDS[kind], 'post_id': post_ids[post], 'user_id': 'reader',
+             'timestamp': float(timestamp), 'source': 'posts_service'}
+            for post, kind, timestamp in zip(posts[start:end], kinds[start:end], timestamps[start:end])
+        ]))
+    return batches, posts.astype(np.int32), kinds.astype(np.uint8), timestamps.astype(np.int64)
+
+
+def report(name: str, events: int, elapsed: float):
+    print(f'{name:>34}: {events / elapsed:12,.0f} events/s  ({elapsed:6.2f}s)')
+
+
+def naive_roll_up(timestamps: np.ndarray, kinds: np.ndarray, posts: np.ndarray, bucket_s: int) -> dict:
+    counts = collections.Counter()
+    for timestamp, kind, post in zip(timestamps.tolist(), kinds.tolist(), posts.tolist()):
+        counts[timestamp // bucket_s, post, kind] += 1
+    return counts
+
+
+def measure(name: str, query, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        query()
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f'{name:>34}: p50={statistics.median(latencies):8.3f}ms  max={max(latencies):8.3f}ms')
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=5_000_000)
+    parser.add_argument('--posts', type=int, default=200_000)
+    parser.add_argument('--authors', type=int, default=20_000)
+    parser.add_argument('--zipf', type=float, default=1.2)
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--batch', type=int, default=1_000, help='событий в пачке продюсера')
+    parser.add_argument('--buffer-rows', type=int, default=1 << 20)
+    parser.add_argument('--bucket', type=int, default=60)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    batches, posts, kinds, timestamps = make_batches(args, rng)
+    total = args.events + args.posts
+    print(f'{len(batches)} batches, {sum(len(payload) for payload, _ in batches) / 2**20:.1f} MiB compressed')
+
+    rows = min(args.events, args.buffer_rows)
+    started = time.perf_counter()
+    naive = naive_roll_up(timestamps[:rows], kinds[:rows], posts[:rows], args.bucket)
+    report('roll-up, python dict', rows, time.perf_counter() - started)
+    started = time.perf_counter()
+    segment = aggregate(timestamps[:rows] // args.bucket, posts[:rows], kinds[:rows], np.ones(rows, dtype=np.int64))
+    report('roll-up, numpy', rows, time.perf_counter() - started)
+    assert len(naive) == len(segment.counts)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = StatsStore(PartitionStorage(directory, NpzFormat()), bucket_s=args.bucket,
+                           buffer_rows=args.buffer_rows)
+        # Как в consume: пачка разбирается, раскладывается и сразу отпускается
+        decode_time = ingest_time = flush_time = 0.0
+        for payload, headers in batches:
+            started = time.perf_counter()
+            events = decode_batch(payload, headers)
+            decode_time += time.perf_counter() - started
+            started = time.perf_counter()
+            store.ingest(events)
+            ingest_time += time.perf_counter() - started
+            if len(store.buffer) >= store.buffer_rows:
+                started = time.perf_counter()
+                await store.flush()
+                flush_time += time.perf_counter() - started
+        started = time.perf_counter()
+        await store.flush()
+        flush_time += time.perf_counter() - started
+        report('decode (zlib + json)', total, decode_time)
+        report('ingest into columns', total, ingest_time)
+        report('roll-up + partition write', total, flush_time)
+        report('decode + ingest + flush', total, decode_time + ingest_time + flush_time)
+
+        print(f'{len(store.segments)} segments, {sum(len(s.counts) for s in store.segments):,} rolled-up rows, '
+              f'{len(store.posts):,} posts')
+        hot, cold = store.posts.values[0], store.posts.values[-1]
+        now = time.time()
+        hour, day = store.window(now - 3600, now), store.window(now - 86400, now)
+        measure('post stats, all time', lambda: store.post_stats(hot), args.queries)
+        measure('post stats, last 24h', lambda: store.post_stats(cold, day), args.queries)
+        measure('author stats, all time', lambda: store.author_stats('author-0'), args.queries)
+        measure('top 10 by views, all time', lambda: store.top_posts(VIEWED, 10), args.queries)
+        measure('top 10 by views, last hour', lambda: store.top_posts(VIEWED, 10, hour), args.queries)
+        measure('top 10 by views, last 24h', lambda: store.top_posts(VIEWED, 10, day), args.queries)
+
+        started = time.perf_counter()
+        reloaded = StatsStore(PartitionStorage(directory, NpzFormat()), bucket_s=args.bucket)
+        partitions = reloaded.load()
+        print(f'reloaded {partitions} partitions in {time.perf_counter() - started:.2f}s')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
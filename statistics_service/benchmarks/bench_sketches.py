@@ -0,0 +1,130 @@
+"""
+Точность и память скетчей против точного подсчёта: HyperLogLog по precision и мощностям,
+Count-Min по ширине, полнота Space-Saving по ёмкости, слияние --workers воркеров
+и скорость обновления. Частоты постов распределены по Zipf.
+
+Запуск:
+    PYTHONPATH=src python benchmarks/bench_sketches.py --events 2000000 --posts 200000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from utils.sketch_store import SketchStore
+from utils.sketches import CountMinSketch, HyperLogLog, SpaceSaving, mix64
+
+# Точный подсчёт через np.unique держит ключ и счётчик: 16 байт на различный ключ
+EXACT_BYTES_PER_KEY = 16
+
+
+def random_keys(rng: np.random.Generator, n: int) -> np.ndarray:
+    # Хеши идентификаторов: hash64 на миллионах строк мерил бы blake2b, а не скетчи
+    return mix64(rng.integers(0, 2**63, n, dtype=np.int64).astype(np.uint64))
+
+
+def kib(nbytes: int) -> str:
+    return f'{nbytes / 1024:10,.1f} KiB'
+
+
+def bench_hyperloglog(args, rng: np.random.Generator):
+    print('HyperLogLog: unique count')
+    for cardinality in (100, 10_000, 1_000_000):
+        keys = random_keys(rng, cardinality)
+        for precision in (10, 12, 14):
+            errors = []
+            for trial in range(args.trials):
+                sketch = HyperLogLog(precision)
+                sketch.add(random_keys(rng, cardinality) if trial else keys)
+                errors.append(abs(sketch.estimate() - cardinality) / cardinality)
+            print(f'  n={cardinality:>9,} p={precision:2}: mean error {np.mean(errors):6.2%}  '
+                  f'(theory {1.04 / np.sqrt(1 << precision):6.2%})  {kib(sketch.nbytes)} '
+                  f'vs exact {kib(cardinality * 8)}')
+
+
+def bench_count_min(args, stream: np.ndarray):
+    print('Count-Min: per-post view counts')
+    unique, exact = np.unique(stream, return_counts=True)
+    for width in (1 << 10, 1 << 13, 1 << 16):
+        sketch = CountMinSketch(width, args.depth)
+        sketch.add(stream)
+        over = sketch.estimate(unique) - exact
+        heavy = exact >= np.sort(exact)[-100]
+        print(f'  width={width:>6}: mean over {over.mean():9.1f}  top-100 relative over '
+              f'{np.mean(over[heavy] / exact[heavy]):7.3%}  bound {np.e / width * len(stream):9.1f}  '
+              f'{kib(sketch.nbytes)} vs exact {kib(len(unique) * EXACT_BYTES_PER_KEY)}')
+
+
+def bench_space_saving(args, stream: np.ndarray):
+    print(f'Space-Saving: top-{args.top} recall, {args.workers} merged workers')
+    unique, exact = np.unique(stream, return_counts=True)
+    true_top = set(unique[np.argsort(-exact, kind='stable')[:args.top]].tolist())
+    for capacity in (args.top, 4 * args.top, 10 * args.top):
+        merged = SpaceSaving(capacity)
+        for part in np.array_split(stream, args.workers):
+            worker = SpaceSaving(capacity)
+            for batch in np.array_split(part, max(1, len(part) // args.batch)):
+                worker.update(batch)
+            merged.merge(SpaceSaving.from_bytes(worker.to_bytes()))
+        found = merged.top(args.top)[0]
+        recall = len(true_top & set(found.tolist())) / args.top
+        print(f'  capacity={capacity:>5}: recall {recall:6.1%}  {kib(merged.nbytes)} '
+              f'vs exact {kib(len(unique) * EXACT_BYTES_PER_KEY)}')
+
+
+def bench_throughput(args, rng: np.random.Generator, stream: np.ndarray):
+    print('SketchStore.add_views throughput')
+    viewers = mix64(rng.integers(0, args.viewers, len(stream)).astype(np.uint64))
+    timestamps = np.sort(rng.integers(0, int(args.days * 86400), len(stream)))
+    with tempfile.TemporaryDirectory() as directory:
+        sketches = SketchStore(directory)
+        started = time.perf_counter()
+        for start in range(0, len(stream), args.batch):
+            end = start + args.batch
+            sketches.add_views(timestamps[start:end], stream[start:end], viewers[start:end])
+        elapsed = time.perf_counter() - started
+        print(f'  {len(stream) / elapsed:12,.0f} views/s ({elapsed:.2f}s), {len(sketches.windows)} windows, '
+              f'{kib(sketches.nbytes)} total')
+        started = time.perf_counter()
+        sketches.save()
+        print(f'  save: {(time.perf_counter() - started) * 1000:.0f}ms')
+
+    posts, counts = np.unique(stream, return_counts=True)
+    hot = posts[np.argsort(-counts)[:20]]
+    errors = []
+    for post in hot.tolist():
+        exact = len(np.unique(viewers[stream == post]))
+        errors.append(abs(sketches.unique_viewers(post) - exact) / exact)
+    print(f'  unique viewers of top-20 posts: mean error {np.mean(errors):6.2%}')
+    started = time.perf_counter()
+    sketches.trending(10)
+    print(f'  trending top-10 over all windows: {(time.perf_counter() - started) * 1000:.1f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=2_000_000)
+    parser.add_argument('--posts', type=int, default=200_000)
+    parser.add_argument('--viewers', type=int, default=100_000)
+    parser.add_argument('--zipf', type=float, default=1.2)
+    parser.add_argument('--days', type=float, default=2)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--top', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=10_000)
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    post_keys = random_keys(rng, args.posts)
+    stream = post_keys[np.minimum(rng.zipf(args.zipf, args.events) - 1, args.posts - 1)]
+    bench_hyperloglog(args, rng)
+    bench_count_min(args, stream)
+    bench_space_saving(args, stream)
+    bench_throughput(args, rng, stream)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+import grpc
+import numpy as np
+from grpc_reflection.v1alpha import reflection
+from proto.statistics_service_pb2 import (
+    DESCRIPTOR,
+    AuthorStats,
+    GetAuthorStatsRequest,
+    GetPostStatsRequest,
+    Metric,
+    PostStats,
+    TimeWindow,
+    TopPostsRequest,
+    TopPostsResponse,
+    TrendingPost,
+    TrendingPostsRequest,
+    TrendingPostsResponse,
+)
+from proto.statistics_service_pb2_grpc import StatisticsServiceServicer, add_StatisticsServiceServicer_to_server
+from utils.event_source import EventSource, create_event_source
+from utils.partitions import STATISTICS_DATA_DIR, create_partition_storage
+from utils.seen_events import SeenEvents
+from utils.sketch_store import SketchStore
+from utils.stats_store import COMMENTED, CREATED, LIKED, VIEWED, StatsStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STATISTICS_PORT = int(os.getenv('STATISTICS_PORT', 50052))
+STATISTICS_FLUSH_INTERVAL_S = float(os.getenv('STATISTICS_FLUSH_INTERVAL_S', 10))
+STATISTICS_POLL_INTERVAL_S = float(os.getenv('STATISTICS_POLL_INTERVAL_S', 0.5))
+DEFAULT_TOP_POSTS = 10
+MAX_TOP_POSTS = 100
+
+METRIC_KINDS = {Metric.VIEWS: VIEWED, Metric.LIKES: LIKED, Metric.COMMENTS: COMMENTED}
+
+
+async def consume(store: StatsStore, source: EventSource,
+                  flush_interval: float = STATISTICS_FLUSH_INTERVAL_S, poll_interval: float = STATISTICS_POLL_INTERVAL_S):
+    """
+    Переносит события из брокера в хранилище. Позиция в брокере фиксируется только после
+    записи партиции, поэтому после падения недописанный буфер перечитывается заново, а уже
+    записанное, но не закоммиченное, отсеивается окном event_id хранилища.
+    """
+    flushed_at = time.monotonic()
+    polled, position = False, None
+    try:
+        while True:
+            batches, position = await source.poll()
+            polled = True
+            for events in batches:
+                store.ingest(events)
+            if len(store.buffer) >= store.buffer_rows or time.monotonic() - flushed_at >= flush_interval:
+                await store.flush()
+                await source.commit(position)
+                flushed_at = time.monotonic()
+            if not batches:
+                await asyncio.sleep(poll_interval)
+    finally:
+        await store.flush()
+        if polled:
+            await source.commit(position)
+
+
+class StatisticsService(StatisticsServiceServicer):
+    def __init__(self, store: StatsStore):
+        self.store = store
+
+    async def _window(self, window: TimeWindow, context) -> Optional[Tuple[Optional[float], float]]:
+        """Окно в секундах; в бакеты или окна скетчей его переводит тот, кто по нему считает."""
+        has_since, has_until = window.HasField('since'), window.HasField('until')
+        if not has_since and not has_until:
+            return None
+        since = window.since.ToNanoseconds() / 1e9 if has_since else None
+        until = window.until.ToNanoseconds() / 1e9 if has_until else time.time()
+        if since is not None and since >= until:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "window.since must be before window.until")
+        return since, until
+
+    async def GetPostStats(self, request: GetPostStatsRequest, context) -> PostStats:
+        bounds = await self._window(request.window, context)
+        window = self.store.window(*bounds) if bounds is not None else None
+        author_user_id, counts = self.store.post_stats(request.post_id, window)
+        return self._post_stats(request.post_id, author_user_id, counts, self._unique_viewers(request.post_id, bounds))
+
+    def _unique_viewers(self, post_id: str, bounds: Optional[Tuple[Optional[float], float]]) -> int:
+        if self.store.sketches is None:
+            return 0
+        window = self.store.sketches.window(*bounds) if bounds is not None else None
+        return self.store.unique_viewers(post_id, window)
+
+    @staticmethod
+    def _post_stats(post_id: str, author_user_id: str, counts: np.ndarray, unique_viewers: int = 0) -> PostStats:
+        return PostStats(
+            post_id=post_id,
+            author_user_id=author_user_id,
+            views=counts[VIEWED],
+            likes=counts[LIKED],
+            comments=counts[COMMENTED],
+            unique_viewers=unique_viewers,
+        )
+
+    async def GetAuthorStats(self, request: GetAuthorStatsRequest, context) -> AuthorStats:
+        bounds = await self._window(request.window, context)
+        window = self.store.window(*bounds) if bounds is not None else None
+        counts = self.store.author_stats(request.author_user_id, window)
+        return AuthorStats(
+            author_user_id=request.author_user_id,
+            posts=counts[CREATED],
+            views=counts[VIEWED],
+            likes=counts[LIKED],
+            comments=counts[COMMENTED],
+        )
+
+    async def TopPosts(self, request: TopPostsRequest, context) -> TopPostsResponse:
+        if request.limit < 0 or request.limit > MAX_TOP_POSTS:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"limit must be 0..{MAX_TOP_POSTS}")
+        kind = METRIC_KINDS.get(request.metric)
+        if kind is None:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Unknown metric")
+        bounds = await self._window(request.window, context)
+        window = self.store.window(*bounds) if bounds is not None else None
+        top = self.store.top_posts(kind, request.limit or DEFAULT_TOP_POSTS, window)
+        return TopPostsResponse(posts=[
+            self._post_stats(post_id, author_user_id, counts, self._unique_viewers(post_id, bounds))
+            for post_id, author_user_id, counts in top
+        ])
+
+    async def TrendingPosts(self, request: TrendingPostsRequest, context) -> TrendingPostsResponse:
+        if request.limit < 0 or request.limit > MAX_TOP_POSTS:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"limit must be 0..{MAX_TOP_POSTS}")
+        if self.store.sketches is None:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Sketches are disabled")
+        bounds = await self._window(request.window, context)
+        window = self.store.sketches.window(*bounds) if bounds is not None else None
+        trending = self.store.trending(request.limit or DEFAULT_TOP_POSTS, window)
+        return TrendingPostsResponse(posts=[
+            TrendingPost(post_id=post_id, author_user_id=author_user_id, views=upper, min_views=lower)
+            for post_id, author_user_id, upper, lower in trending
+        ])
+
+
+async def serve():
+    store = StatsStore(create_partition_storage(), sketches=SketchStore(os.path.join(STATISTICS_DATA_DIR, 'sketches')),
+                       seen=SeenEvents(os.path.join(STATISTICS_DATA_DIR, 'seen_events.npz')))
+    started = time.perf_counter()
+    partitions = store.load()
+    logger.info('Loaded %d partitions, %d posts in %.1fs', partitions, len(store.posts), time.perf_counter() - started)
+    source = create_event_source(STATISTICS_DATA_DIR)
+    consumer = asyncio.create_task(consume(store, source))
+
+    server = grpc.aio.server()
+    add_StatisticsServiceServicer_to_server(StatisticsService(store), server)
+    SERVICE_NAMES = (
+        DESCRIPTOR.services_by_name["StatisticsService"].full_name,
+        reflection.SERVICE_NAME,
+    )
+    reflection.enable_server_reflection(SERVICE_NAMES, server)
+
+    server.add_insecure_port(f'0.0.0.0:{STATISTICS_PORT}')
+    await server.start()
+    print("gRPC server started")
+    try:
+        await server.wait_for_termination()
+    finally:
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+        await source.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: statistics_service.proto
+# Protobuf Python Version: 5.29.0
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    29,
+    0,
+    '',
+    'statistics_service.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18statistics_service.proto\x12\x11statisticsservice\x1a\x1fgoogle/protobuf/timestamp.proto\"b\n\nTimeWindow\x12)\n\x05since\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12)\n\x05until\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"U\n\x13GetPostStatsRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12-\n\x06window\x18\x02 \x01(\x0b\x32\x1d.statisticsservice.TimeWindow\"|\n\tPostStats\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x16\n\x0e\x61uthor_user_id\x18\x02 \x01(\t\x12\r\n\x05views\x18\x03 \x01(\x03\x12\r\n\x05likes\x18\x04 \x01(\x03\x12\x10\n\x08\x63omments\x18\x05 \x01(\x03\x12\x16\n\x0eunique_viewers\x18\x06 \x01(\x03\"^\n\x15GetAuthorStatsRequest\x12\x16\n\x0e\x61uthor_user_id\x18\x01 \x01(\t\x12-\n\x06window\x18\x02 \x01(\x0b\x32\x1d.statisticsservice.TimeWindow\"d\n\x0b\x41uthorStats\x12\x16\n\x0e\x61uthor_user_id\x18\x01 \x01(\t\x12\r\n\x05posts\x18\x02 \x01(\x03\x12\r\n\x05views\x18\x03 \x01(\x03\x12\r\n\x05likes\x18\x04 \x01(\x03\x12\x10\n\x08\x63omments\x18\x05 \x01(\x03\"z\n\x0fTopPostsRequest\x12)\n\x06metric\x18\x01 \x01(\x0e\x32\x19.statisticsservice.Metric\x12-\n\x06window\x18\x02 \x01(\x0b\x32\x1d.statisticsservice.TimeWindow\x12\r\n\x05limit\x18\x03 \x01(\x05\"?\n\x10TopPostsResponse\x12+\n\x05posts\x18\x01 \x03(\x0b\x32\x1c.statisticsservice.PostStats\"T\n\x14TrendingPostsRequest\x12-\n\x06window\x18\x01 \x01(\x0b\x32\x1d.statisticsservice.TimeWindow\x12\r\n\x05limit\x18\x02 \x01(\x05\"Y\n\x0cTrendingPost\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05views\x18\x02 \x01(\x03\x12\x11\n\tmin_views\x18\x03 \x01(\x03\x12\x16\n\x0e\x61uthor_user_id\x18\x04 \x01(\t\"G\n\x15TrendingPostsResponse\x12.\n\x05posts\x18\x01 \x03(\x0b\x32\x1f.statisticsservice.TrendingPost*,\n\x06Metric\x12\t\n\x05VIEWS\x10\x00\x12\t\n\x05LIKES\x10\x01\x12\x0c\n\x08\x43OMMENTS\x10\x02\x32\xfe\x02\n\x11StatisticsService\x12T\n\x0cGetPostStats\x12&.statisticsservice.GetPostStatsRequest\x1a\x1c.statisticsservice.PostStats\x12Z\n\x0eGetAuthorStats\x12(.statisticsservice.GetAuthorStatsRequest\x1a\x1e.statisticsservice.AuthorStats\x12S\n\x08TopPosts\x12\".statisticsservice.TopPostsRequest\x1a#.statisticsservice.TopPostsResponse\x12\x62\n\rTrendingPosts\x12\'.statisticsservice.TrendingPostsRequest\x1a(.statisticsservice.TrendingPostsResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'statistics_service_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_METRIC']._serialized_start=1030
+  _globals['_METRIC']._serialized_end=1074
+  _globals['_TIMEWINDOW']._serialized_start=80
+  _globals['_TIMEWINDOW']._serialized_end=178
+  _globals['_GETPOSTSTATSREQUEST']._serialized_start=180
+  _globals['_GETPOSTSTATSREQUEST']._serialized_end=265
+  _globals['_POSTSTATS']._serialized_start=267
+  _globals['_POSTSTATS']._serialized_end=391
+  _globals['_GETAUTHORSTATSREQUEST']._serialized_start=393
+  _globals['_GETAUTHORSTATSREQUEST']._serialized_end=487
+  _globals['_AUTHORSTATS']._serialized_start=489
+  _globals['_AUTHORSTATS']._serialized_end=589
+  _globals['_TOPPOSTSREQUEST']._serialized_start=591
+  _globals['_TOPPOSTSREQUEST']._serialized_end=713
+  _globals['_TOPPOSTSRESPONSE']._serialized_start=715
+  _globals['_TOPPOSTSRESPONSE']._serialized_end=778
+  _globals['_TRENDINGPOSTSREQUEST']._serialized_start=780
+  _globals['_TRENDINGPOSTSREQUEST']._serialized_end=864
+  _globals['_TRENDINGPOST']._serialized_start=866
+  _globals['_TRENDINGPOST']._serialized_end=955
+  _globals['_TRENDINGPOSTSRESPONSE']._serialized_start=957
+  _globals['_TRENDINGPOSTSRESPONSE']._serialized_end=1028
+  _globals['_STATISTICSSERVICE']._serialized_start=1077
+  _globals['_STATISTICSSERVICE']._serialized_end=1459
+# @@protoc_insertion_point(module_scope)
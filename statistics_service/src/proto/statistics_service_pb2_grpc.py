@@ -0,0 +1,230 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from . import statistics_service_pb2 as statistics__service__pb2
+
+GRPC_GENERATED_VERSION = '1.71.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + f' but the generated code in statistics_service_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class StatisticsServiceStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.GetPostStats = channel.unary_unary(
+                '/statisticsservice.StatisticsService/GetPostStats',
+                request_serializer=statistics__service__pb2.GetPostStatsRequest.SerializeToString,
+                response_deserializer=statistics__service__pb2.PostStats.FromString,
+                _registered_method=True)
+        self.GetAuthorStats = channel.unary_unary(
+                '/statisticsservice.StatisticsService/GetAuthorStats',
+                request_serializer=statistics__service__pb2.GetAuthorStatsRequest.SerializeToString,
+                response_deserializer=statistics__service__pb2.AuthorStats.FromString,
+                _registered_method=True)
+        self.TopPosts = channel.unary_unary(
+                '/statisticsservice.StatisticsService/TopPosts',
+                request_serializer=statistics__service__pb2.TopPostsRequest.SerializeToString,
+                response_deserializer=statistics__service__pb2.TopPostsResponse.FromString,
+                _registered_method=True)
+        self.TrendingPosts = channel.unary_unary(
+                '/statisticsservice.StatisticsService/TrendingPosts',
+                request_serializer=statistics__service__pb2.TrendingPostsRequest.SerializeToString,
+                response_deserializer=statistics__service__pb2.TrendingPostsResponse.FromString,
+                _registered_method=True)
+
+
+class StatisticsServiceServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def GetPostStats(self, request, context):
+        """Просмотры, лайки и комментарии поста; без окна — за всё время
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetAuthorStats(self, request, context):
+        """Те же счётчики, сложенные по всем постам автора
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TopPosts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TrendingPosts(self, request, context):
+        """Самые просматриваемые посты по скетчам: память не зависит от числа постов, счётчики приближённые.
+        Без окна — за всё время хранения скетчей
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_StatisticsServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'GetPostStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetPostStats,
+                    request_deserializer=statistics__service__pb2.GetPostStatsRequest.FromString,
+                    response_serializer=statistics__service__pb2.PostStats.SerializeToString,
+            ),
+            'GetAuthorStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetAuthorStats,
+                    request_deserializer=statistics__service__pb2.GetAuthorStatsRequest.FromString,
+                    response_serializer=statistics__service__pb2.AuthorStats.SerializeToString,
+            ),
+            'TopPosts': grpc.unary_unary_rpc_method_handler(
+                    servicer.TopPosts,
+                    request_deserializer=statistics__service__pb2.TopPostsRequest.FromString,
+                    response_serializer=statistics__service__pb2.TopPostsResponse.SerializeToString,
+            ),
+            'TrendingPosts': grpc.unary_unary_rpc_method_handler(
+                    servicer.TrendingPosts,
+                    request_deserializer=statistics__service__pb2.TrendingPostsRequest.FromString,
+                    response_serializer=statistics__service__pb2.TrendingPostsResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'statisticsservice.StatisticsService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('statisticsservice.StatisticsService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class StatisticsService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def GetPostStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/statisticsservice.StatisticsService/GetPostStats',
+            statistics__service__pb2.GetPostStatsRequest.SerializeToString,
+            statistics__service__pb2.PostStats.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetAuthorStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/statisticsservice.StatisticsService/GetAuthorStats',
+            statistics__service__pb2.GetAuthorStatsRequest.SerializeToString,
+            statistics__service__pb2.AuthorStats.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def TopPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/statisticsservice.StatisticsService/TopPosts',
+            statistics__service__pb2.TopPostsRequest.SerializeToString,
+            statistics__service__pb2.TopPostsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def TrendingPosts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/statisticsservice.StatisticsService/TrendingPosts',
+            statistics__service__pb2.TrendingPostsRequest.SerializeToString,
+            statistics__service__pb2.TrendingPostsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,96 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, List, Protocol, Tuple
+
+from shared.events import EVENTS_BROKER_URL, EVENTS_TOPIC, FileBroker, decode_batch, read_frames
+
+EVENTS_POLL_MAX_BATCHES = int(os.getenv('EVENTS_POLL_MAX_BATCHES', 256))
+EVENTS_CONSUMER_GROUP = os.getenv('EVENTS_CONSUMER_GROUP', 'statistics_service')
+
+
+class EventSource(Protocol):
+    async def poll(self) -> Tuple[List[List[dict]], Any]:
+        """Следующие пачки событий и позиция после них."""
+
+    async def commit(self, position: Any) -> None:
+        """Запоминает позицию: после перезапуска чтение продолжится с неё."""
+
+    async def close(self) -> None: ...
+
+
+class FileEventSource:
+    """Читает топик FileBroker; смещение хранится рядом с данными статистики."""
+
+    def __init__(self, broker_directory: str, offset_path: str, topic: str = EVENTS_TOPIC,
+                 max_batches: int = EVENTS_POLL_MAX_BATCHES):
+        self.path = FileBroker(broker_directory).topic_path(topic)
+        self.offset_path = Path(offset_path)
+        self.max_batches = max_batches
+        self.offset = int(self.offset_path.read_text()) if self.offset_path.exists() else 0
+
+    def _read(self) -> Tuple[List[List[dict]], int]:
+        batches, offset = [], self.offset
+        if not self.path.exists():
+            return batches, offset
+        for offset, headers, payload in read_frames(self.path, self.offset):
+            batches.append(decode_batch(payload, headers))
+            if len(batches) >= self.max_batches:
+                break
+        return batches, offset
+
+    async def poll(self) -> Tuple[List[List[dict]], int]:
+        batches, self.offset = await asyncio.to_thread(self._read)
+        return batches, self.offset
+
+    async def commit(self, position: int) -> None:
+        tmp = self.offset_path.with_name(self.offset_path.name + '.tmp')
+        tmp.write_text(str(position))
+        os.replace(tmp, self.offset_path)
+
+    async def close(self) -> None:
+        pass
+
+
+class KafkaEventSource:
+    """Группа потребителей Kafka с ручным коммитом: смещения фиксируются только после записи партиции."""
+
+    def __init__(self, bootstrap_servers: str, topic: str = EVENTS_TOPIC, group_id: str = EVENTS_CONSUMER_GROUP,
+                 max_batches: int = EVENTS_POLL_MAX_BATCHES):
+        # aiokafka нужен только если брокер — Kafka
+        from aiokafka import AIOKafkaConsumer
+        self._consumer = AIOKafkaConsumer(
+            topic, bootstrap_servers=bootstrap_servers, group_id=group_id,
+            enable_auto_commit=False, auto_offset_reset='earliest',
+        )
+        self.max_batches = max_batches
+        self._started = False
+
+    async def poll(self) -> Tuple[List[List[dict]], None]:
+        if not self._started:
+            await self._consumer.start()
+            self._started = True
+        records = await self._consumer.getmany(timeout_ms=1000, max_records=self.max_batches)
+        batches = [
+            decode_batch(record.value, {name: value.decode() for name, value in record.headers})
+            for partition_records in records.values() for record in partition_records
+        ]
+        # Коммит без аргументов фиксирует всё, что уже выдано getmany
+        return batches, None
+
+    async def commit(self, position: None) -> None:
+        await self._consumer.commit()
+
+    async def close(self) -> None:
+        if self._started:
+            await self._consumer.stop()
+
+
+def create_event_source(data_dir: str) -> EventSource:
+    if not EVENTS_BROKER_URL:
+        raise ValueError('EVENTS_BROKER_URL is required')
+    if EVENTS_BROKER_URL.startswith('file://'):
+        return FileEventSource(EVENTS_BROKER_URL[len('file://'):], os.path.join(data_dir, 'offset'))
+    if EVENTS_BROKER_URL.startswith('kafka://'):
+        return KafkaEventSource(EVENTS_BROKER_URL[len('kafka://'):])
+    raise ValueError(f'Unsupported EVENTS_BROKER_URL: {EVENTS_BROKER_URL}')
@@ -0,0 +1,127 @@
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Protocol, Tuple
+
+import numpy as np
+
+STATISTICS_DATA_DIR = os.getenv('STATISTICS_DATA_DIR', '/tmp/statistics')
+# parquet требует pyarrow; npz — замена на одном NumPy для тестов и разработки
+STATISTICS_PARTITION_FORMAT = os.getenv('STATISTICS_PARTITION_FORMAT', 'parquet')
+
+STRING_COLUMNS = ('post_id', 'author_user_id', 'event_type')
+
+# <первый>-<последний> номер партиции: слитая партиция покрывает диапазон исходных
+PARTITION_NAME = re.compile(r'^(\d{8})-(\d{8})\.')
+
+
+class PartitionFormat(Protocol):
+    suffix: str
+
+    def write(self, path: Path, columns: Dict[str, np.ndarray]) -> None: ...
+
+    def read(self, path: Path) -> Dict[str, np.ndarray]: ...
+
+
+class NpzFormat:
+    suffix = '.npz'
+
+    def write(self, path: Path, columns: Dict[str, np.ndarray]) -> None:
+        # Строки пишутся юникодными массивами фиксированной ширины: pickle при чтении не нужен
+        with open(path, 'wb') as file:
+            np.savez(file, **{
+                name: column.astype(str) if name in STRING_COLUMNS else column for name, column in columns.items()
+            })
+
+    def read(self, path: Path) -> Dict[str, np.ndarray]:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+
+class ParquetFormat:
+    suffix = '.parquet'
+
+    def __init__(self):
+        # pyarrow нужен только для формата parquet
+        import pyarrow
+        import pyarrow.parquet
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+
+    def write(self, path: Path, columns: Dict[str, np.ndarray]) -> None:
+        table = self._pa.table({
+            name: self._pa.array(column.tolist() if name in STRING_COLUMNS else column)
+            for name, column in columns.items()
+        })
+        # Словарное кодирование строк и сжатие делает сам parquet
+        self._pq.write_table(table, path, compression='zstd')
+
+    def read(self, path: Path) -> Dict[str, np.ndarray]:
+        table = self._pq.read_table(path)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+class PartitionStorage:
+    """
+    Агрегированные партиции в каталоге. Новая партиция получает следующий номер,
+    слитая заменяет все текущие. Файлы пишутся через временное имя и rename,
+    поэтому после падения остаются только целые партиции.
+    """
+
+    def __init__(self, directory: str, partition_format: PartitionFormat):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.format = partition_format
+
+    def _partitions(self) -> List[Tuple[int, int, Path]]:
+        partitions = []
+        for path in self.directory.glob(f'*{self.format.suffix}'):
+            match = PARTITION_NAME.match(path.name)
+            if match:
+                partitions.append((int(match[1]), int(match[2]), path))
+        # Партиции, покрытые слитой (её исходные могли не успеть удалиться), не читаются
+        partitions.sort(key=lambda partition: (partition[0], -partition[1]))
+        live, covered_until = [], -1
+        for first, last, path in partitions:
+            if last <= covered_until:
+                continue
+            live.append((first, last, path))
+            covered_until = last
+        return live
+
+    def _write(self, first: int, last: int, columns: Dict[str, np.ndarray]) -> Path:
+        path = self.directory / f'{first:08d}-{last:08d}{self.format.suffix}'
+        tmp = path.with_name(path.name + '.tmp')
+        self.format.write(tmp, columns)
+        os.replace(tmp, path)
+        return path
+
+    def last(self) -> int:
+        """Номер последней записанной партиции; -1, если их нет."""
+        partitions = self._partitions()
+        return partitions[-1][1] if partitions else -1
+
+    def append(self, columns: Dict[str, np.ndarray]) -> Path:
+        number = self.last() + 1
+        return self._write(number, number, columns)
+
+    def replace_all(self, columns: Dict[str, np.ndarray]) -> Path:
+        partitions = self._partitions()
+        if not partitions:
+            return self.append(columns)
+        path = self._write(partitions[0][0], partitions[-1][1], columns)
+        for _, _, old in partitions:
+            if old != path:
+                old.unlink(missing_ok=True)
+        return path
+
+    def read_all(self) -> List[Dict[str, np.ndarray]]:
+        return [self.format.read(path) for _, _, path in self._partitions()]
+
+
+def create_partition_storage(directory: str = STATISTICS_DATA_DIR) -> PartitionStorage:
+    if STATISTICS_PARTITION_FORMAT == 'parquet':
+        return PartitionStorage(os.path.join(directory, 'partitions'), ParquetFormat())
+    if STATISTICS_PARTITION_FORMAT == 'npz':
+        return PartitionStorage(os.path.join(directory, 'partitions'), NpzFormat())
+    raise ValueError(f'Unsupported STATISTICS_PARTITION_FORMAT: {STATISTICS_PARTITION_FORMAT}')
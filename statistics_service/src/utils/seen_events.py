@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+from typing import Set
+
+import numpy as np
+
+from utils.sketches import hash64
+
+# Сколько последних event_id помнится для отсева повторов: 8 байт в кольце и элемент множества на каждый
+STATISTICS_DEDUP_WINDOW = int(os.getenv('STATISTICS_DEDUP_WINDOW', 1_000_000))
+
+
+class SeenEvents:
+    """
+    Хеши event_id последних capacity принятых событий. Повторы приходят из двух мест:
+    продюсер переотправляет пачки из spill-файлов, а брокер отдаёт заново всё после
+    последнего коммита позиции.
+
+    Окно сохраняется перед записью партиции с её номером. Если партиция не успела
+    записаться, идентификаторы её событий при загрузке отбрасываются: сами события
+    перечитаются из брокера и будут приняты снова.
+    """
+
+    def __init__(self, path: str, capacity: int = STATISTICS_DEDUP_WINDOW):
+        self.path = Path(path)
+        self.capacity = capacity
+        self._ring = np.zeros(capacity, dtype=np.uint64)
+        self._known: Set[int] = set()
+        # Сколько хешей добавлено всего; слот следующего — added % capacity
+        self.added = 0
+        # Граница уже записанных партиций и граница последнего save
+        self._durable = 0
+        self._saved = 0
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    def _add(self, key: int) -> None:
+        slot = self.added % self.capacity
+        if self.added >= self.capacity:
+            self._known.discard(int(self._ring[slot]))
+        self._ring[slot] = key
+        self._known.add(key)
+        self.added += 1
+
+    def add(self, event_id: str) -> bool:
+        """Запоминает событие; False, если оно уже встречалось."""
+        key = hash64(event_id)
+        if key in self._known:
+            return False
+        self._add(key)
+        return True
+
+    def keys(self) -> np.ndarray:
+        """Хеши в порядке добавления, от старых к новым."""
+        size = min(self.added, self.capacity)
+        return self._ring[np.arange(self.added - size, self.added) % self.capacity]
+
+    def save(self, partition: int) -> None:
+        """Пишет окно перед партицией partition; хеши после последней записанной партиции помечаются как ожидающие её."""
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'wb') as file:
+            np.savez(file, keys=self.keys(), partition=partition,
+                     pending=min(self.added - self._durable, self.capacity))
+        os.replace(tmp, self.path)
+        self._saved = self.added
+
+    def written(self) -> None:
+        """Партиция, перед которой вызывался save, записана."""
+        self._durable = self._saved
+
+    def load(self, last_partition: int) -> int:
+        """Поднимает окно; хеши недописанной партиции (номер больше last_partition) отбрасываются."""
+        if not self.path.exists():
+            return 0
+        with np.load(self.path) as data:
+            keys = data['keys']
+            if int(data['partition']) > last_partition:
+                keys = keys[:len(keys) - int(data['pending'])]
+        for key in keys[-self.capacity:].tolist():
+            self._add(key)
+        self._durable = self._saved = self.added
+        return len(keys)
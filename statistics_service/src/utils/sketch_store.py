@@ -0,0 +1,211 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.sketches import CountMinSketch, HyperLogLog, SpaceSaving, pack, unpack
+
+# Окна скетчей крупнее бакетов счётчиков: скетч окна весит сотни килобайт
+STATISTICS_SKETCH_WINDOW_S = int(os.getenv('STATISTICS_SKETCH_WINDOW_S', 3600))
+STATISTICS_SKETCH_RETENTION = int(os.getenv('STATISTICS_SKETCH_RETENTION', 7 * 24))
+STATISTICS_CMS_WIDTH = int(os.getenv('STATISTICS_CMS_WIDTH', 1 << 13))
+STATISTICS_CMS_DEPTH = int(os.getenv('STATISTICS_CMS_DEPTH', 4))
+STATISTICS_TOP_CAPACITY = int(os.getenv('STATISTICS_TOP_CAPACITY', 1_000))
+STATISTICS_HLL_PRECISION = int(os.getenv('STATISTICS_HLL_PRECISION', 12))
+
+ARCHIVE = 'archive'
+# Окно в номерах окон скетчей: [since, until)
+SketchWindow = Tuple[int, int]
+
+
+def group_by_key(keys: np.ndarray, values: np.ndarray):
+    """Пары (ключ, значения ключа) без цикла по строкам внутри группы."""
+    order = np.argsort(keys, kind='stable')
+    keys, values = keys[order], values[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    for start, end in zip(starts, np.r_[starts[1:], len(keys)]):
+        yield int(keys[start]), values[start:end]
+
+
+def pack_viewers(viewers: Dict[int, HyperLogLog]) -> bytes:
+    keys = np.fromiter(viewers, dtype=np.uint64, count=len(viewers))
+    return pack(keys.tobytes(), *(viewers[key].to_bytes() for key in keys.tolist()))
+
+
+def unpack_viewers(data: bytes) -> Dict[int, HyperLogLog]:
+    keys, *sketches = unpack(data)
+    return {key: HyperLogLog.from_bytes(sketch) for key, sketch in zip(np.frombuffer(keys, dtype=np.uint64).tolist(), sketches)}
+
+
+class WindowSketches:
+    """Скетчи просмотров за одно окно: частоты постов, самые просматриваемые и зрители каждого поста."""
+
+    def __init__(self, cms_width: int, cms_depth: int, top_capacity: int, hll_precision: int):
+        self.hll_precision = hll_precision
+        self.views = CountMinSketch(cms_width, cms_depth)
+        self.top = SpaceSaving(top_capacity)
+        self.viewers: Dict[int, HyperLogLog] = {}
+
+    @property
+    def nbytes(self) -> int:
+        return self.views.nbytes + self.top.nbytes + sum(sketch.nbytes for sketch in self.viewers.values())
+
+    def add_views(self, posts: np.ndarray, viewers: np.ndarray) -> None:
+        self.views.add(posts)
+        self.top.update(posts)
+        for post, post_viewers in group_by_key(posts, viewers):
+            sketch = self.viewers.get(post)
+            if sketch is None:
+                sketch = self.viewers[post] = HyperLogLog(self.hll_precision)
+            sketch.add(post_viewers)
+
+    def to_bytes(self) -> bytes:
+        return pack(self.views.to_bytes(), self.top.to_bytes(), pack_viewers(self.viewers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, hll_precision: int) -> 'WindowSketches':
+        views, top, viewers = unpack(data)
+        sketches = cls.__new__(cls)
+        sketches.hll_precision = hll_precision
+        sketches.views = CountMinSketch.from_bytes(views)
+        sketches.top = SpaceSaving.from_bytes(top)
+        sketches.viewers = unpack_viewers(viewers)
+        return sketches
+
+
+class SketchStore:
+    """
+    Приближённая статистика просмотров по окнам STATISTICS_SKETCH_WINDOW_S: тренды через
+    Space-Saving с уточнением по Count-Min и уникальные зрители поста через HyperLogLog.
+    Окна старше retention сливаются в архив зрителей, так что уникальные за всё время
+    не теряются, а память растёт только с числом постов.
+    """
+
+    def __init__(self, directory: str, window_s: int = STATISTICS_SKETCH_WINDOW_S,
+                 retention: int = STATISTICS_SKETCH_RETENTION, cms_width: int = STATISTICS_CMS_WIDTH,
+                 cms_depth: int = STATISTICS_CMS_DEPTH, top_capacity: int = STATISTICS_TOP_CAPACITY,
+                 hll_precision: int = STATISTICS_HLL_PRECISION):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.window_s = window_s
+        self.retention = retention
+        self.cms_width = cms_width
+        self.cms_depth = cms_depth
+        self.top_capacity = top_capacity
+        self.hll_precision = hll_precision
+        self.windows: Dict[int, WindowSketches] = {}
+        self.archive: Dict[int, HyperLogLog] = {}
+        self._dirty: Set[int] = set()
+        self._expired: List[int] = []
+
+    @property
+    def nbytes(self) -> int:
+        return (sum(window.nbytes for window in self.windows.values())
+                + sum(sketch.nbytes for sketch in self.archive.values()))
+
+    def _new_window(self) -> WindowSketches:
+        return WindowSketches(self.cms_width, self.cms_depth, self.top_capacity, self.hll_precision)
+
+    def add_views(self, timestamps: np.ndarray, posts: np.ndarray, viewers: np.ndarray) -> None:
+        """posts и viewers — hash64 идентификаторов поста и зрителя."""
+        for window, rows in group_by_key(timestamps // self.window_s, np.arange(len(posts))):
+            sketches = self.windows.get(window)
+            if sketches is None:
+                if self.windows and window <= max(self.windows) - self.retention:
+                    # Опоздавшее событие для уже вытесненного окна учитывается только в архиве
+                    self._archive_viewers(posts[rows], viewers[rows])
+                    continue
+                sketches = self.windows[window] = self._new_window()
+            sketches.add_views(posts[rows], viewers[rows])
+            self._dirty.add(window)
+        self._expire()
+
+    def _archive_viewers(self, posts: np.ndarray, viewers: np.ndarray) -> None:
+        for post, post_viewers in group_by_key(posts, viewers):
+            sketch = self.archive.get(post)
+            if sketch is None:
+                sketch = self.archive[post] = HyperLogLog(self.hll_precision)
+            sketch.add(post_viewers)
+        self._dirty.add(ARCHIVE)
+
+    def _expire(self) -> None:
+        newest = max(self.windows, default=0)
+        for window in [window for window in self.windows if window <= newest - self.retention]:
+            for post, sketch in self.windows.pop(window).viewers.items():
+                archived = self.archive.get(post)
+                if archived is None:
+                    self.archive[post] = sketch
+                else:
+                    archived.merge(sketch)
+            self._dirty.discard(window)
+            self._dirty.add(ARCHIVE)
+            self._expired.append(window)
+
+    def window(self, since: Optional[float], until: Optional[float]) -> SketchWindow:
+        """Окно в секундах -> окно в номерах окон скетчей, until округляется вверх."""
+        since_window = int(since // self.window_s) if since is not None else np.iinfo(np.int64).min
+        until_window = -int(-until // self.window_s) if until is not None else np.iinfo(np.int64).max
+        return since_window, until_window
+
+    def _in_window(self, window: Optional[SketchWindow]) -> List[WindowSketches]:
+        if window is None:
+            return list(self.windows.values())
+        return [sketches for key, sketches in self.windows.items() if window[0] <= key < window[1]]
+
+    def unique_viewers(self, post: int, window: Optional[SketchWindow] = None) -> int:
+        """Оценка числа различных зрителей; без окна — за всё время, включая архив."""
+        merged = HyperLogLog(self.hll_precision)
+        sources = [sketches.viewers.get(post) for sketches in self._in_window(window)]
+        if window is None:
+            sources.append(self.archive.get(post))
+        for sketch in sources:
+            if sketch is not None:
+                merged.merge(sketch)
+        return merged.estimate()
+
+    def trending(self, limit: int, window: Optional[SketchWindow] = None) -> List[Tuple[int, int, int]]:
+        """
+        Самые просматриваемые посты окна: (post, оценка сверху, гарантированный минимум).
+        Оценка сверху — меньшая из Space-Saving и Count-Min, обе не занижают частоту.
+        """
+        windows = self._in_window(window)
+        if not windows:
+            return []
+        top = SpaceSaving(self.top_capacity)
+        views = CountMinSketch(self.cms_width, self.cms_depth)
+        for sketches in windows:
+            top.merge(sketches.top)
+            views.merge(sketches.views)
+        posts, counts, errors = top.top(limit)
+        upper = np.minimum(counts, views.estimate(posts))
+        return list(zip(posts.tolist(), upper.tolist(), (counts - errors).tolist()))
+
+    def _path(self, window) -> Path:
+        return self.directory / f'{window}.sketch'
+
+    def save(self) -> None:
+        """Перезаписывает изменившиеся окна и архив, удаляет вытесненные окна."""
+        dirty, self._dirty = self._dirty, set()
+        expired, self._expired = self._expired, []
+        for window in dirty:
+            data = pack_viewers(self.archive) if window == ARCHIVE else self.windows[window].to_bytes()
+            path = self._path(window)
+            tmp = path.with_name(path.name + '.tmp')
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        # Архив уже записан, поэтому вытесненные окна можно удалять
+        for window in expired:
+            self._path(window).unlink(missing_ok=True)
+
+    def load(self) -> int:
+        """Поднимает окна и архив; возвращает число окон."""
+        for path in self.directory.glob('*.sketch'):
+            if path.stem == ARCHIVE:
+                self.archive = unpack_viewers(path.read_bytes())
+            else:
+                self.windows[int(path.stem)] = WindowSketches.from_bytes(path.read_bytes(), self.hll_precision)
+        # Вытесненное окно остаётся на диске, если процесс упал до save. Повторное слияние
+        # в архив безопасно: объединение HyperLogLog идемпотентно
+        self._expire()
+        return len(self.windows)
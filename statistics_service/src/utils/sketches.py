@@ -0,0 +1,299 @@
+"""
+Вероятностные структуры для статистики: Count-Min Sketch, Space-Saving и HyperLogLog.
+Все работают со стабильными 64-битными хешами (hash64), поэтому скетчи разных процессов
+и разных окон с одинаковыми параметрами сливаются через merge и переживают сериализацию.
+"""
+import hashlib
+import math
+import struct
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Сид строки Count-Min: строки отличаются только им, поэтому слияние требует тех же параметров
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+LENGTH = struct.Struct('<I')
+
+
+def hash64(value: str) -> int:
+    """Стабильный между процессами хеш: встроенный hash() для строк рандомизирован."""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'little')
+
+
+def hash64_array(values: Iterable[str]) -> np.ndarray:
+    return np.fromiter((hash64(value) for value in values), dtype=np.uint64)
+
+
+def mix64(x: np.ndarray) -> np.ndarray:
+    """Финализатор splitmix64: из одного хеша получаются независимые индексы для строк Count-Min."""
+    with np.errstate(over='ignore'):
+        x = x ^ (x >> np.uint64(30))
+        x = x * np.uint64(0xBF58476D1CE4E5B9)
+        x = x ^ (x >> np.uint64(27))
+        x = x * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def pack(*parts: bytes) -> bytes:
+    return b''.join(LENGTH.pack(len(part)) + part for part in parts)
+
+
+def unpack(data: bytes) -> List[bytes]:
+    parts, offset = [], 0
+    while offset < len(data):
+        (size,) = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        parts.append(data[offset:offset + size])
+        offset += size
+    return parts
+
+
+class CountMinSketch:
+    """
+    Оценка частот сверху: ошибка не больше e / width * N с вероятностью 1 - exp(-depth).
+    Ширина — степень двойки, чтобы индекс брался маской.
+    """
+
+    HEADER = struct.Struct('<IIq')
+
+    def __init__(self, width: int = 1 << 13, depth: int = 4):
+        if width & (width - 1):
+            raise ValueError('Count-Min width must be a power of two')
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self._seeds = (np.arange(1, depth + 1, dtype=np.uint64) * GOLDEN)[:, None]
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def _indexes(self, keys: np.ndarray) -> np.ndarray:
+        with np.errstate(over='ignore'):
+            return (mix64(keys[None, :] + self._seeds) & np.uint64(self.width - 1)).astype(np.intp)
+
+    def add(self, keys: np.ndarray, counts: Optional[np.ndarray] = None) -> None:
+        if not len(keys):
+            return
+        counts = np.ones(len(keys), dtype=np.int64) if counts is None else counts
+        for row, indexes in enumerate(self._indexes(keys)):
+            np.add.at(self.table[row], indexes, counts)
+        self.total += int(counts.sum())
+
+    def estimate(self, keys: np.ndarray) -> np.ndarray:
+        if not len(keys):
+            return np.zeros(0, dtype=np.int64)
+        return np.take_along_axis(self.table, self._indexes(keys), axis=1).min(axis=0)
+
+    def merge(self, other: 'CountMinSketch') -> None:
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError('Cannot merge Count-Min sketches with different dimensions')
+        self.table += other.table
+        self.total += other.total
+
+    def to_bytes(self) -> bytes:
+        return self.HEADER.pack(self.width, self.depth, self.total) + self.table.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'CountMinSketch':
+        width, depth, total = cls.HEADER.unpack_from(data)
+        sketch = cls(width, depth)
+        sketch.table = np.frombuffer(data, dtype=np.int64, offset=cls.HEADER.size).reshape(depth, width).copy()
+        sketch.total = total
+        return sketch
+
+
+class SpaceSaving:
+    """
+    Самые частые ключи в capacity счётчиках. count — оценка сверху, count - error — снизу;
+    любой ключ с частотой больше N / capacity гарантированно в сводке.
+    Пачка обновлений и слияние устроены одинаково (Agarwal et al., Mergeable Summaries):
+    ключу, которого нет в заполненной сводке, добавляется её минимальный счётчик.
+    """
+
+    HEADER = struct.Struct('<Iq')
+
+    def __init__(self, capacity: int = 1_000):
+        self.capacity = capacity
+        self.keys = np.zeros(0, dtype=np.uint64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.errors = np.zeros(0, dtype=np.int64)
+        self.total = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.counts.nbytes + self.errors.nbytes
+
+    def min_count(self) -> int:
+        """Верхняя граница частоты ключа, которого нет в сводке."""
+        return int(self.counts.min()) if len(self.keys) >= self.capacity else 0
+
+    def update(self, keys: np.ndarray, counts: Optional[np.ndarray] = None) -> None:
+        if not len(keys):
+            return
+        counts = np.ones(len(keys), dtype=np.int64) if counts is None else counts
+        unique, inverse = np.unique(keys, return_inverse=True)
+        batch = np.bincount(inverse, weights=counts, minlength=len(unique)).astype(np.int64)
+        # Пачка — точная сводка: отсутствующий в ней ключ встречался 0 раз
+        self._combine(unique, batch, np.zeros(len(unique), dtype=np.int64), 0)
+        self.total += int(batch.sum())
+
+    def merge(self, other: 'SpaceSaving') -> None:
+        self._combine(other.keys, other.counts, other.errors, other.min_count())
+        self.total += other.total
+
+    def _combine(self, keys: np.ndarray, counts: np.ndarray, errors: np.ndarray, other_min: int) -> None:
+        own_min = self.min_count()
+        own = len(self.keys)
+        unique, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        combined = np.bincount(inverse, weights=np.concatenate([self.counts, counts]), minlength=len(unique))
+        error = np.bincount(inverse, weights=np.concatenate([self.errors, errors]), minlength=len(unique))
+        in_own = np.zeros(len(unique), dtype=bool)
+        in_own[inverse[:own]] = True
+        in_other = np.zeros(len(unique), dtype=bool)
+        in_other[inverse[own:]] = True
+        missing = np.where(in_own, 0, own_min) + np.where(in_other, 0, other_min)
+        combined += missing
+        error += missing
+        if len(unique) > self.capacity:
+            kept = np.argpartition(-combined, self.capacity - 1)[:self.capacity]
+            unique, combined, error = unique[kept], combined[kept], error[kept]
+        self.keys = unique
+        self.counts = combined.astype(np.int64)
+        self.errors = error.astype(np.int64)
+
+    def top(self, limit: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Ключи по убыванию оценки, их оценки сверху и ошибки."""
+        order = np.lexsort((self.keys, -self.counts))[:limit]
+        return self.keys[order], self.counts[order], self.errors[order]
+
+    def to_bytes(self) -> bytes:
+        return self.HEADER.pack(self.capacity, self.total) + pack(
+            self.keys.tobytes(), self.counts.tobytes(), self.errors.tobytes(),
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'SpaceSaving':
+        capacity, total = cls.HEADER.unpack_from(data)
+        keys, counts, errors = unpack(data[cls.HEADER.size:])
+        summary = cls(capacity)
+        summary.keys = np.frombuffer(keys, dtype=np.uint64).copy()
+        summary.counts = np.frombuffer(counts, dtype=np.int64).copy()
+        summary.errors = np.frombuffer(errors, dtype=np.int64).copy()
+        summary.total = total
+        return summary
+
+
+def _sigma(x: float) -> float:
+    if x == 1:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+class HyperLogLog:
+    """
+    Число различных ключей с относительной ошибкой около 1.04 / sqrt(2^precision).
+    Пока ключей мало, хранятся сами хеши (точный подсчёт, 8 байт на ключ); когда они
+    становятся дороже регистров, скетч переходит на 2^precision однобайтовых регистров.
+    Оценка по регистрам — улучшенный оценщик Ertl (2017), без таблиц поправок смещения.
+    """
+
+    HEADER = struct.Struct('<BB')
+    SPARSE, DENSE = 0, 1
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError('HyperLogLog precision must be 4..18')
+        self.precision = precision
+        self.registers: Optional[np.ndarray] = None
+        self.sparse = np.zeros(0, dtype=np.uint64)
+
+    @property
+    def size(self) -> int:
+        return 1 << self.precision
+
+    @property
+    def nbytes(self) -> int:
+        return self.registers.nbytes if self.registers is not None else self.sparse.nbytes
+
+    def add(self, keys: np.ndarray) -> None:
+        if self.registers is None:
+            self.sparse = np.union1d(self.sparse, keys)
+            # Хеш весит 8 байт, регистр — 1
+            if len(self.sparse) * 8 > self.size:
+                self._densify()
+            return
+        self._add_dense(keys)
+
+    def _densify(self) -> None:
+        self.registers = np.zeros(self.size, dtype=np.uint8)
+        self._add_dense(self.sparse)
+        self.sparse = np.zeros(0, dtype=np.uint64)
+
+    def _add_dense(self, keys: np.ndarray) -> None:
+        if not len(keys):
+            return
+        bits = 64 - self.precision
+        indexes = (keys >> np.uint64(bits)).astype(np.intp)
+        rest = keys & np.uint64((1 << bits) - 1)
+        # Номер первой единицы в оставшихся bits битах, считая с 1; при precision >= 11 log2 точен
+        with np.errstate(divide='ignore'):
+            ranks = np.where(rest == 0, bits + 1, bits - np.floor(np.log2(rest.astype(np.float64))))
+        np.maximum.at(self.registers, indexes, ranks.astype(np.uint8))
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        if self.precision != other.precision:
+            raise ValueError('Cannot merge HyperLogLog sketches with different precision')
+        if other.registers is None:
+            self.add(other.sparse)
+            return
+        if self.registers is None:
+            self._densify()
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        if self.registers is None:
+            return len(self.sparse)
+        m, bits = self.size, 64 - self.precision
+        histogram = np.bincount(self.registers, minlength=bits + 2)
+        z = m * _tau(1 - histogram[bits + 1] / m)
+        for k in range(bits, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        return round(m * m / (2 * math.log(2)) / z)
+
+    def to_bytes(self) -> bytes:
+        if self.registers is None:
+            return self.HEADER.pack(self.SPARSE, self.precision) + self.sparse.tobytes()
+        return self.HEADER.pack(self.DENSE, self.precision) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        mode, precision = cls.HEADER.unpack_from(data)
+        sketch = cls(precision)
+        if mode == cls.SPARSE:
+            sketch.sparse = np.frombuffer(data, dtype=np.uint64, offset=cls.HEADER.size).copy()
+        else:
+            sketch.registers = np.frombuffer(data, dtype=np.uint8, offset=cls.HEADER.size).copy()
+        return sketch
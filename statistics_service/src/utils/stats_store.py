@@ -0,0 +1,387 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from utils.partitions import PartitionStorage
+from utils.seen_events import SeenEvents
+from utils.sketch_store import SketchStore, SketchWindow
+from utils.sketches import hash64
+
+logger = logging.getLogger(__name__)
+
+# Ширина бакета агрегации: окна запросов округляются до неё
+STATISTICS_BUCKET_S = int(os.getenv('STATISTICS_BUCKET_S', 60))
+STATISTICS_BUFFER_ROWS = int(os.getenv('STATISTICS_BUFFER_ROWS', 1 << 20))
+# Сколько агрегированных сегментов копится до слияния в один
+STATISTICS_MAX_SEGMENTS = int(os.getenv('STATISTICS_MAX_SEGMENTS', 16))
+
+# Порядок задаёт коды в колонке kind
+KINDS = ('post_viewed', 'post_liked', 'post_commented', 'post_created')
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+VIEWED, LIKED, COMMENTED, CREATED = range(len(KINDS))
+
+# Окно в бакетах: [since, until)
+Window = Tuple[int, int]
+
+
+class Dictionary:
+    """Словарное кодирование строк: в колонках лежат int32-коды, строки — только здесь."""
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode_array(self, values: np.ndarray) -> np.ndarray:
+        """Кодирует колонку строк: через словарь проходят только различные значения."""
+        unique, inverse = np.unique(values, return_inverse=True)
+        return np.array([self.encode(str(value)) for value in unique], dtype=np.int32)[inverse]
+
+
+class Segment(NamedTuple):
+    """Агрегированные строки (bucket, post, kind, count), отсортированные по bucket."""
+    buckets: np.ndarray
+    posts: np.ndarray
+    kinds: np.ndarray
+    counts: np.ndarray
+
+    def between(self, window: Window) -> 'Segment':
+        lo, hi = np.searchsorted(self.buckets, window, side='left')
+        return Segment(*(column[lo:hi] for column in self))
+
+
+def aggregate(buckets: np.ndarray, posts: np.ndarray, kinds: np.ndarray, counts: np.ndarray) -> Segment:
+    """Суммирует count по одинаковым (bucket, post, kind) без цикла по строкам."""
+    if not len(buckets):
+        return Segment(buckets.astype(np.int64), posts.astype(np.int32), kinds.astype(np.uint8), counts.astype(np.int64))
+    base = int(buckets.min())
+    n_posts = int(posts.max()) + 1
+    keys = ((buckets - base) * n_posts + posts) * len(KINDS) + kinds
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sums = np.add.reduceat(counts[order], starts)
+    keys = keys[starts]
+    return Segment(
+        buckets=keys // len(KINDS) // n_posts + base,
+        posts=(keys // len(KINDS) % n_posts).astype(np.int32),
+        kinds=(keys % len(KINDS)).astype(np.uint8),
+        counts=sums.astype(np.int64),
+    )
+
+
+class EventBuffer:
+    """Сырые события до агрегации: по массиву NumPy на колонку, растут удвоением."""
+
+    def __init__(self, capacity: int):
+        self.size = 0
+        self.timestamps = np.empty(capacity, dtype=np.int64)
+        self.kinds = np.empty(capacity, dtype=np.uint8)
+        self.posts = np.empty(capacity, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, timestamps: np.ndarray, kinds: np.ndarray, posts: np.ndarray) -> None:
+        end = self.size + len(timestamps)
+        if end > len(self.timestamps):
+            capacity = max(end, 2 * len(self.timestamps))
+            for name in ('timestamps', 'kinds', 'posts'):
+                column = getattr(self, name)
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self.size] = column[:self.size]
+                setattr(self, name, grown)
+        self.timestamps[self.size:end] = timestamps
+        self.kinds[self.size:end] = kinds
+        self.posts[self.size:end] = posts
+        self.size = end
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.timestamps[:self.size], self.kinds[:self.size], self.posts[:self.size]
+
+    def clear(self) -> None:
+        self.size = 0
+
+
+class StatsStore:
+    """
+    Колоночное хранилище счётчиков постов. Новые события копятся в EventBuffer,
+    flush сворачивает их в сегмент по бакетам времени и отдаёт на запись партицией.
+    Счётчики за всё время ведутся отдельно плотной матрицей post x kind,
+    поэтому запросы без окна не трогают сегменты. Если передан SketchStore, просмотры
+    дополнительно идут в скетчи трендов и уникальных зрителей. Если передан SeenEvents,
+    повторно доставленные события (тот же event_id) не считаются второй раз.
+    """
+
+    def __init__(self, storage: PartitionStorage, bucket_s: int = STATISTICS_BUCKET_S,
+                 buffer_rows: int = STATISTICS_BUFFER_ROWS, max_segments: int = STATISTICS_MAX_SEGMENTS,
+                 sketches: Optional[SketchStore] = None, seen: Optional[SeenEvents] = None):
+        self.storage = storage
+        self.sketches = sketches
+        self.seen = seen
+        self.bucket_s = bucket_s
+        self.buffer_rows = buffer_rows
+        self.max_segments = max_segments
+        self.posts = Dictionary()
+        self.authors = Dictionary()
+        self.buffer = EventBuffer(buffer_rows)
+        self.segments: List[Segment] = []
+        self.totals = np.zeros((1024, len(KINDS)), dtype=np.int64)
+        self.author_of = np.full(1024, -1, dtype=np.int32)
+        # hash64 post_id по коду поста и обратно: скетчи хранят хеши, а не коды процесса
+        self.post_hashes = np.zeros(1024, dtype=np.uint64)
+        self._post_by_hash: Dict[int, int] = {}
+        self.ingested = 0
+        self.skipped = 0
+        self.duplicates = 0
+
+    def _reserve_posts(self) -> None:
+        if len(self.posts) <= len(self.author_of):
+            return
+        capacity = max(len(self.posts), 2 * len(self.author_of))
+        totals = np.zeros((capacity, len(KINDS)), dtype=np.int64)
+        totals[:len(self.totals)] = self.totals
+        author_of = np.full(capacity, -1, dtype=np.int32)
+        author_of[:len(self.author_of)] = self.author_of
+        post_hashes = np.zeros(capacity, dtype=np.uint64)
+        post_hashes[:len(self.post_hashes)] = self.post_hashes
+        self.totals, self.author_of, self.post_hashes = totals, author_of, post_hashes
+
+    def _hash_posts(self) -> None:
+        """Хеширует посты, появившиеся после прошлого вызова."""
+        for post in range(len(self._post_by_hash), len(self.posts)):
+            key = hash64(self.posts.values[post])
+            self.post_hashes[post] = key
+            self._post_by_hash[key] = post
+
+    def ingest(self, events: Iterable[dict]) -> int:
+        """
+        Раскладывает события по колонкам; события не о постах и повторы пропускаются.
+        Возвращает число принятых.
+        """
+        timestamps, kinds, posts, viewers = [], [], [], []
+        created: List[Tuple[int, str]] = []
+        for event in events:
+            kind = KIND_CODES.get(event.get('event_type'))
+            if kind is None:
+                self.skipped += 1
+                continue
+            event_id = event.get('event_id')
+            if self.seen is not None and event_id and not self.seen.add(event_id):
+                self.duplicates += 1
+                continue
+            post = self.posts.encode(event['post_id'])
+            if kind == CREATED:
+                created.append((post, event['user_id']))
+            elif kind == VIEWED and self.sketches is not None:
+                viewers.append(hash64(event['user_id']))
+            timestamps.append(event['timestamp'])
+            kinds.append(kind)
+            posts.append(post)
+        if not posts:
+            return 0
+
+        self._reserve_posts()
+        for post, author in created:
+            self.author_of[post] = self.authors.encode(author)
+        kinds = np.array(kinds, dtype=np.uint8)
+        posts = np.array(posts, dtype=np.int32)
+        timestamps = np.array(timestamps, dtype=np.float64).astype(np.int64)
+        self.buffer.append(timestamps, kinds, posts)
+        np.add.at(self.totals, (posts, kinds), 1)
+        if self.sketches is not None:
+            self._hash_posts()
+            views = kinds == VIEWED
+            self.sketches.add_views(timestamps[views], self.post_hashes[posts[views]],
+                                    np.array(viewers, dtype=np.uint64))
+        self.ingested += len(posts)
+        return len(posts)
+
+    def roll_up(self) -> Optional[Segment]:
+        """Сворачивает буфер в новый сегмент; None, если буфер пуст."""
+        if not len(self.buffer):
+            return None
+        timestamps, kinds, posts = self.buffer.columns()
+        segment = aggregate(timestamps // self.bucket_s, posts, kinds, np.ones(len(posts), dtype=np.int64))
+        self.segments.append(segment)
+        self.buffer.clear()
+        return segment
+
+    def compact(self) -> Optional[Segment]:
+        """Сливает сегменты в один, когда их больше max_segments; иначе None."""
+        if len(self.segments) <= self.max_segments:
+            return None
+        merged = aggregate(*(np.concatenate(columns) for columns in zip(*self.segments)))
+        self.segments = [merged]
+        return merged
+
+    async def flush(self) -> None:
+        """
+        Сворачивает буфер в сегмент и пишет его партицией; лишние сегменты сливаются
+        и заменяют все партиции одной. Свёртка идёт в event loop, запись файлов — в потоке.
+
+        Порядок записи рассчитан на падение между шагами: окно event_id с номером партиции,
+        партиция, скетчи, затем вызывающий коммитит позицию в брокере. Без партиции окно
+        забывает её события, и они перечитываются. Скетчи пишутся после партиции: если процесс
+        упал между ними, перечитанные события уже известны окну и в скетчи не попадут, так что
+        скетчи недосчитают просмотры одного flush, но не удвоят их.
+        """
+        started = time.perf_counter()
+        segment = self.roll_up()
+        if segment is None:
+            return
+        if self.seen is not None:
+            await asyncio.to_thread(lambda: self.seen.save(self.storage.last() + 1))
+        await asyncio.to_thread(self.storage.append, self.partition_columns(segment))
+        if self.seen is not None:
+            self.seen.written()
+        if self.sketches is not None:
+            await asyncio.to_thread(self.sketches.save)
+        merged = self.compact()
+        if merged is not None:
+            await asyncio.to_thread(self.storage.replace_all, self.partition_columns(merged))
+        logger.info('Flushed %d statistics rows in %.1fms', len(segment.counts), (time.perf_counter() - started) * 1000)
+
+    def partition_columns(self, segment: Segment) -> Dict[str, np.ndarray]:
+        """Партиция хранит строки, а не коды: файлы не зависят от словарей процесса."""
+        post_ids = np.array(self.posts.values, dtype=object)
+        author_ids = np.array(self.authors.values + [''], dtype=object)
+        return {
+            'bucket': segment.buckets,
+            'post_id': post_ids[segment.posts],
+            # -1 (автор неизвестен) указывает на последнюю, пустую строку
+            'author_user_id': author_ids[self.author_of[segment.posts]],
+            'event_type': np.array(KINDS, dtype=object)[segment.kinds],
+            'count': segment.counts,
+        }
+
+    def load(self) -> int:
+        """Поднимает сегменты и счётчики из сохранённых партиций; возвращает число партиций."""
+        partitions = self.storage.read_all()
+        for columns in partitions:
+            posts = self.posts.encode_array(columns['post_id'])
+            self._reserve_posts()
+            known = columns['author_user_id'] != ''
+            if known.any():
+                self.author_of[posts[known]] = self.authors.encode_array(columns['author_user_id'][known])
+            event_types, inverse = np.unique(columns['event_type'], return_inverse=True)
+            kinds = np.array([KIND_CODES[str(kind)] for kind in event_types], dtype=np.uint8)[inverse]
+            segment = Segment(columns['bucket'].astype(np.int64), posts, kinds, columns['count'].astype(np.int64))
+            self.segments.append(segment)
+            np.add.at(self.totals, (segment.posts, segment.kinds), segment.counts)
+        if self.sketches is not None:
+            self._hash_posts()
+            self.sketches.load()
+        if self.seen is not None:
+            self.seen.load(self.storage.last())
+        return len(partitions)
+
+    def window(self, since: Optional[float], until: Optional[float]) -> Window:
+        """Окно в секундах -> окно в бакетах; until округляется вверх, чтобы не терять хвост."""
+        since_bucket = int(since // self.bucket_s) if since is not None else np.iinfo(np.int64).min
+        until_bucket = -int(-until // self.bucket_s) if until is not None else np.iinfo(np.int64).max
+        return since_bucket, until_bucket
+
+    def _window_rows(self, window: Window) -> Segment:
+        """Строки сегментов и буфера, попавшие в окно, одним набором колонок."""
+        parts = [segment.between(window) for segment in self.segments]
+        timestamps, kinds, posts = self.buffer.columns()
+        buckets = timestamps // self.bucket_s
+        mask = (buckets >= window[0]) & (buckets < window[1])
+        parts.append(Segment(buckets[mask], posts[mask], kinds[mask], np.ones(int(mask.sum()), dtype=np.int64)))
+        return Segment(*(np.concatenate(columns) for columns in zip(*parts)))
+
+    def _author_id(self, post: int) -> str:
+        author = self.author_of[post]
+        return self.authors.values[author] if author >= 0 else ''
+
+    def post_stats(self, post_id: str, window: Optional[Window] = None) -> Tuple[str, np.ndarray]:
+        """Автор и счётчики поста по KINDS; неизвестный пост — нули."""
+        post = self.posts.get(post_id)
+        if post is None:
+            return '', np.zeros(len(KINDS), dtype=np.int64)
+        if window is None:
+            return self._author_id(post), self.totals[post].copy()
+        rows = self._window_rows(window)
+        mask = rows.posts == post
+        counts = np.bincount(rows.kinds[mask], weights=rows.counts[mask], minlength=len(KINDS))
+        return self._author_id(post), counts.astype(np.int64)
+
+    def author_stats(self, author_id: str, window: Optional[Window] = None) -> np.ndarray:
+        """Счётчики по KINDS, сложенные по постам автора."""
+        author = self.authors.get(author_id)
+        if author is None:
+            return np.zeros(len(KINDS), dtype=np.int64)
+        is_author = self.author_of[:len(self.posts)] == author
+        if window is None:
+            return self.totals[:len(self.posts)][is_author].sum(axis=0)
+        rows = self._window_rows(window)
+        mask = is_author[rows.posts]
+        return np.bincount(rows.kinds[mask], weights=rows.counts[mask], minlength=len(KINDS)).astype(np.int64)
+
+    def top_posts(self, kind: int, limit: int, window: Optional[Window] = None) -> List[Tuple[str, str, np.ndarray]]:
+        """
+        Посты с наибольшим счётчиком kind вместе с автором и всеми счётчиками.
+        Кандидаты отбираются argpartition, сортируются только limit лучших.
+        """
+        if window is None:
+            per_post = self.totals[:len(self.posts), kind]
+        else:
+            rows = self._window_rows(window)
+            mask = rows.kinds == kind
+            per_post = np.bincount(rows.posts[mask], weights=rows.counts[mask], minlength=len(self.posts))
+        # В коротком окне почти все счётчики нулевые, а на массиве из одинаковых значений
+        # argpartition деградирует: выбор идёт только среди ненулевых
+        candidates = np.flatnonzero(per_post)
+        limit = min(limit, len(candidates))
+        if limit <= 0:
+            return []
+        top = candidates[np.argpartition(per_post[candidates], -limit)[-limit:]]
+        top = top[np.lexsort((top, -per_post[top]))]
+
+        if window is None:
+            counts = self.totals[top]
+        else:
+            position = np.full(len(self.posts), -1)
+            position[top] = np.arange(limit)
+            selected = position[rows.posts] >= 0
+            counts = np.zeros((limit, len(KINDS)), dtype=np.int64)
+            np.add.at(counts, (position[rows.posts[selected]], rows.kinds[selected]), rows.counts[selected])
+        return [(self.posts.values[post], self._author_id(post), counts[i]) for i, post in enumerate(top)]
+
+    def unique_viewers(self, post_id: str, window: Optional[SketchWindow] = None) -> int:
+        """Оценка числа различных зрителей поста по HyperLogLog; 0 без скетчей."""
+        if self.sketches is None:
+            return 0
+        return self.sketches.unique_viewers(hash64(post_id), window)
+
+    def trending(self, limit: int, window: Optional[SketchWindow] = None) -> List[Tuple[str, str, int, int]]:
+        """
+        Самые просматриваемые посты по скетчам: (post_id, автор, оценка сверху, гарантированный минимум).
+        В отличие от top_posts не читает сегменты, поэтому не зависит от их числа.
+        """
+        if self.sketches is None:
+            return []
+        trending = []
+        for key, upper, lower in self.sketches.trending(limit, window):
+            post = self._post_by_hash.get(key)
+            # Пост, известный только по скетчам (партиции удалены), пропускается: его id не восстановить
+            if post is not None:
+                trending.append((self.posts.values[post], self._author_id(post), upper, lower))
+        return trending
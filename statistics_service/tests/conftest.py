@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Модули сервиса импортируют друг друга как top-level пакеты (handlers, utils, ...),
+# общий код — как пакет shared из корня репозитория (в образ он копируется рядом с src)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
@@ -0,0 +1,160 @@
+import numpy as np
+import pytest
+
+from utils.partitions import NpzFormat, PartitionStorage
+from utils.seen_events import SeenEvents
+from utils.sketch_store import SketchStore
+from utils.sketches import CountMinSketch, HyperLogLog, SpaceSaving, hash64_array
+from utils.stats_store import StatsStore
+
+HOUR = 3600
+
+
+def keys(values) -> np.ndarray:
+    return hash64_array(str(value) for value in values)
+
+
+def zipf_stream(n: int, universe: int, seed: int = 1) -> np.ndarray:
+    return np.minimum(np.random.default_rng(seed).zipf(1.3, n), universe)
+
+
+def test_hyperloglog_accuracy_merge_and_bytes():
+    exact = 50_000
+    sketch = HyperLogLog(12)
+    sketch.add(keys(range(exact)))
+    # 1.04 / sqrt(4096) ~ 1.6%, три сигмы с запасом
+    assert abs(sketch.estimate() - exact) / exact < 0.05
+    assert sketch.nbytes == 4096
+
+    # Слияние частей с пересечением равно скетчу объединения
+    left, right = HyperLogLog(12), HyperLogLog(12)
+    left.add(keys(range(0, 30_000)))
+    right.add(keys(range(20_000, exact)))
+    left.merge(right)
+    assert left.estimate() == sketch.estimate()
+    assert HyperLogLog.from_bytes(left.to_bytes()).estimate() == sketch.estimate()
+
+    # Малые множества считаются точно и сливаются с плотными
+    small = HyperLogLog(12)
+    small.add(keys([1, 2, 3, 3]))
+    assert small.estimate() == 3
+    assert HyperLogLog.from_bytes(small.to_bytes()).estimate() == 3
+    with pytest.raises(ValueError):
+        small.merge(HyperLogLog(10))
+
+
+def test_count_min_never_underestimates_and_merges():
+    stream = keys(zipf_stream(100_000, 10_000))
+    unique, exact = np.unique(stream, return_counts=True)
+    whole, left, right = CountMinSketch(1 << 10, 4), CountMinSketch(1 << 10, 4), CountMinSketch(1 << 10, 4)
+    whole.add(stream)
+    left.add(stream[:40_000])
+    right.add(stream[40_000:])
+    left.merge(right)
+    assert np.array_equal(left.table, whole.table)
+
+    estimate = CountMinSketch.from_bytes(whole.to_bytes()).estimate(unique)
+    assert (estimate >= exact).all()
+    # Ошибка e / width * N нарушается с вероятностью exp(-depth)
+    assert np.mean(estimate - exact <= np.e / (1 << 10) * len(stream)) > 0.95
+
+
+def test_space_saving_finds_heavy_hitters_across_merged_workers():
+    stream = keys(zipf_stream(200_000, 50_000))
+    unique, exact = np.unique(stream, return_counts=True)
+    capacity = 200
+    merged = SpaceSaving(capacity)
+    for part in np.array_split(stream, 4):
+        worker = SpaceSaving(capacity)
+        for batch in np.array_split(part, 10):
+            worker.update(batch)
+        merged.merge(SpaceSaving.from_bytes(worker.to_bytes()))
+    assert merged.total == len(stream)
+
+    found, counts, errors = merged.top(capacity)
+    frequency = dict(zip(unique.tolist(), exact.tolist()))
+    true = np.array([frequency[key] for key in found.tolist()])
+    assert (counts >= true).all() and (counts - errors <= true).all()
+    # Каждый ключ с частотой выше N / capacity обязан попасть в сводку
+    heavy = unique[exact > len(stream) / capacity]
+    assert np.isin(heavy, found).all()
+    assert found[0] == unique[exact.argmax()]
+
+
+def make_sketch_store(tmp_path, **kwargs) -> SketchStore:
+    return SketchStore(str(tmp_path / 'sketches'), window_s=HOUR, cms_width=1 << 10, top_capacity=50, **kwargs)
+
+
+def test_sketch_store_windows_expire_into_archive_and_reload(tmp_path):
+    sketches = make_sketch_store(tmp_path, retention=2)
+    posts = keys(['p1', 'p2'])
+    sketches.add_views(np.array([0, 10, 20]), posts[[0, 0, 1]], keys(['a', 'b', 'a']))
+    sketches.add_views(np.array([HOUR + 5]), posts[[0]], keys(['c']))
+    assert sketches.unique_viewers(int(posts[0])) == 3
+    assert sketches.unique_viewers(int(posts[0]), sketches.window(HOUR, 2 * HOUR)) == 1
+    trending = sketches.trending(1, sketches.window(0, HOUR))
+    assert trending == [(int(posts[0]), 2, 2)]
+    sketches.save()
+
+    # Третье окно вытесняет первое: его зрители остаются только в архиве
+    sketches.add_views(np.array([2 * HOUR]), posts[[1]], keys(['d']))
+    assert 0 not in sketches.windows
+    assert sketches.trending(10, sketches.window(0, HOUR)) == []
+    assert sketches.unique_viewers(int(posts[0])) == 3
+    sketches.save()
+    assert sorted(path.name for path in (tmp_path / 'sketches').iterdir()) == ['1.sketch', '2.sketch', 'archive.sketch']
+
+    reloaded = make_sketch_store(tmp_path, retention=2)
+    assert reloaded.load() == 2
+    assert reloaded.unique_viewers(int(posts[0])) == 3
+    assert reloaded.unique_viewers(int(posts[1])) == 2
+
+
+@pytest.mark.asyncio
+async def test_stats_store_feeds_sketches(tmp_path):
+    def make_store():
+        return StatsStore(PartitionStorage(str(tmp_path / 'partitions'), NpzFormat()),
+                          sketches=make_sketch_store(tmp_path))
+
+    store = make_store()
+    store.ingest([
+        {'event_type': 'post_created', 'post_id': 'p1', 'user_id': 'alice', 'timestamp': 0},
+        *({'event_type': 'post_viewed', 'post_id': 'p1', 'user_id': f'u{i % 3}', 'timestamp': 10} for i in range(6)),
+        {'event_type': 'post_viewed', 'post_id': 'p2', 'user_id': 'u0', 'timestamp': 20},
+        {'event_type': 'post_liked', 'post_id': 'p2', 'user_id': 'u0', 'timestamp': 20},
+    ])
+    assert store.unique_viewers('p1') == 3
+    assert store.trending(10) == [('p1', 'alice', 6, 6), ('p2', '', 1, 1)]
+    await store.flush()
+
+    reloaded = make_store()
+    reloaded.load()
+    assert reloaded.unique_viewers('p1') == 3
+    assert reloaded.trending(1) == [('p1', 'alice', 6, 6)]
+
+
+@pytest.mark.asyncio
+async def test_replayed_views_do_not_inflate_sketches(tmp_path):
+    def make_store():
+        return StatsStore(PartitionStorage(str(tmp_path / 'partitions'), NpzFormat()),
+                          sketches=make_sketch_store(tmp_path), seen=SeenEvents(str(tmp_path / 'seen_events.npz')))
+
+    events = [
+        {'event_type': 'post_viewed', 'post_id': 'p1', 'user_id': f'u{i % 3}', 'timestamp': 10, 'event_id': f'e{i}'}
+        for i in range(6)
+    ]
+    store = make_store()
+    store.ingest(events)
+    store.ingest(events)
+    await store.flush()
+    assert store.trending(1) == [('p1', '', 6, 6)]
+    trending = store.sketches.windows[0].views.estimate(keys(['p1']))
+
+    # Брокер повторяет пачку после перезапуска: она уже в партиции и в скетчах
+    reloaded = make_store()
+    reloaded.load()
+    assert reloaded.ingest(events) == 0
+    await reloaded.flush()
+    assert reloaded.trending(1) == [('p1', '', 6, 6)]
+    assert (reloaded.sketches.windows[0].views.estimate(keys(['p1'])) == trending).all()
+    assert reloaded.unique_viewers('p1') == 3
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+
+from main_grpc import consume
+from utils.event_source import FileEventSource
+from shared.events import EventProducer, FileBroker
+from utils.partitions import NpzFormat, PartitionStorage
+from utils.seen_events import SeenEvents
+from utils.stats_store import COMMENTED, CREATED, LIKED, VIEWED, StatsStore
+
+MINUTE = 60
+
+
+def event(event_type: str, post_id: str, timestamp: float, user_id: str = 'reader') -> dict:
+    return {'event_type': event_type, 'post_id': post_id, 'user_id': user_id, 'timestamp': timestamp}
+
+
+def make_store(tmp_path, **kwargs) -> StatsStore:
+    return StatsStore(PartitionStorage(str(tmp_path / 'partitions'), NpzFormat()), bucket_s=MINUTE, **kwargs)
+
+
+def sample_events() -> list:
+    return [
+        event('post_created', 'p1', 0, user_id='alice'),
+        event('post_created', 'p2', 0, user_id='alice'),
+        event('post_created', 'p3', 0, user_id='bob'),
+        *(event('post_viewed', 'p1', 10) for _ in range(5)),
+        *(event('post_viewed', 'p2', 70) for _ in range(3)),
+        *(event('post_viewed', 'p3', 130) for _ in range(4)),
+        event('post_liked', 'p1', 20),
+        event('post_commented', 'p3', 140),
+        event('user_followed', '', 0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_counts_and_windows_survive_flush_and_reload(tmp_path):
+    store = make_store(tmp_path, max_segments=1)
+    events = sample_events()
+    assert store.ingest(events[:8]) == 8
+    await store.flush()
+    store.ingest(events[8:])
+    assert store.skipped == 1
+
+    def check(store: StatsStore):
+        author, counts = store.post_stats('p1')
+        assert author == 'alice'
+        assert (counts[VIEWED], counts[LIKED], counts[COMMENTED]) == (5, 1, 0)
+        assert store.author_stats('alice')[[CREATED, VIEWED]].tolist() == [2, 8]
+        # Только вторая минута
+        assert store.post_stats('p2', store.window(60, 120))[1][VIEWED] == 3
+        assert store.post_stats('p1', store.window(60, 120))[1][VIEWED] == 0
+        assert store.author_stats('bob', store.window(120, 180))[[VIEWED, COMMENTED]].tolist() == [4, 1]
+        assert [(post, author) for post, author, _ in store.top_posts(VIEWED, 2)] == [('p1', 'alice'), ('p3', 'bob')]
+        top = store.top_posts(VIEWED, 10, store.window(60, 180))
+        assert [(post, counts[VIEWED]) for post, _, counts in top] == [('p3', 4), ('p2', 3)]
+        author, counts = store.post_stats('missing')
+        assert author == '' and not counts.any()
+
+    check(store)
+    await store.flush()
+    # Второй flush слил оба сегмента в одну партицию
+    assert len(store.segments) == 1
+    assert len(list((tmp_path / 'partitions').iterdir())) == 1
+
+    reloaded = make_store(tmp_path)
+    assert reloaded.load() == 1
+    check(reloaded)
+
+
+@pytest.mark.asyncio
+async def test_consumer_reads_producer_output_and_commits_offset(tmp_path):
+    broker = FileBroker(str(tmp_path / 'broker'))
+    producer = EventProducer(broker, 'posts_service', topic='events', batch_max_events=4,
+                             linger=0.01, spill_dir=str(tmp_path / 'spill'))
+    producer.start()
+    for e in sample_events():
+        producer.emit(e.pop('event_type'), **{k: v for k, v in e.items() if k != 'timestamp'})
+    await producer.close()
+
+    store = make_store(tmp_path)
+    source = FileEventSource(str(tmp_path / 'broker'), str(tmp_path / 'offset'), topic='events')
+    task = asyncio.create_task(consume(store, source, flush_interval=0, poll_interval=0.01))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert store.post_stats('p1')[1][VIEWED] == 5
+    assert int((tmp_path / 'offset').read_text()) == broker.topic_path('events').stat().st_size
+    # После перезапуска события не читаются второй раз
+    again = FileEventSource(str(tmp_path / 'broker'), str(tmp_path / 'offset'), topic='events')
+    assert (await again.poll())[0] == []
+
+
+def make_deduplicating_store(tmp_path) -> StatsStore:
+    return make_store(tmp_path, seen=SeenEvents(str(tmp_path / 'seen_events.npz')))
+
+
+def with_ids(events: list) -> list:
+    return [{**e, 'event_id': f'e{i}'} for i, e in enumerate(events)]
+
+
+def counters(store: StatsStore) -> list:
+    return store.totals[:len(store.posts)].tolist()
+
+
+@pytest.mark.asyncio
+async def test_replayed_batch_is_not_counted_twice(tmp_path):
+    events = with_ids(sample_events())
+    store = make_deduplicating_store(tmp_path)
+    accepted = store.ingest(events)
+    assert accepted == len(events) - 1
+    expected = counters(store)
+    # Продюсер переотправил пачку, пока она ещё в буфере
+    assert store.ingest(events) == 0
+    assert store.duplicates == accepted
+    await store.flush()
+    assert counters(store) == expected
+
+    # Падение после записи партиции, до коммита позиции: брокер отдаёт ту же пачку
+    reloaded = make_deduplicating_store(tmp_path)
+    reloaded.load()
+    assert counters(reloaded) == expected
+    assert reloaded.ingest(events) == 0
+    await reloaded.flush()
+    assert counters(reloaded) == expected
+    assert reloaded.storage.last() == 0
+
+
+@pytest.mark.asyncio
+async def test_events_of_unwritten_partition_are_accepted_again(tmp_path):
+    events = with_ids(sample_events())
+    store = make_deduplicating_store(tmp_path)
+    store.ingest(events[:8])
+    await store.flush()
+    store.ingest(events[8:])
+    # Окно уже сохранено с номером следующей партиции, а сама партиция не записана
+    store.seen.save(store.storage.last() + 1)
+
+    reloaded = make_deduplicating_store(tmp_path)
+    reloaded.load()
+    # Первые 8 событий уже в партиции, остальные (кроме события не о посте) принимаются заново
+    assert reloaded.ingest(events) == len(events) - 8 - 1
+    assert counters(reloaded) == counters(store)
+
+
+def test_seen_events_window_is_bounded(tmp_path):
+    seen = SeenEvents(str(tmp_path / 'seen.npz'), capacity=3)
+    assert all(seen.add(f'e{i}') for i in range(5))
+    assert len(seen) == 3
+    # Вытесненные забыты, последние помнятся
+    assert seen.add('e0') and not seen.add('e4')
+    seen.save(0)
+    seen.written()
+    reloaded = SeenEvents(str(tmp_path / 'seen.npz'), capacity=3)
+    assert reloaded.load(0) == 3
+    assert not reloaded.add('e0') and reloaded.add('e2')
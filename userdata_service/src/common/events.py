@@ -0,0 +1,9 @@
+from shared.events import create_event_producer
+
+# None, если EVENTS_BROKER_URL не задан; запускается и останавливается в lifespan приложения
+event_producer = create_event_producer('userdata_service')
+
+
+def emit(event_type: str, **fields) -> None:
+    if event_producer is not None:
+        event_producer.emit(event_type, **fields)
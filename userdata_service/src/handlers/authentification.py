@@ -13,6 +13,7 @@ from sql.queries import (
     select_token,
 )
 
+from common.events import emit
 from common.models import Error
 from utils.postgresql import connect, execute_query
 from utils.encoding import encode_password
@@ -49,6 +50,10 @@ class CheckTokenRequest(BaseModel):
     user_id: UUID4
 
 
+class CheckTokenResponse(BaseModel):
+    active_until: datetime
+
+
 @router.post("/register/v1", status_code=201, responses={400: {"model": Error}})
 async def register_v1(body: RegisterRequest):
     def validate_request():
@@ -64,13 +69,13 @@ async def register_v1(body: RegisterRequest):
                 )
     validate_request()
 
-    with connect() as conn:
-        with conn.begin():
+    async with connect() as conn:
+        async with conn.begin():
             user_id = uuid.uuid4()
 
-            data = execute_query(
+            data = (await execute_query(
                 conn, select_auth_data.QUERY, username=body.username
-            ).fetchall()
+            )).fetchall()
             if len(data) > 0:
                 return JSONResponse(
                     dict(
@@ -81,19 +86,20 @@ async def register_v1(body: RegisterRequest):
                     ),
                     400,
                 )
-            execute_query(
+            await execute_query(
                 conn,
                 insert_auth_data.QUERY,
                 user_id=user_id,
                 username=body.username,
                 encoded_password=encode_password(body.password),
             )
-            execute_query(
+            await execute_query(
                 conn,
                 insert_users_data.QUERY,
                 user_id=user_id,
                 name=body.name,
             )
+    emit('user_registered', user_id=user_id)
 
 
 @router.post(
@@ -102,15 +108,15 @@ async def register_v1(body: RegisterRequest):
     responses={403: {}, 400: {"model": Error}},
 )
 async def authorize_v1(body: AuthorizeRequest):
-    with connect() as conn:
-        with conn.begin():
+    async with connect() as conn:
+        async with conn.begin():
             encoded_password = encode_password(body.password)
-            rows = execute_query(
+            rows = (await execute_query(
                 conn,
                 select_auth_data_by_password.QUERY,
                 username=body.username,
                 encoded_password=encoded_password,
-            ).fetchall()
+            )).fetchall()
             if len(rows) == 0:
                 return Response(status_code=403)
             if len(rows) > 1:
@@ -121,12 +127,12 @@ async def authorize_v1(body: AuthorizeRequest):
 
             token = str(uuid.uuid4()) + "__" + str(uuid.uuid4())
 
-            execute_query(
+            await execute_query(
                 conn,
                 insert_tokens.QUERY,
                 token=token,
                 user_id=user_id,
-                created_at="NOW()",
+                created_at=datetime.now(),
                 active_until=datetime.now() + timedelta(hours=12),
             )
     return AuthorizeResponse(auth_data=AuthentificationData(token=token, user_id=user_id))
@@ -134,19 +140,21 @@ async def authorize_v1(body: AuthorizeRequest):
 
 @router.post(
     "/check-token/v1",
+    response_model=CheckTokenResponse,
     responses={403: {}},
 )
 async def check_token_v1(body: CheckTokenRequest):
-    with connect() as conn:
-        with conn.begin():
-            rows = execute_query(
+    async with connect() as conn:
+        async with conn.begin():
+            rows = (await execute_query(
                 conn,
                 select_token.QUERY,
                 token=body.token,
                 user_id=body.user_id,
-            ).fetchall()
+            )).fetchall()
             if len(rows) == 0:
                 return Response(status_code=403)
             if len(rows) > 1:
                 raise RuntimeError("Invariant failed, too many lines")
- 
\ No newline at end of file
+
+    return CheckTokenResponse(active_until=rows[0][1])
@@ -0,0 +1,117 @@
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, UUID4
+from sqlalchemy.exc import IntegrityError
+from sql.queries import (
+    delete_follow,
+    insert_follow,
+    select_follow_counts,
+    select_followees,
+    select_followers,
+)
+
+from common.events import emit
+from common.models import Error
+from utils.postgresql import connect, execute_query
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+MAX_FOLLOWERS_PAGE_SIZE = 5_000
+
+
+class FollowRequest(BaseModel):
+    follower_user_id: UUID4
+    followee_user_id: UUID4
+
+
+class FollowResponse(BaseModel):
+    # False, если подписка уже была (или её не было при отписке)
+    changed: bool
+
+
+class FollowersResponse(BaseModel):
+    followers_count: int
+    followers: List[UUID4]
+    # Курсор следующей страницы; None на последней
+    next_after: Optional[UUID4] = None
+
+
+class Followee(BaseModel):
+    user_id: UUID4
+    followers_count: int
+
+
+class FolloweesResponse(BaseModel):
+    followees: List[Followee]
+
+
+@router.post("/follow/v1", response_model=FollowResponse, responses={400: {"model": Error}, 404: {"model": Error}})
+async def follow_v1(body: FollowRequest):
+    if body.follower_user_id == body.followee_user_id:
+        return JSONResponse(dict(Error(code="validation_error", message="Cannot follow yourself")), 400)
+
+    try:
+        async with connect() as conn:
+            async with conn.begin():
+                inserted = (await execute_query(
+                    conn,
+                    insert_follow.QUERY,
+                    follower_user_id=body.follower_user_id,
+                    followee_user_id=body.followee_user_id,
+                )).scalar()
+    except IntegrityError:
+        return JSONResponse(dict(Error(code="not_found", message="User not found")), 404)
+    if inserted:
+        emit('user_followed', user_id=body.follower_user_id, followee_user_id=body.followee_user_id)
+    return FollowResponse(changed=bool(inserted))
+
+
+@router.post("/unfollow/v1", response_model=FollowResponse)
+async def unfollow_v1(body: FollowRequest):
+    async with connect() as conn:
+        async with conn.begin():
+            deleted = (await execute_query(
+                conn,
+                delete_follow.QUERY,
+                follower_user_id=body.follower_user_id,
+                followee_user_id=body.followee_user_id,
+            )).scalar()
+    if deleted:
+        emit('user_unfollowed', user_id=body.follower_user_id, followee_user_id=body.followee_user_id)
+    return FollowResponse(changed=bool(deleted))
+
+
+@router.get("/followers/v1", response_model=FollowersResponse)
+async def followers_v1(
+    user_id: UUID4,
+    after: Optional[UUID4] = None,
+    limit: int = Query(1_000, ge=1, le=MAX_FOLLOWERS_PAGE_SIZE),
+):
+    async with connect() as conn:
+        counts = (await execute_query(conn, select_follow_counts.QUERY, user_id=user_id)).first()
+        rows = (await execute_query(
+            conn, select_followers.QUERY, user_id=user_id, after=after, limit=limit,
+        )).fetchall()
+
+    followers = [row[0] for row in rows]
+    return FollowersResponse(
+        followers_count=counts[0] if counts else 0,
+        followers=followers,
+        next_after=followers[-1] if len(followers) == limit else None,
+    )
+
+
+@router.get("/followees/v1", response_model=FolloweesResponse)
+async def followees_v1(user_id: UUID4, min_followers: int = 0):
+    """Подписки пользователя; min_followers оставляет только авторов с большой аудиторией."""
+    async with connect() as conn:
+        rows = (await execute_query(
+            conn, select_followees.QUERY, user_id=user_id, min_followers=min_followers,
+        )).fetchall()
+    return FolloweesResponse(followees=[Followee(user_id=row[0], followers_count=row[1]) for row in rows])
@@ -12,7 +12,7 @@ from sql.queries import (
 )
 
 from common.models import Error
-from utils.postgresql import connect, execute_query, Connection
+from utils.postgresql import connect, execute_query
 from utils.encoding import encode_password
 
 logging.basicConfig(level=logging.INFO)
@@ -61,21 +61,21 @@ async def update_v1(body: UpdateRequest):
                 )
     validate()
 
-    with connect() as conn:
-        with conn.begin():
+    async with connect() as conn:
+        async with conn.begin():
             user_id = body.descriptor.user_id
             payload = body.payload
 
-            execute_query(
+            await execute_query(
                 conn,
                 update_user_data.QUERY,
                 user_id=user_id,
                 name=payload.name,
                 surname=payload.surname,
-                gender=payload.gender,
+                gender=payload.gender.value,
                 status=payload.status,
             )
-            execute_query(
+            await execute_query(
                 conn,
                 update_auth_data.QUERY,
                 user_id=user_id,
@@ -1,9 +1,23 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from handlers import authentification, migrations, users_data
+from common.events import event_producer
+from handlers import authentification, follows, migrations, users_data
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if event_producer is not None:
+        event_producer.start()
+    yield
+    if event_producer is not None:
+        await event_producer.close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(authentification.router)
 app.include_router(migrations.router)
 app.include_router(users_data.router)
+app.include_router(follows.router)
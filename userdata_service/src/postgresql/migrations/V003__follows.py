@@ -0,0 +1,39 @@
+QUERY='''
+CREATE TABLE follows (
+    follower_user_id   UUID NOT NULL           REFERENCES authentification_data(user_id),
+    followee_user_id   UUID NOT NULL           REFERENCES authentification_data(user_id),
+    created_at         TIMESTAMPTZ NOT NULL    DEFAULT NOW(),
+
+    PRIMARY KEY (follower_user_id, followee_user_id),
+    CHECK (follower_user_id <> followee_user_id)
+);
+
+-- Подписчики автора: по ним posts_service раскладывает новые посты по лентам
+CREATE INDEX idx_follows_followee ON follows (followee_user_id, follower_user_id);
+
+-- Счётчики поддерживаются триггером, чтобы не считать count(*) по подписчикам популярных авторов
+CREATE TABLE follow_counts (
+    user_id            UUID NOT NULL           PRIMARY KEY,
+    followers_count    BIGINT NOT NULL         DEFAULT 0,
+    followees_count    BIGINT NOT NULL         DEFAULT 0
+);
+
+CREATE FUNCTION follows_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO follow_counts (user_id, followers_count) VALUES (NEW.followee_user_id, 1)
+        ON CONFLICT (user_id) DO UPDATE SET followers_count = follow_counts.followers_count + 1;
+        INSERT INTO follow_counts (user_id, followees_count) VALUES (NEW.follower_user_id, 1)
+        ON CONFLICT (user_id) DO UPDATE SET followees_count = follow_counts.followees_count + 1;
+    ELSE
+        UPDATE follow_counts SET followers_count = followers_count - 1 WHERE user_id = OLD.followee_user_id;
+        UPDATE follow_counts SET followees_count = followees_count - 1 WHERE user_id = OLD.follower_user_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER follows_count
+AFTER INSERT OR DELETE ON follows
+FOR EACH ROW EXECUTE FUNCTION follows_count();
+'''
@@ -0,0 +1,8 @@
+QUERY = '''
+DELETE FROM follows
+WHERE
+    follower_user_id = :follower_user_id
+    AND followee_user_id = :followee_user_id
+RETURNING TRUE
+;
+'''
@@ -0,0 +1,7 @@
+QUERY = '''
+INSERT INTO follows (follower_user_id, followee_user_id)
+VALUES (:follower_user_id, :followee_user_id)
+ON CONFLICT DO NOTHING
+RETURNING TRUE
+;
+'''
@@ -0,0 +1,10 @@
+QUERY = '''
+SELECT
+    followers_count,
+    followees_count
+FROM
+    follow_counts
+WHERE
+    user_id = :user_id
+;
+'''
@@ -0,0 +1,12 @@
+QUERY = '''
+SELECT
+    follows.followee_user_id,
+    COALESCE(follow_counts.followers_count, 0) AS followers_count
+FROM
+    follows
+    LEFT JOIN follow_counts ON follow_counts.user_id = follows.followee_user_id
+WHERE
+    follows.follower_user_id = :user_id
+    AND COALESCE(follow_counts.followers_count, 0) >= :min_followers
+;
+'''
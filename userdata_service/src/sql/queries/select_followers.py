@@ -0,0 +1,14 @@
+QUERY = '''
+SELECT
+    follower_user_id
+FROM
+    follows
+WHERE
+    followee_user_id = :user_id
+    AND (CAST(:after AS UUID) IS NULL OR follower_user_id > CAST(:after AS UUID))
+ORDER BY
+    follower_user_id
+LIMIT
+    :limit
+;
+'''
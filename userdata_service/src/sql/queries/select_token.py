@@ -1,6 +1,7 @@
 QUERY = '''
 SELECT
-    token
+    token,
+    active_until
 FROM
     tokens_data
 WHERE